@@ -1,12 +1,30 @@
 import asyncio
+from pathlib import Path
+from typing import Optional
 
 import typer
 import uvicorn
 
-from backend.cli import create_primary_user
+from backend.benchmarks import SeedSize
+from backend.cli import (
+    benchmark_endpoints,
+    benchmark_serialization,
+    check_indexes,
+    create_primary_user,
+    import_file,
+    rebuild_statistics,
+    seed_benchmark_catalog,
+)
+from backend.custom_types import ImportFormat, ImportKind
 from backend.settings import settings
 
 app = typer.Typer()
+db_app = typer.Typer(help="Database maintenance.")
+app.add_typer(db_app, name="db")
+bench_app = typer.Typer(help="Performance benchmarks.")
+app.add_typer(bench_app, name="bench")
+
+DEFAULT_SEED_SIZE = SeedSize()
 
 
 @app.command()
@@ -22,10 +40,123 @@ def runserver() -> None:
 
 
 @app.command(name="createprimaryuser")
-def create_primary_user_command(username: str, password: str, email: str):
+def create_primary_user_command(username: str, password: str, email: str) -> None:
     """Creates a primary user."""
     asyncio.run(create_primary_user(username, password, email))
 
 
+@app.command(name="rebuildstatistics")
+def rebuild_statistics_command() -> None:
+    """Recomputes statistics tables from scratch."""
+    asyncio.run(rebuild_statistics())
+
+
+@app.command(name="import")
+def import_command(
+    kind: ImportKind,
+    path: Path = typer.Argument(..., exists=True, dir_okay=False),
+    file_format: Optional[ImportFormat] = typer.Option(
+        None,
+        "--format",
+        help="Defaults to csv for .csv files and ndjson otherwise.",
+    ),
+) -> None:
+    """Imports objects from a CSV or NDJSON file, referenced by titles."""
+    asyncio.run(import_file(kind, path, file_format))
+
+
+@db_app.command(name="check-indexes")
+def check_indexes_command(
+    create: bool = typer.Option(
+        False,
+        "--create",
+        help="Create missing indexes concurrently, without locking the tables.",
+    ),
+) -> None:
+    """Reports indexes missing for orders, filters and prefetches of lists."""
+    asyncio.run(check_indexes(create))
+
+
+@bench_app.command(name="serialization")
+def benchmark_serialization_command(
+    limit: int = typer.Option(100, help="Amount of objects in a list."),
+    repeat: int = typer.Option(50, help="Amount of serializations measured."),
+) -> None:
+    """Compares CPU time of serializing game and user lists by FastAPI and orjson."""
+    asyncio.run(benchmark_serialization(limit, repeat))
+
+
+@bench_app.command(name="seed")
+def seed_benchmark_catalog_command(
+    users: int = typer.Option(DEFAULT_SEED_SIZE.users),
+    companies: int = typer.Option(DEFAULT_SEED_SIZE.companies),
+    platforms: int = typer.Option(DEFAULT_SEED_SIZE.platforms),
+    genres: int = typer.Option(DEFAULT_SEED_SIZE.genres),
+    games: int = typer.Option(DEFAULT_SEED_SIZE.games),
+    sales: int = typer.Option(DEFAULT_SEED_SIZE.sales),
+    backups: int = typer.Option(DEFAULT_SEED_SIZE.backups),
+    yes: bool = typer.Option(False, "--yes", help="Don't ask for confirmation."),
+) -> None:
+    """Replaces all data with a synthetic catalog for the benchmarks.
+
+    Run it against a throwaway database, e.g. the bench-db service of
+    docker-compose.yml with BACKEND_DB_PORT=9011, migrated by "aerich upgrade".
+    Its superuser "user0" has password "benchmark".
+    """
+    if not yes:
+        typer.confirm(
+            f"Replace all data in {settings.db_base} at {settings.db_host}?",
+            abort=True,
+        )
+    size = SeedSize(users, companies, platforms, genres, games, sales, backups)
+    asyncio.run(seed_benchmark_catalog(size))
+
+
+@bench_app.command(name="endpoints")
+def benchmark_endpoints_command(
+    routers: Optional[list[str]] = typer.Option(
+        None,
+        "--router",
+        help="Measure only scenarios of the router, e.g. games.",
+    ),
+    requests: int = typer.Option(
+        50,
+        min=1,
+        help="Amount of requests of a scenario.",
+    ),
+    concurrency: int = typer.Option(1, min=1, help="Amount of concurrent clients."),
+    warmup: int = typer.Option(3, min=0, help="Amount of requests before measuring."),
+    cache: bool = typer.Option(False, help="Keep the configured response cache."),
+    output: Optional[Path] = typer.Option(None, help="Save results as JSON."),
+    baseline: Optional[Path] = typer.Option(
+        None,
+        exists=True,
+        dir_okay=False,
+        help="Fail on regressions against results saved by --output.",
+    ),
+    tolerance: float = typer.Option(
+        0.2,
+        help="Share the p90 latency may grow by before it's a regression.",
+    ),
+) -> None:
+    """Measures latency percentiles, queries and rows of every router's requests.
+
+    Requests are sent in-process to the application against the seeded
+    catalog, so HTTP parsing and network aren't measured.
+    """
+    asyncio.run(
+        benchmark_endpoints(
+            routers,
+            requests,
+            concurrency,
+            warmup,
+            cache,
+            output,
+            baseline,
+            tolerance,
+        ),
+    )
+
+
 if __name__ == "__main__":
     app()
@@ -0,0 +1,16 @@
+"""Benchmarks of the API against a seeded catalog."""
+from backend.benchmarks.runner import ScenarioResult, get_counting_config, run_scenario
+from backend.benchmarks.scenarios import Scenario, get_scenarios
+from backend.benchmarks.seeder import SeedSize, get_seed_size, seed_catalog, seeded_id
+
+__all__ = [
+    "ScenarioResult",
+    "get_counting_config",
+    "run_scenario",
+    "Scenario",
+    "get_scenarios",
+    "SeedSize",
+    "get_seed_size",
+    "seed_catalog",
+    "seeded_id",
+]
@@ -0,0 +1,381 @@
+"""Running scenarios against the application and measuring them."""
+import asyncio
+import copy
+import math
+import time
+from contextvars import ContextVar
+from typing import Any, NamedTuple, Optional
+from urllib.parse import urlencode
+
+from asyncpg.connection import Connection
+from starlette.types import ASGIApp, Message, Scope
+
+from backend.benchmarks.scenarios import Scenario
+from backend.db.config import TORTOISE_CONFIG
+
+
+class QueryStats:
+    """Statements sent to the database and rows they fetched."""
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.rows = 0
+
+    def add(self, rows: int) -> None:
+        self.queries += 1
+        self.rows += rows
+
+
+_stats: ContextVar[Optional[QueryStats]] = ContextVar("stats", default=None)
+
+
+def _count(rows: int) -> None:
+    stats = _stats.get()
+    if stats is not None:
+        stats.add(rows)
+
+
+class CountingConnection(Connection):
+    """Connection counting statements of the request using it.
+
+    Tasks started by the request inherit its context, so statements sent
+    concurrently over other connections of the pool are counted as well.
+    """
+
+    async def execute(self, query: str, *args: Any, **kwargs: Any) -> str:
+        _count(0)
+        return await super().execute(query, *args, **kwargs)
+
+    async def executemany(self, command: str, args: Any, **kwargs: Any) -> None:
+        _count(0)
+        return await super().executemany(command, args, **kwargs)
+
+    async def fetch(self, query: str, *args: Any, **kwargs: Any) -> list[Any]:
+        rows = await super().fetch(query, *args, **kwargs)
+        _count(len(rows))
+        return rows
+
+    async def fetchrow(self, query: str, *args: Any, **kwargs: Any) -> Any:
+        row = await super().fetchrow(query, *args, **kwargs)
+        _count(0 if row is None else 1)
+        return row
+
+    async def fetchval(self, query: str, *args: Any, **kwargs: Any) -> Any:
+        value = await super().fetchval(query, *args, **kwargs)
+        _count(1)
+        return value
+
+    async def reset(self, **kwargs: Any) -> None:
+        # Pool resets connections given back to it, the request doesn't
+        token = _stats.set(None)
+        try:
+            await super().reset(**kwargs)
+        finally:
+            _stats.reset(token)
+
+
+def get_counting_config() -> dict[str, Any]:
+    """Get tortoise config whose connections count statements.
+
+    Returns:
+        dict[str, Any]: Config.
+    """
+
+    config = copy.deepcopy(TORTOISE_CONFIG)
+    for connection in config["connections"].values():
+        connection["credentials"]["connection_class"] = CountingConnection
+    return config
+
+
+class Response(NamedTuple):
+    status: int
+    body: bytes
+
+
+def get_scope(
+    method: str,
+    path: str,
+    params: Optional[dict[str, Any]],
+    headers: list[tuple[bytes, bytes]],
+) -> Scope:
+    """Build scope of an HTTP request.
+
+    Args:
+        method (str): Method.
+        path (str): Path.
+        params (Optional[dict[str, Any]]): Query parameters.
+        headers (list[tuple[bytes, bytes]]): Raw headers.
+
+    Returns:
+        Scope: Scope.
+    """
+
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": urlencode(params or {}, doseq=True).encode(),
+        "root_path": "",
+        "headers": headers,
+        "client": ("127.0.0.1", 0),
+        "server": ("benchmark", 80),
+    }
+
+
+def encode_form(
+    form: Optional[dict[str, str]],
+) -> tuple[bytes, list[tuple[bytes, bytes]]]:
+    """Encode form sent as the body.
+
+    Args:
+        form (Optional[dict[str, str]]): Form.
+
+    Returns:
+        tuple[bytes, list[tuple[bytes, bytes]]]: Body and its raw headers.
+    """
+
+    if form is None:
+        return b"", []
+    body = urlencode(form).encode()
+    return body, [
+        (b"content-type", b"application/x-www-form-urlencoded"),
+        (b"content-length", str(len(body)).encode()),
+    ]
+
+
+class Exchange:
+    """Messages of a request called in-process."""
+
+    def __init__(self, body: bytes) -> None:
+        self.messages: list[Message] = [
+            {"type": "http.request", "body": body, "more_body": False},
+        ]
+        self.sent = asyncio.Event()
+        self.status = 0
+        self.chunks: list[bytes] = []
+
+    async def receive(self) -> Message:
+        if self.messages:
+            return self.messages.pop()
+        # Streaming responses listen for the client going away
+        await self.sent.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+        elif message["type"] == "http.response.body":
+            self.chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                self.sent.set()
+
+
+async def request(
+    app: ASGIApp,
+    method: str,
+    path: str,
+    params: Optional[dict[str, Any]] = None,
+    form: Optional[dict[str, str]] = None,
+    headers: Optional[dict[str, str]] = None,
+) -> Response:
+    """Call the application in-process, without HTTP and network.
+
+    Args:
+        app (ASGIApp): Application.
+        method (str): Method.
+        path (str): Path.
+        params (Optional[dict[str, Any]]): Query parameters.
+        form (Optional[dict[str, str]]): Form sent as the body.
+        headers (Optional[dict[str, str]]): Headers.
+
+    Returns:
+        Response: Status and body.
+    """
+
+    body, body_headers = encode_form(form)
+    request_headers = [(b"host", b"benchmark"), *body_headers]
+    request_headers.extend(
+        (name.lower().encode(), value.encode())
+        for name, value in (headers or {}).items()
+    )
+    exchange = Exchange(body)
+    await app(
+        get_scope(method, path, params, request_headers),
+        exchange.receive,
+        exchange.send,
+    )
+    return Response(exchange.status, b"".join(exchange.chunks))
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Get percentile of the values by the nearest-rank method.
+
+    Args:
+        values (list[float]): Sorted values.
+        percent (float): Percent, e.g. 99.
+
+    Returns:
+        float: Percentile, 0 if there are no values.
+    """
+
+    if not values:
+        return 0
+    rank = math.ceil(percent / 100 * len(values))
+    return values[max(rank, 1) - 1]
+
+
+class Measurement(NamedTuple):
+    """Measurements of a request."""
+
+    # Milliseconds
+    latency: float
+    stats: QueryStats
+    failed: bool
+
+
+class ScenarioResult(NamedTuple):
+    """Measurements of a scenario."""
+
+    router: str
+    name: str
+    requests: int
+    errors: int
+    # Latencies in milliseconds
+    p50: float
+    p90: float
+    p99: float
+    maximum: float
+    # Means per request
+    queries: float
+    rows: float
+
+    @classmethod
+    def from_measurements(
+        cls,
+        scenario: Scenario,
+        measurements: list[Measurement],
+    ) -> "ScenarioResult":
+        latencies = sorted(measurement.latency for measurement in measurements)
+        # Scenarios may allow no requests at all
+        amount = max(len(measurements), 1)
+        return cls(
+            router=scenario.router,
+            name=scenario.name,
+            requests=len(measurements),
+            errors=sum(measurement.failed for measurement in measurements),
+            p50=percentile(latencies, 50),
+            p90=percentile(latencies, 90),
+            p99=percentile(latencies, 99),
+            maximum=percentile(latencies, 100),
+            queries=sum(item.stats.queries for item in measurements) / amount,
+            rows=sum(item.stats.rows for item in measurements) / amount,
+        )
+
+
+async def send_scenario(
+    app: ASGIApp,
+    scenario: Scenario,
+    headers: dict[str, str],
+) -> Measurement:
+    """Send the scenario's request, counting statements of the current context.
+
+    Args:
+        app (ASGIApp): Application.
+        scenario (Scenario): Scenario.
+        headers (dict[str, str]): Headers.
+
+    Returns:
+        Measurement: Measurements.
+    """
+
+    stats = QueryStats()
+    _stats.set(stats)
+    start = time.perf_counter()
+    response = await request(
+        app,
+        scenario.method,
+        scenario.path,
+        scenario.params,
+        scenario.form,
+        headers,
+    )
+    return Measurement(
+        latency=(time.perf_counter() - start) * 1000,
+        stats=stats,
+        failed=response.status >= 400,
+    )
+
+
+async def run_client(
+    app: ASGIApp,
+    scenario: Scenario,
+    headers: dict[str, str],
+    amount: int,
+) -> list[Measurement]:
+    """Send the scenario's requests one after another.
+
+    Args:
+        app (ASGIApp): Application.
+        scenario (Scenario): Scenario.
+        headers (dict[str, str]): Headers.
+        amount (int): Amount of requests.
+
+    Returns:
+        list[Measurement]: Measurements.
+    """
+
+    measurements = []
+    for _ in range(amount):
+        # Own context, so requests of other clients aren't counted
+        measurements.append(
+            await asyncio.create_task(send_scenario(app, scenario, headers)),
+        )
+    return measurements
+
+
+async def run_scenario(
+    app: ASGIApp,
+    scenario: Scenario,
+    headers: dict[str, str],
+    requests: int,
+    concurrency: int,
+    warmup: int,
+) -> ScenarioResult:
+    """Send the scenario's requests by several concurrent clients.
+
+    Args:
+        app (ASGIApp): Application.
+        scenario (Scenario): Scenario.
+        headers (dict[str, str]): Headers of every request.
+        requests (int): Amount of measured requests, unless the scenario
+            allows less.
+        concurrency (int): Amount of clients sending requests at once.
+        warmup (int): Amount of requests sent before measuring, e.g. to fill
+            the pools and prepared statements caches.
+
+    Returns:
+        ScenarioResult: Measurements.
+    """
+
+    if scenario.max_requests is not None:
+        requests = min(requests, scenario.max_requests)
+    await run_client(app, scenario, headers, warmup)
+    clients = await asyncio.gather(
+        *(
+            run_client(
+                app,
+                scenario,
+                headers,
+                len(range(number, requests, concurrency)),
+            )
+            for number in range(concurrency)
+        ),
+    )
+    return ScenarioResult.from_measurements(
+        scenario,
+        [measurement for client in clients for measurement in client],
+    )
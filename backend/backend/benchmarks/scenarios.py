@@ -0,0 +1,153 @@
+"""Requests measured for each router of the API."""
+from typing import Any, NamedTuple, Optional
+
+from backend.benchmarks.seeder import (
+    BENCHMARK_PASSWORD,
+    BENCHMARK_USERNAME,
+    SeedSize,
+    seeded_id,
+)
+
+
+class Scenario(NamedTuple):
+    """Request sent again and again."""
+
+    # Prefix of the router in web/api/router.py
+    router: str
+    name: str
+    path: str
+    params: Optional[dict[str, Any]] = None
+    method: str = "GET"
+    form: Optional[dict[str, str]] = None
+    # Caps the amount of requests of scenarios reading whole tables
+    max_requests: Optional[int] = None
+
+
+def get_scenarios(size: SeedSize) -> list[Scenario]:
+    """Get scenarios reading the catalog seeded with the amounts.
+
+    Exports and changes of the catalog aren't measured: exports stream whole
+    tables, and changes would make runs incomparable. Games and sales of
+    users, genres and platforms grow with the catalog, so lists of these
+    include only their other relations, while their details include all.
+
+    Args:
+        size (SeedSize): Amounts of seeded objects.
+
+    Returns:
+        list[Scenario]: Scenarios grouped by routers.
+    """
+
+    game = seeded_id("game", size.games // 2)
+    company = seeded_id("company", size.companies // 2)
+    user = seeded_id("user", size.users // 2)
+    platform = seeded_id("platform", size.platforms // 2)
+    genre = seeded_id("genre", size.genres // 2)
+    sale = seeded_id("sale", size.sales // 2)
+    credentials = {"username": BENCHMARK_USERNAME, "password": BENCHMARK_PASSWORD}
+    users_include = "created_companies,created_platforms,created_genres"
+    return [
+        Scenario("health", "check", "/api/health/"),
+        Scenario("health", "metrics", "/api/health/metrics"),
+        Scenario(
+            "auth",
+            "access token",
+            "/api/auth/access-token",
+            method="POST",
+            form=credentials,
+        ),
+        Scenario("auth", "test token", "/api/auth/test-token", method="POST"),
+        Scenario("backups", "list", "/api/backups/"),
+        Scenario("users", "list", "/api/users/", {"include": users_include}),
+        Scenario(
+            "users",
+            "list by created games",
+            "/api/users/",
+            {"include": users_include, "sort": "-created_games"},
+        ),
+        Scenario("users", "me", "/api/users/me"),
+        Scenario("users", "detail", f"/api/users/{user}"),
+        Scenario(
+            "users",
+            "creation statistics",
+            "/api/users/creation-statistics",
+            {"days": 30},
+        ),
+        Scenario("users", "role statistics", "/api/users/role-statistics"),
+        Scenario("companies", "list", "/api/companies/"),
+        Scenario("companies", "list by games", "/api/companies/", {"sort": "-games"}),
+        Scenario(
+            "companies",
+            "list by title",
+            "/api/companies/",
+            {"title": "Company 12"},
+        ),
+        Scenario("companies", "detail", f"/api/companies/{company}"),
+        Scenario(
+            "companies",
+            "foundation statistics",
+            "/api/companies/foundation-statistics",
+        ),
+        Scenario("companies", "games statistics", "/api/companies/games-statistics"),
+        Scenario(
+            "platforms",
+            "list",
+            "/api/platforms/",
+            {"include": "created_by_user"},
+        ),
+        Scenario(
+            "platforms",
+            "list by sales",
+            "/api/platforms/",
+            {"include": "created_by_user", "sort": "-sales"},
+        ),
+        Scenario(
+            "platforms",
+            "detail",
+            f"/api/platforms/{platform}",
+            max_requests=5,
+        ),
+        Scenario("genres", "list", "/api/genres/", {"include": "created_by_user"}),
+        Scenario(
+            "genres",
+            "list by games",
+            "/api/genres/",
+            {"include": "created_by_user", "sort": "-games"},
+        ),
+        Scenario("genres", "detail", f"/api/genres/{genre}"),
+        Scenario("games", "list", "/api/games/"),
+        Scenario("games", "list by sales", "/api/games/", {"sort": "-sales"}),
+        Scenario("games", "list by title", "/api/games/", {"title": "Game 1234"}),
+        Scenario(
+            "games",
+            "list released in 2000",
+            "/api/games/",
+            {"released_start": "2000-01-01", "released_end": "2000-12-31"},
+        ),
+        Scenario(
+            "games",
+            "list without relations",
+            "/api/games/",
+            {"include": "", "count": "false"},
+        ),
+        Scenario("games", "list far page", "/api/games/", {"skip": size.games // 2}),
+        Scenario("games", "list first cursor page", "/api/games/", {"cursor": ""}),
+        Scenario("games", "list as JSON", "/api/games/", {"as_json": "true"}),
+        Scenario("games", "detail", f"/api/games/{game}"),
+        Scenario(
+            "games",
+            "popularity statistics",
+            "/api/games/popularity-statistics",
+            max_requests=5,
+        ),
+        Scenario("sales", "list", "/api/sales/"),
+        Scenario("sales", "list by amount", "/api/sales/", {"sort": "-amount"}),
+        Scenario("sales", "detail", f"/api/sales/{sale}"),
+        Scenario(
+            "sales",
+            "popularity statistics",
+            "/api/sales/popularity-statistics",
+            max_requests=5,
+        ),
+        Scenario("search", "search", "/api/search/", {"q": "Game 4242"}),
+    ]
@@ -0,0 +1,243 @@
+"""Synthetic catalog the benchmarks run against."""
+import hashlib
+import logging
+import time
+import uuid
+from typing import Any, NamedTuple
+
+from tortoise import connections
+from tortoise.transactions import in_transaction
+
+from backend.db.dao import StatisticsDAO
+from backend.db.routing import PRIMARY_CONNECTION
+from backend.security import hash_password
+
+logger = logging.getLogger(__name__)
+
+# Superuser the scenarios authenticate as
+BENCHMARK_USERNAME = "user0"
+BENCHMARK_PASSWORD = "benchmark"
+
+SEEDED_TABLES = (
+    "sale",
+    "game_platform",
+    "game_genre",
+    "game",
+    "company",
+    "platform",
+    "genre",
+    "backup",
+    "user",
+    "game_statistics",
+    "company_foundation_statistics",
+    "user_creation_statistics",
+    "user_role_statistics",
+)
+# Tables whose rows are counted by the fields of SeedSize
+SEEDED_AMOUNT_TABLES = (
+    "user",
+    "company",
+    "platform",
+    "genre",
+    "game",
+    "sale",
+    "backup",
+)
+
+
+class SeedSize(NamedTuple):
+    """Amounts of seeded objects."""
+
+    users: int = 1000
+    companies: int = 10000
+    platforms: int = 50
+    genres: int = 100
+    games: int = 200000
+    sales: int = 1000000
+    backups: int = 100
+
+    def validate(self) -> None:
+        """Check the amounts allow unique titles and links.
+
+        Raises:
+            ValueError: Amounts are too small.
+        """
+
+        if min(self) < 1:
+            raise ValueError("Every amount must be positive")
+        if self.platforms < 4 or self.genres < 3:
+            raise ValueError("Games link up to 4 platforms and 3 genres")
+        if self.sales > self.games * self.platforms:
+            raise ValueError("Sales of a game must be on different platforms")
+
+
+def seeded_id(kind: str, number: int) -> uuid.UUID:
+    """Get id of the seeded object, the same as ``md5(kind || number)::uuid``.
+
+    Args:
+        kind (str): Table, e.g. ``game``.
+        number (int): Number of the object, starting from 0.
+
+    Returns:
+        uuid.UUID: Id.
+    """
+
+    return uuid.UUID(hashlib.md5(f"{kind}{number}".encode()).hexdigest())
+
+
+def _id(kind: str, number: str) -> str:
+    """SQL expression of ``seeded_id``."""
+
+    return f"md5('{kind}' || ({number}))::uuid"
+
+
+# Each statement inserts a whole table from generate_series, "n" is the
+# object's number. Numbers are scattered by multiplying them by a prime.
+SEED_QUERIES = (
+    (
+        "user",
+        'INSERT INTO "user" ("id", "username", "email", "hashed_password", '
+        '"salt", "is_superuser", "is_primary", "created_at") '
+        f"SELECT {_id('user', 'n')}, 'user' || n, 'user' || n || '@example.com', "
+        "$2, $3, n = 0, n = 0, now() - n * interval '1 hour' "
+        "FROM generate_series(0, $1::int - 1) n",
+    ),
+    (
+        "company",
+        'INSERT INTO "company" ("id", "title", "founded_at", "created_at", '
+        '"created_by_user_id") '
+        f"SELECT {_id('company', 'n')}, 'Company ' || n, "
+        "DATE '1950-01-01' + (n::bigint * 7919 % 27000)::int, "
+        "now() - n * interval '1 minute', "
+        f"{_id('user', 'n % $2::int')} "
+        "FROM generate_series(0, $1::int - 1) n",
+    ),
+    (
+        "platform",
+        'INSERT INTO "platform" ("id", "title", "created_by_user_id") '
+        f"SELECT {_id('platform', 'n')}, 'Platform ' || n, "
+        f"{_id('user', 'n % $2::int')} "
+        "FROM generate_series(0, $1::int - 1) n",
+    ),
+    (
+        "genre",
+        'INSERT INTO "genre" ("id", "title", "created_at", "created_by_user_id") '
+        f"SELECT {_id('genre', 'n')}, 'Genre ' || n, "
+        "now() - n * interval '1 day', "
+        f"{_id('user', 'n % $2::int')} "
+        "FROM generate_series(0, $1::int - 1) n",
+    ),
+    (
+        "game",
+        'INSERT INTO "game" ("id", "title", "released_at", "created_at", '
+        '"created_by_user_id", "created_by_company_id") '
+        f"SELECT {_id('game', 'n')}, 'Game ' || n, "
+        "DATE '1970-01-01' + (n::bigint * 7919 % 20000)::int, "
+        "now() - n * interval '1 second', "
+        f"{_id('user', 'n % $2::int')}, {_id('company', 'n * 31 % $3::int')} "
+        "FROM generate_series(0, $1::int - 1) n",
+    ),
+    (
+        "game_platform",
+        'INSERT INTO "game_platform" ("game_id", "platform_id") '
+        f"SELECT {_id('game', 'n')}, {_id('platform', '(n + link) % $2::int')} "
+        "FROM generate_series(0, $1::int - 1) n, generate_series(0, 3) link "
+        "WHERE link <= n % 4",
+    ),
+    (
+        "game_genre",
+        'INSERT INTO "game_genre" ("game_id", "genre_id") '
+        f"SELECT {_id('game', 'n')}, {_id('genre', '(n * 7 + link) % $2::int')} "
+        "FROM generate_series(0, $1::int - 1) n, generate_series(0, 2) link "
+        "WHERE link <= n % 3",
+    ),
+    (
+        "sale",
+        # Sales of a game are on consecutive platforms
+        'INSERT INTO "sale" ("id", "amount", "game_id", "platform_id", '
+        '"created_by_user_id") '
+        f"SELECT {_id('sale', 'n')}, n::bigint * 7919 % 1000000 + 1, "
+        f"{_id('game', 'n % $2::int')}, "
+        f"{_id('platform', '(n % $2::int + n / $2::int) % $3::int')}, "
+        f"{_id('user', 'n % $4::int')} "
+        "FROM generate_series(0, $1::int - 1) n",
+    ),
+    (
+        "backup",
+        'INSERT INTO "backup" ("id", "title", "url", "format", "size", '
+        '"created_at", "created_by_user_id") '
+        f"SELECT {_id('backup', 'n')}, 'backup-' || n, "
+        "'https://example.com/backups/backup-' || n || '.dump', 'custom', "
+        "n::bigint * 1048576, now() - n * interval '1 day', "
+        f"{_id('user', '0')} "
+        "FROM generate_series(0, $1::int - 1) n",
+    ),
+)
+
+
+def get_seed_values(size: SeedSize) -> dict[str, list[Any]]:
+    """Get query arguments of each seeded table.
+
+    Args:
+        size (SeedSize): Amounts of objects.
+
+    Returns:
+        dict[str, list[Any]]: Table and arguments of its query.
+    """
+
+    hashed_password, salt = hash_password(BENCHMARK_PASSWORD)
+    return {
+        "user": [size.users, hashed_password, salt],
+        "company": [size.companies, size.users],
+        "platform": [size.platforms, size.users],
+        "genre": [size.genres, size.users],
+        "game": [size.games, size.users, size.companies],
+        "game_platform": [size.games, size.platforms],
+        "game_genre": [size.games, size.genres],
+        "sale": [size.sales, size.games, size.platforms, size.users],
+        "backup": [size.backups],
+    }
+
+
+async def seed_catalog(size: SeedSize) -> None:
+    """Replace all data with a synthetic catalog.
+
+    Every table is filled by a single statement, counters are kept by their
+    triggers and statistics tables are rebuilt afterwards.
+
+    Args:
+        size (SeedSize): Amounts of objects.
+    """
+
+    size.validate()
+    values = get_seed_values(size)
+    tables = ", ".join(f'"{table}"' for table in SEEDED_TABLES)
+    async with in_transaction(PRIMARY_CONNECTION) as connection:
+        await connection.execute_query(f"TRUNCATE {tables} CASCADE")
+        for table, query in SEED_QUERIES:
+            start = time.perf_counter()
+            await connection.execute_query(query, values[table])
+            logger.debug(f"Seeded {table} in {time.perf_counter() - start:.1f}s")
+
+    await StatisticsDAO().rebuild()
+    # Planner needs statistics of the new rows right away
+    await connections.get(PRIMARY_CONNECTION).execute_script(
+        f"ANALYZE {tables}",
+    )
+
+
+async def get_seed_size() -> SeedSize:
+    """Count objects of the seeded catalog.
+
+    Returns:
+        SeedSize: Amounts of objects.
+    """
+
+    counts = ", ".join(
+        f'(SELECT count(*) FROM "{table}") AS "{field}"'
+        for field, table in zip(SeedSize._fields, SEEDED_AMOUNT_TABLES)
+    )
+    rows = await connections.get(PRIMARY_CONNECTION).execute_query_dict(
+        f"SELECT {counts}",
+    )
+    return SeedSize(**rows[0])
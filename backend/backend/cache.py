@@ -0,0 +1,234 @@
+"""Cache of API responses, invalidated by tags of the models they contain."""
+import base64
+import functools
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Sequence
+
+from backend.custom_types import ResponseCacheType
+from backend.db.loader import get_loader
+from backend.settings import settings
+
+REDIS_PREFIX = "response-cache"
+
+
+class CachedResponse(NamedTuple):
+    """Response and versions of its tags when it was computed."""
+
+    etag: str
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+    versions: tuple[int, ...]
+
+
+class ResponseCache(ABC):
+    """Storage of cached responses and versions of tags.
+
+    Invalidating a tag bumps its version, so responses computed with an older
+    version of any of their tags are stale.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        """Gets cached response.
+
+        Args:
+            key (str): Path and query of the request.
+
+        Returns:
+            Optional[CachedResponse]: Response, None if it isn't cached.
+        """
+
+    @abstractmethod
+    async def set(self, key: str, response: CachedResponse) -> None:
+        """Caches response for ``response_cache_ttl`` seconds.
+
+        Args:
+            key (str): Path and query of the request.
+            response (CachedResponse): Response.
+        """
+
+    @abstractmethod
+    async def get_versions(self, tags: Sequence[str]) -> tuple[int, ...]:
+        """Gets current versions of the tags.
+
+        Args:
+            tags (Sequence[str]): Tags.
+
+        Returns:
+            tuple[int, ...]: Versions in the order of the tags.
+        """
+
+    @abstractmethod
+    async def invalidate(self, *tags: str) -> None:
+        """Makes responses with any of the tags stale.
+
+        Args:
+            tags (str): Tags, names of changed models.
+        """
+
+    @abstractmethod
+    async def changed_recently(self, tags: Sequence[str]) -> bool:
+        """Checks whether any of the tags was invalidated lately.
+
+        For ``replica_sticky_seconds`` after an invalidation the replica may
+        still lack the change.
+
+        Args:
+            tags (Sequence[str]): Tags.
+
+        Returns:
+            bool: True if responses read from the replica may be stale.
+        """
+
+
+class MemoryResponseCache(ResponseCache):
+    """Keeps responses in the worker, other workers don't see invalidations."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        # Key -> expiration time and response, least recently used first
+        self._responses: OrderedDict[str, tuple[float, CachedResponse]] = (
+            OrderedDict()
+        )
+        self._versions: dict[str, int] = {}
+        # Tag -> time of its last invalidation
+        self._changed_at: dict[str, float] = {}
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        cached = self._responses.get(key)
+        if cached is None:
+            return None
+        if cached[0] <= time.monotonic():
+            del self._responses[key]
+            return None
+        self._responses.move_to_end(key)
+        return cached[1]
+
+    async def set(self, key: str, response: CachedResponse) -> None:
+        expires_at = time.monotonic() + settings.response_cache_ttl
+        self._responses[key] = (expires_at, response)
+        self._responses.move_to_end(key)
+        while len(self._responses) > self.size:
+            self._responses.popitem(last=False)
+
+    async def get_versions(self, tags: Sequence[str]) -> tuple[int, ...]:
+        return tuple(self._versions.get(tag, 0) for tag in tags)
+
+    async def invalidate(self, *tags: str) -> None:
+        now = time.monotonic()
+        for tag in tags:
+            self._versions[tag] = self._versions.get(tag, 0) + 1
+            self._changed_at[tag] = now
+
+    async def changed_recently(self, tags: Sequence[str]) -> bool:
+        since = time.monotonic() - settings.replica_sticky_seconds
+        return any(self._changed_at.get(tag, since) > since for tag in tags)
+
+
+class RedisResponseCache(ResponseCache):
+    """Keeps responses in Redis, shared by all workers."""
+
+    def __init__(self, url: str) -> None:
+        try:
+            from redis import asyncio as aioredis  # noqa: WPS433
+        except ImportError as error:
+            raise RuntimeError(
+                "Redis response cache requires the redis package",
+            ) from error
+        self.redis = aioredis.from_url(url)
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        value = await self.redis.get(f"{REDIS_PREFIX}:response:{key}")
+        if value is None:
+            return None
+        data = json.loads(value)
+        return CachedResponse(
+            etag=data["etag"],
+            headers=[
+                (name.encode("latin-1"), header.encode("latin-1"))
+                for name, header in data["headers"]
+            ],
+            body=base64.b64decode(data["body"]),
+            versions=tuple(data["versions"]),
+        )
+
+    async def set(self, key: str, response: CachedResponse) -> None:
+        value = json.dumps(
+            {
+                "etag": response.etag,
+                "headers": [
+                    (name.decode("latin-1"), header.decode("latin-1"))
+                    for name, header in response.headers
+                ],
+                "body": base64.b64encode(response.body).decode(),
+                "versions": response.versions,
+            },
+        )
+        await self.redis.set(
+            f"{REDIS_PREFIX}:response:{key}",
+            value,
+            ex=settings.response_cache_ttl,
+        )
+
+    async def get_versions(self, tags: Sequence[str]) -> tuple[int, ...]:
+        if not tags:
+            return ()
+        values = await self.redis.mget(
+            [f"{REDIS_PREFIX}:version:{tag}" for tag in tags],
+        )
+        return tuple(int(value or 0) for value in values)
+
+    async def invalidate(self, *tags: str) -> None:
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            for tag in tags:
+                pipeline.incr(f"{REDIS_PREFIX}:version:{tag}")
+                if settings.replica_sticky_seconds > 0:
+                    pipeline.set(
+                        f"{REDIS_PREFIX}:changed:{tag}",
+                        1,
+                        ex=settings.replica_sticky_seconds,
+                    )
+            await pipeline.execute()
+
+    async def changed_recently(self, tags: Sequence[str]) -> bool:
+        if not tags or settings.replica_sticky_seconds <= 0:
+            return False
+        changed = await self.redis.exists(
+            *(f"{REDIS_PREFIX}:changed:{tag}" for tag in tags),
+        )
+        return changed > 0
+
+
+@functools.lru_cache(maxsize=None)
+def get_response_cache() -> Optional[ResponseCache]:
+    """Returns cache chosen by settings, created on first use.
+
+    Returns:
+        Optional[ResponseCache]: Response cache, None if caching is disabled.
+    """
+
+    if settings.response_cache == ResponseCacheType.MEMORY:
+        return MemoryResponseCache(settings.response_cache_size)
+    if settings.response_cache == ResponseCacheType.REDIS:
+        return RedisResponseCache(settings.redis_url)
+    return None
+
+
+async def invalidate_responses(*tags: str) -> None:
+    """Makes cached responses containing the models stale.
+
+    Objects loaded by the request before the change are forgotten as well.
+
+    Args:
+        tags (str): Names of changed models.
+    """
+
+    get_loader().clear()
+    cache = get_response_cache()
+    if cache is None:
+        return
+
+    await cache.invalidate(*tags)
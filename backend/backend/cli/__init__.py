@@ -1,5 +1,19 @@
+from backend.cli.benchmark import (
+    benchmark_endpoints,
+    benchmark_serialization,
+    seed_benchmark_catalog,
+)
+from backend.cli.importer import import_file
+from backend.cli.indexes import check_indexes
 from backend.cli.primary_user import create_primary_user
+from backend.cli.statistics import rebuild_statistics
 
 __all__ = [
     "create_primary_user",
+    "rebuild_statistics",
+    "import_file",
+    "check_indexes",
+    "benchmark_serialization",
+    "seed_benchmark_catalog",
+    "benchmark_endpoints",
 ]
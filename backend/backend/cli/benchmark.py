@@ -0,0 +1,300 @@
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Coroutine, Optional
+
+import typer
+from fastapi import FastAPI
+from fastapi.responses import UJSONResponse
+from fastapi.routing import serialize_response
+from pydantic import BaseModel
+from tortoise import Tortoise
+
+from backend.benchmarks import (
+    ScenarioResult,
+    SeedSize,
+    get_counting_config,
+    get_scenarios,
+    get_seed_size,
+    run_scenario,
+    seed_catalog,
+    seeded_id,
+)
+from backend.cache import get_response_cache
+from backend.custom_types import ResponseCacheType
+from backend.db.config import TORTOISE_CONFIG
+from backend.db.dao import GameDAO, UserDAO
+from backend.db.dao.base import BaseDAO
+from backend.security import create_access_token
+from backend.settings import settings
+from backend.web.responses import ORJSONResponse, ORJSONRoute, orjson
+
+# Latency growth below it is noise, whatever the tolerance is
+LATENCY_SLACK_MS = 1
+
+
+def get_route(app: FastAPI, path: str) -> ORJSONRoute:
+    return next(
+        route
+        for route in app.routes
+        if isinstance(route, ORJSONRoute)
+        and route.path == path
+        and "GET" in route.methods
+    )
+
+
+async def measure(
+    serialize: Callable[[], Coroutine[Any, Any, Any]],
+    repeat: int,
+) -> float:
+    """Measure CPU time of serializing a response.
+
+    Args:
+        serialize (Callable[[], Coroutine[Any, Any, Any]]): Serializes once.
+        repeat (int): Amount of runs.
+
+    Returns:
+        float: Milliseconds of CPU time per run.
+    """
+
+    start = time.process_time()
+    for _ in range(repeat):
+        await serialize()
+    return (time.process_time() - start) * 1000 / repeat
+
+
+async def measure_route(
+    route: ORJSONRoute,
+    content: list[Any],
+    repeat: int,
+) -> None:
+    """Compare FastAPI serialization of the list with the orjson one.
+
+    Args:
+        route (ORJSONRoute): Route of the list.
+        content (list[Any]): Objects or models the endpoint returns.
+        repeat (int): Amount of runs.
+    """
+
+    async def serialize_by_fastapi() -> bytes:
+        data = await serialize_response(
+            field=route.secure_cloned_response_field,
+            response_content=content,
+            include=route.response_model_include,
+            exclude=route.response_model_exclude,
+            by_alias=route.response_model_by_alias,
+            exclude_unset=route.response_model_exclude_unset,
+            exclude_defaults=route.response_model_exclude_defaults,
+            exclude_none=route.response_model_exclude_none,
+        )
+        return UJSONResponse(data).body
+
+    async def serialize_by_orjson() -> bytes:
+        return ORJSONResponse(route.serialize(content)).body
+
+    fastapi_time = await measure(serialize_by_fastapi, repeat)
+    orjson_time = await measure(serialize_by_orjson, repeat)
+    saved = 100 * (1 - orjson_time / fastapi_time)
+    kind = "models" if isinstance(content[0], BaseModel) else "objects"
+    typer.echo(
+        f"{route.path} {len(content)} {kind}: "
+        f"FastAPI {fastapi_time:.2f} ms, orjson {orjson_time:.2f} ms, "
+        f"{saved:.0f}% saved",
+    )
+
+
+def get_models(route: ORJSONRoute, objects: list[Any]) -> list[BaseModel]:
+    """Validate objects against the response model of the list route.
+
+    Args:
+        route (ORJSONRoute): Route of the list.
+        objects (list[Any]): Objects.
+
+    Returns:
+        list[BaseModel]: Instances of the response model.
+    """
+
+    if route.response_field is None:
+        return []
+    return [route.response_field.type_.from_orm(obj) for obj in objects]
+
+
+async def benchmark_serialization(limit: int, repeat: int) -> None:
+    if orjson is None:
+        typer.echo("orjson isn't installed.")
+        raise typer.Exit(1)
+
+    # Imported here, so other commands don't build the application
+    from backend.web.application import app  # noqa: WPS433
+
+    daos: tuple[tuple[str, BaseDAO[Any]], ...] = (
+        ("/api/games/", GameDAO()),
+        ("/api/users/", UserDAO()),
+    )
+    await Tortoise.init(config=TORTOISE_CONFIG)
+    try:
+        for path, dao in daos:
+            objects = await dao.get_multi(limit=limit)
+            if not objects:
+                typer.echo(f"{path}: nothing to serialize.")
+                continue
+
+            route = get_route(app, path)
+            await measure_route(route, objects, repeat)
+            # Endpoints returning already validated models skip validation
+            await measure_route(route, get_models(route, objects), repeat)
+    finally:
+        await Tortoise.close_connections()
+
+
+async def seed_benchmark_catalog(size: SeedSize) -> None:
+    try:
+        size.validate()
+    except ValueError as error:
+        typer.echo(f"{error}.")
+        raise typer.Exit(1)
+
+    await Tortoise.init(config=TORTOISE_CONFIG)
+    try:
+        start = time.perf_counter()
+        await seed_catalog(size)
+    finally:
+        await Tortoise.close_connections()
+    typer.echo(f"Seeded {size} in {time.perf_counter() - start:.0f}s.")
+
+
+def echo_results(results: list[ScenarioResult]) -> None:
+    typer.echo(
+        f"{'router':<10} {'scenario':<24} {'requests':>8} {'errors':>6} "
+        f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} "
+        f"{'queries':>7} {'rows':>8}",
+    )
+    for result in results:
+        typer.echo(
+            f"{result.router:<10} {result.name:<24} {result.requests:>8} "
+            f"{result.errors:>6} {result.p50:>8.1f} {result.p90:>8.1f} "
+            f"{result.p99:>8.1f} {result.maximum:>8.1f} "
+            f"{result.queries:>7.1f} {result.rows:>8.1f}",
+        )
+
+
+def get_regressions(
+    results: list[ScenarioResult],
+    baseline: list[ScenarioResult],
+    tolerance: float,
+) -> list[str]:
+    """Compare results with the ones of an earlier run.
+
+    Args:
+        results (list[ScenarioResult]): Results.
+        baseline (list[ScenarioResult]): Results of the earlier run.
+        tolerance (float): Share p90 latency may grow by, e.g. 0.2.
+
+    Returns:
+        list[str]: Descriptions of the regressions.
+    """
+
+    earlier = {(result.router, result.name): result for result in baseline}
+    regressions = []
+    for result in results:
+        base = earlier.get((result.router, result.name))
+        if base is None:
+            continue
+        name = f"{result.router} {result.name}"
+        if result.errors > base.errors:
+            regressions.append(f"{name}: {result.errors} errors, {base.errors} before")
+        if result.queries > base.queries:
+            regressions.append(
+                f"{name}: {result.queries:.1f} queries, {base.queries:.1f} before",
+            )
+        if result.p90 > base.p90 * (1 + tolerance) + LATENCY_SLACK_MS:
+            regressions.append(
+                f"{name}: p90 {result.p90:.1f} ms, {base.p90:.1f} ms before",
+            )
+    return regressions
+
+
+async def run_scenarios(
+    routers: Optional[list[str]],
+    requests: int,
+    concurrency: int,
+    warmup: int,
+) -> list[ScenarioResult]:
+    """Run scenarios of the routers against the seeded catalog.
+
+    Args:
+        routers (Optional[list[str]]): Routers to measure, all if None.
+        requests (int): Amount of requests of a scenario.
+        concurrency (int): Amount of concurrent clients.
+        warmup (int): Amount of requests before measuring.
+
+    Returns:
+        list[ScenarioResult]: Results.
+    """
+
+    # Imported here, so other commands don't build the application
+    from backend.web.application import app  # noqa: WPS433
+
+    await Tortoise.init(config=get_counting_config())
+    try:
+        size = await get_seed_size()
+        token = create_access_token(str(seeded_id("user", 0)))
+        headers = {"Authorization": f"Bearer {token}"}
+        return [
+            await run_scenario(app, scenario, headers, requests, concurrency, warmup)
+            for scenario in get_scenarios(size)
+            if not routers or scenario.router in routers
+        ]
+    finally:
+        await Tortoise.close_connections()
+
+
+def check_regressions(
+    results: list[ScenarioResult],
+    baseline: Path,
+    tolerance: float,
+) -> None:
+    """Fail if the results regressed against the saved ones.
+
+    Args:
+        results (list[ScenarioResult]): Results.
+        baseline (Path): Results saved by an earlier run.
+        tolerance (float): Share p90 latency may grow by.
+
+    Raises:
+        Exit: Some scenario regressed.
+    """
+
+    regressions = get_regressions(
+        results,
+        [ScenarioResult(**row) for row in json.loads(baseline.read_text())],
+        tolerance,
+    )
+    for regression in regressions:
+        typer.echo(f"Regression in {regression}.")
+    if regressions:
+        raise typer.Exit(1)
+
+
+async def benchmark_endpoints(
+    routers: Optional[list[str]],
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    cache: bool,
+    output: Optional[Path],
+    baseline: Optional[Path],
+    tolerance: float,
+) -> None:
+    if not cache:
+        settings.response_cache = ResponseCacheType.NONE
+        get_response_cache.cache_clear()
+
+    results = await run_scenarios(routers, requests, concurrency, warmup)
+    echo_results(results)
+    if output is not None:
+        output.write_text(
+            json.dumps([result._asdict() for result in results], indent=2),
+        )
+    if baseline is not None:
+        check_regressions(results, baseline, tolerance)
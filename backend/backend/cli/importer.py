@@ -0,0 +1,39 @@
+from pathlib import Path
+from typing import Optional
+
+import typer
+from tortoise import Tortoise
+
+from backend.cache import invalidate_responses
+from backend.custom_types import ImportFormat, ImportKind
+from backend.db.config import TORTOISE_CONFIG
+from backend.db.dao import StatisticsDAO
+from backend.exceptions import ImportException
+from backend.services.importer import import_rows, read_rows
+
+
+async def import_file(
+    kind: ImportKind,
+    path: Path,
+    file_format: Optional[ImportFormat] = None,
+) -> None:
+    if file_format is None:
+        suffix = path.suffix.lstrip(".").lower()
+        file_format = ImportFormat.CSV if suffix == "csv" else ImportFormat.NDJSON
+
+    await Tortoise.init(config=TORTOISE_CONFIG)
+    try:
+        result = await import_rows(kind, read_rows(path, file_format))
+        # Merged rows bypass DAOs, so the counters are recomputed
+        await StatisticsDAO().rebuild()
+        # Every model's counters are recomputed
+        await invalidate_responses(*Tortoise.apps["models"])
+    except ImportException as error:
+        typer.echo(f"Import failed. {error}", err=True)
+        raise typer.Exit(1)
+    finally:
+        await Tortoise.close_connections()
+    typer.echo(
+        f"Imported {kind.value}: {result.created} created, "
+        f"{result.updated} updated, {result.skipped} skipped.",
+    )
@@ -0,0 +1,41 @@
+from typing import Collection
+
+import typer
+from tortoise import Tortoise, connections
+from tortoise.backends.base.client import BaseDBAsyncClient
+
+from backend.db.config import TORTOISE_CONFIG
+from backend.db.indexes import RequiredIndex, create_index, get_missing_indexes
+from backend.db.routing import PRIMARY_CONNECTION
+
+
+async def report_index(
+    db: BaseDBAsyncClient,
+    index: RequiredIndex,
+    create: bool,
+    invalid: Collection[str],
+) -> None:
+    columns = ", ".join(index.columns)
+    kind = "primary key" if index.primary else f"{index.method} index"
+    typer.echo(f"Missing {kind} {index.table} ({columns}): {index.reason}.")
+    if create:
+        await create_index(db, index, invalid)
+        typer.echo(f"Created {index.name}.")
+
+
+async def check_indexes(create: bool = False) -> None:
+    await Tortoise.init(config=TORTOISE_CONFIG)
+    try:
+        db = connections.get(PRIMARY_CONNECTION)
+        missing, invalid = await get_missing_indexes(db)
+        for name in invalid:
+            typer.echo(f"Invalid index {name}, left by a failed creation.")
+        for index in missing:
+            await report_index(db, index, create, invalid)
+    finally:
+        await Tortoise.close_connections()
+
+    if not missing:
+        typer.echo("All required indexes exist.")
+    elif not create:
+        raise typer.Exit(1)
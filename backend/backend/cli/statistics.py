@@ -0,0 +1,17 @@
+import typer
+from tortoise import Tortoise
+
+from backend.cache import invalidate_responses
+from backend.db.config import TORTOISE_CONFIG
+from backend.db.dao import StatisticsDAO
+
+
+async def rebuild_statistics() -> None:
+    await Tortoise.init(config=TORTOISE_CONFIG)
+    try:
+        await StatisticsDAO().rebuild()
+        # Every model's counters are recomputed
+        await invalidate_responses(*Tortoise.apps["models"])
+    finally:
+        await Tortoise.close_connections()
+    typer.echo("Statistics rebuilt successfully.")
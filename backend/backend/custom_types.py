@@ -1,8 +1,13 @@
+import inspect
 from enum import Enum
-from typing import Optional
+from typing import Any, Optional
+from uuid import UUID
 
 from fastapi import Query
 from pydantic import AnyHttpUrl, BaseModel
+from pydantic.utils import GetterDict
+from tortoise.fields.relational import ReverseRelation
+from tortoise.models import Model
 
 
 class UserOrderColumns(str, Enum):
@@ -61,10 +66,72 @@ class SaleOrderColumns(str, Enum):
 class BackupOrderColumns(str, Enum):
     TITLE = "title"
     URL = "url"
+    FORMAT = "format"
+    SIZE = "size"
     CREATED_AT = "created_at"
     CREATED_BY_USER__USERNAME = "created_by_user"
 
 
+class CountStrategy(str, Enum):
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    CACHED = "cached"
+
+
+class BackupFormat(str, Enum):
+    CUSTOM = "custom"
+    DIRECTORY = "directory"
+
+    @property
+    def extension(self) -> str:
+        """Extension of the uploaded file, directory dumps are packed to tar."""
+
+        return ".tar" if self == BackupFormat.DIRECTORY else ".dump"
+
+
+class BackupStorageType(str, Enum):
+    CLOUDINARY = "cloudinary"
+    LOCAL = "local"
+
+
+class ResponseCacheType(str, Enum):
+    NONE = "none"
+    MEMORY = "memory"
+    REDIS = "redis"
+
+
+class SearchKind(str, Enum):
+    GAME = "game"
+    COMPANY = "company"
+    GENRE = "genre"
+    PLATFORM = "platform"
+
+
+class ImportKind(str, Enum):
+    COMPANIES = "companies"
+    PLATFORMS = "platforms"
+    GENRES = "genres"
+    GAMES = "games"
+    SALES = "sales"
+
+
+class ImportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
 class CloudinaryResponse(BaseModel):
     url: AnyHttpUrl
     original_filename: str
@@ -73,3 +140,30 @@ class CloudinaryResponse(BaseModel):
 class CommonQueries(BaseModel):
     skip: Optional[int] = Query(0, ge=0)
     limit: Optional[int] = Query(100, ge=1)
+    cursor: Optional[str] = Query(None, regex=r"^[\w\-]*$")
+    count: bool = True
+
+
+class BulkRowError(BaseModel):
+    index: int
+    detail: str
+
+
+class BulkResult(BaseModel):
+    created: int
+    updated: int
+    # Ids in order of the rows, None for the failed ones
+    ids: list[Optional[UUID]]
+    errors: list[BulkRowError]
+
+
+class PrefetchedGetterDict(GetterDict):
+    """Reads ORM objects leaving relations which weren't fetched unset."""
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        value = getattr(self._obj, key, default)
+        if isinstance(value, ReverseRelation):
+            return value if value._fetched else default
+        if inspect.isawaitable(value) and not isinstance(value, Model):
+            return default
+        return value
@@ -1,19 +1,75 @@
+from typing import Any
+
+from backend.db.routing import PRIMARY_CONNECTION, REPLICA_CONNECTION
 from backend.settings import settings
 
 MODELS_PATH = "backend.db.models."
 MODELS_MODULES: list[str] = [  # noqa: WPS407
     MODELS_PATH + model
-    for model in ["user", "company", "platform", "genre", "game", "sale", "backup"]
+    for model in [
+        "user",
+        "company",
+        "platform",
+        "genre",
+        "game",
+        "sale",
+        "backup",
+        "backup_job",
+        "game_statistics",
+        "company_foundation_statistics",
+        "user_creation_statistics",
+        "user_role_statistics",
+    ]
 ]
 
+
+def get_connection_config(host: str, port: int) -> dict[str, Any]:
+    """Build config of a connection to the database on the given server.
+
+    Args:
+        host (str): Database host.
+        port (int): Database port.
+
+    Returns:
+        dict[str, Any]: Connection config.
+    """
+
+    return {
+        "engine": "tortoise.backends.asyncpg",
+        "credentials": {
+            "host": host,
+            "port": port,
+            "user": settings.db_user,
+            "password": settings.db_pass,
+            "database": settings.db_base,
+            "minsize": settings.db_pool_min_size,
+            "maxsize": settings.db_pool_max_size,
+            "max_inactive_connection_lifetime": (
+                settings.db_pool_max_inactive_lifetime
+            ),
+            "statement_cache_size": settings.db_statement_cache_size,
+            "server_settings": {
+                "statement_timeout": str(settings.db_statement_timeout),
+            },
+        },
+    }
+
+
+CONNECTIONS = {
+    PRIMARY_CONNECTION: get_connection_config(settings.db_host, settings.db_port),
+}
+if settings.db_replica_host is not None:
+    CONNECTIONS[REPLICA_CONNECTION] = get_connection_config(
+        settings.db_replica_host,
+        settings.db_replica_port,
+    )
+
 TORTOISE_CONFIG = {  # noqa: WPS407
-    "connections": {
-        "default": str(settings.db_url),
-    },
+    "connections": CONNECTIONS,
     "apps": {
         "models": {
             "models": MODELS_MODULES + ["aerich.models"],
-            "default_connection": "default",
+            "default_connection": PRIMARY_CONNECTION,
         },
     },
 }
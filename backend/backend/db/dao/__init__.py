@@ -3,7 +3,9 @@ from backend.db.dao.company import CompanyDAO
 from backend.db.dao.game import GameDAO
 from backend.db.dao.genre import GenreDAO
 from backend.db.dao.platform import PlatformDAO
-from backend.db.dao.user import UserDAO
+from backend.db.dao.search import SearchDAO
+from backend.db.dao.statistics import StatisticsDAO
+from backend.db.dao.user import Principal, UserDAO
 
 __all__ = [
     "UserDAO",
@@ -12,4 +14,7 @@ __all__ = [
     "GenreDAO",
     "GameDAO",
     "BackupDAO",
+    "Principal",
+    "StatisticsDAO",
+    "SearchDAO",
 ]
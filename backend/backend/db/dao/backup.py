@@ -1,6 +1,7 @@
 import logging
 from datetime import datetime
 
+from backend.custom_types import BackupFormat
 from backend.db import models
 from backend.db.dao.base import BaseDAO
 from backend.exceptions import ObjectNotFoundException
@@ -16,35 +17,41 @@ class BackupDAO(BaseDAO[models.Backup]):
         ]
 
     async def delete_multi(self, backup_ids: list[str]) -> list[str]:
-        delete_titles: list[str] = []
-        for backup_id in backup_ids:
-            backup = await self.get(backup_id)
-            if backup:
-                delete_titles.append(backup.title)
-                await backup.delete()
+        """Deletes backups by a single statement.
 
-        return delete_titles
+        Args:
+            backup_ids (list[str]): Backups ids, missing ones are skipped.
+
+        Returns:
+            list[str]: File names of deleted backups.
+        """
+
+        rows = await self.model._meta.db.execute_query_dict(
+            'DELETE FROM "backup" WHERE "id" = ANY($1::uuid[]) '
+            'RETURNING "title", "format"',
+            [backup_ids],
+        )
+        logger.debug(f"Deleted {len(rows)} backups")
+        return [row["title"] + BackupFormat(row["format"]).extension for row in rows]
 
     async def delete(self, backup_id: str) -> str:
-        backup = await self.get(backup_id)
-        if not backup:
+        filenames = await self.delete_multi([backup_id])
+        if not filenames:
             logger.error(f"Backup {backup_id} not found")
             raise ObjectNotFoundException(backup_id)
 
-        title = backup.title
-        await backup.delete()
         logger.debug(f"Deleted backup {backup_id}")
-        return title
+        return filenames[0]
 
     async def get_last(self, created_at: datetime) -> list[str]:
-        """Returns backups titles, which were created after given date.
+        """Returns backups file names, which were created after given date.
 
         Args:
             created_at (datetime): Date.
 
         Returns:
-            list[str]: List of backups titles.
+            list[str]: List of backups file names.
         """
 
         backups = await self.model.filter(created_at__gt=created_at)
-        return [backup.title for backup in backups]
+        return [backup.filename for backup in backups]
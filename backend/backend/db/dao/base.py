@@ -1,19 +1,220 @@
+import asyncio
+import base64
+import binascii
+import datetime
+import json
 import logging
-from typing import Any, Generic, Optional, Type, TypeVar
-
+import time
+import uuid
+from typing import (
+    Any,
+    Awaitable,
+    Collection,
+    Generic,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+    cast,
+)
+
+from tortoise import fields
+from tortoise.expressions import Q, RawSQL
+from tortoise.fields.relational import (
+    ForeignKeyFieldInstance,
+    ManyToManyFieldInstance,
+    RelationalField,
+)
 from tortoise.functions import Count
 from tortoise.models import Model
+from tortoise.queryset import QuerySet
+from tortoise.transactions import in_transaction
 
-from backend.exceptions import ObjectNotFoundException
+from backend.cache import invalidate_responses
+from backend.custom_types import CountStrategy
+from backend.db.dao.documents import DocumentSpec
+from backend.db.loader import get_loader
+from backend.db.routing import PRIMARY_CONNECTION, get_read_db
+from backend.exceptions import InvalidCursorException, ObjectNotFoundException
+from backend.settings import settings
 
 logger = logging.getLogger(__name__)
 ModelType = TypeVar("ModelType", bound=Model)
+# Objects or JSON documents of a page
+PageType = TypeVar("PageType", bound=Sequence[Any])
+
+COUNT_CACHE_SIZE = 1024
+# (DAO name, filter expression) -> (expiration time, amount)
+_count_cache: dict[tuple[str, str], tuple[float, int]] = {}
+
+
+class JSONDocument(NamedTuple):
+    """Object serialized to JSON by the database."""
+
+    id: uuid.UUID
+    document: str
+    # Values of the order columns, which cursors are built from
+    sort_values: tuple[Any, ...] = ()
+
+
+class BulkRow(NamedTuple):
+    """Outcome of a row of a bulk operation."""
+
+    # Position of the row in the request
+    row_index: int
+    id: Optional[uuid.UUID] = None
+    created: bool = False
+    error: Optional[str] = None
+
+
+class RelationChanges(NamedTuple):
+    """Links added to and removed from a many-to-many relation."""
+
+    # (owner ID, related object ID) pairs
+    added: list[tuple[uuid.UUID, uuid.UUID]]
+    removed: list[tuple[uuid.UUID, uuid.UUID]]
+
+
+def _serialize_cursor_value(value: Any) -> str:
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Can't serialize {type(value).__name__} into cursor")
+
+
+def encode_cursor(sort: list[str], values: list[Any]) -> str:
+    """Encode sort columns and values of the last row into an opaque cursor.
+
+    Args:
+        sort (list[str]): Resolved order columns.
+        values (list[Any]): Values of the order columns.
+
+    Returns:
+        str: Cursor.
+    """
+
+    payload = json.dumps(
+        {"sort": sort, "values": values},
+        default=_serialize_cursor_value,
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: list[str]) -> list[Any]:
+    """Decode cursor and check that it was issued for the same order.
+
+    Args:
+        cursor (str): Cursor. Empty string means the first page.
+        sort (list[str]): Resolved order columns.
+
+    Raises:
+        InvalidCursorException: Cursor is malformed or issued for other order.
+
+    Returns:
+        list[Any]: Values of the order columns. Empty for the first page.
+    """
+
+    if not cursor:
+        return []
+
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        cursor_sort, values = payload["sort"], payload["values"]
+    except (binascii.Error, ValueError, TypeError, KeyError) as error:
+        raise InvalidCursorException("Malformed cursor") from error
+
+    if cursor_sort != sort or not isinstance(values, list) or len(values) != len(sort):
+        raise InvalidCursorException("Cursor doesn't match the sort order")
+    return values
+
+
+def lookup_filter(path: str, value: Any) -> Q:
+    """Build filter of a single lookup, e.g. ``title__gt``.
+
+    Args:
+        path (str): Field path and lookup.
+        value (Any): Value.
+
+    Returns:
+        Q: Filter expression.
+    """
+
+    lookup: dict[str, Any] = {path: value}
+    return Q(**lookup)
+
+
+def get_sort_fields(sort: list[str]) -> list[str]:
+    """Get names the values of the order columns are selected as.
+
+    Columns of related objects are selected by annotations, see
+    ``BaseDAO._get_related_sorts``.
+
+    Args:
+        sort (list[str]): Resolved order columns.
+
+    Returns:
+        list[str]: Fields and annotations.
+    """
+
+    fields = [column.lstrip("-") for column in sort]
+    return [
+        f"sort_{field.replace('__', '_')}" if "__" in field else field
+        for field in fields
+    ]
+
+
+def get_delete_tags(model: Type[Model]) -> list[str]:
+    """Get names of the models changed by deleting objects of a model.
+
+    Rows referencing the deleted ones are deleted by ``ON DELETE CASCADE``,
+    recursively, or have their foreign keys set to NULL. Counters of the
+    objects the deleted rows reference or are linked to are updated by
+    triggers.
+
+    Args:
+        model (Type[Model]): Model of the deleted objects.
+
+    Returns:
+        list[str]: Model names.
+    """
+
+    tags: set[str] = set()
+    deleted: list[Type[Model]] = [model]
+    while deleted:
+        current = deleted.pop()
+        if current.__name__ in tags:
+            continue
+        tags.add(current.__name__)
+        meta = current._meta
+        for name in meta.fk_fields | meta.o2o_fields | meta.m2m_fields:
+            related = cast(RelationalField[Model], meta.fields_map[name])
+            tags.add(related.related_model.__name__)
+        for name in meta.backward_fk_fields | meta.backward_o2o_fields:
+            backward = cast(RelationalField[Model], meta.fields_map[name])
+            source = backward.related_model._meta.fields_map[
+                cast(Any, backward).relation_field
+            ]
+            foreign_key = cast(ForeignKeyFieldInstance[Model], source.reference)
+            if foreign_key.on_delete == fields.CASCADE:
+                deleted.append(backward.related_model)
+            else:
+                tags.add(backward.related_model.__name__)
+    return sorted(tags)
 
 
 class BaseDAO(Generic[ModelType]):
     def __init__(self, model: Type[ModelType]) -> None:
         self.__model = model
         self.related: list[str] = []
+        self.export_columns: tuple[str, ...] = ()
+        # Shape of the JSON documents, None if they aren't served
+        self.document: Optional[DocumentSpec] = None
+        self.count_strategy = settings.count_strategy
+        self._delete_tags: Optional[list[str]] = None
 
     @property
     def name(self) -> str:
@@ -23,11 +224,171 @@ class BaseDAO(Generic[ModelType]):
     def model(self) -> Type[ModelType]:
         return self.__model
 
-    async def get_count(self, expr: Optional[dict[str, Any]] = None) -> int:
+    @property
+    def cache_tags(self) -> list[str]:
+        """Names of the model and models of its loaded relations.
+
+        Cached responses of the DAO's objects are stale once any of them
+        changes.
+        """
+
+        tags = {self.name}
+        for path in self.related:
+            model = self.__model
+            for field in path.split("__"):
+                relation = model._meta.fields_map[field]
+                model = cast(RelationalField[ModelType], relation).related_model
+                tags.add(model.__name__)
+        return sorted(tags)
+
+    @property
+    def delete_tags(self) -> list[str]:
+        """Names of the models changed by deleting the DAO's objects.
+
+        Computed once, after the models are initialized, see
+        ``get_delete_tags``.
+        """
+
+        if self._delete_tags is None:
+            self._delete_tags = get_delete_tags(self.__model)
+        return self._delete_tags
+
+    def _resolve_sort(
+        self,
+        sort: Optional[list[str]],
+    ) -> tuple[list[str], dict[str, Count]]:
+        """Replace to-many order columns with their counters.
+
+        Relations without a ``<field>_count`` counter column are counted by
+        ``Count`` annotations, which group the whole joined relation.
+
+        Args:
+            sort (Optional[list[str]]): Order columns.
+
+        Returns:
+            tuple[list[str], dict[str, Count]]: Order columns and annotations.
+        """
+
+        sort = list(sort or [])
+        count_sorts: dict[str, Count] = {}
+        abs_sort = [x.lstrip("-") for x in sort]
+        for field in self.__model._meta.fetch_fields - self.__model._meta.fk_fields:
+            try:
+                i = abs_sort.index(field)
+            except ValueError:
+                continue
+            sort[i] += "_count"
+            if f"{field}_count" not in self.__model._meta.fields_map:
+                count_sorts[sort[i].lstrip("-")] = Count(field)
+
+        return sort, count_sorts
+
+    def _get_related_sorts(self, sort: list[str]) -> dict[str, RawSQL]:
+        """Select order columns of related objects, which cursors are built from.
+
+        Each column is selected by a subquery correlated by ``id``, joining
+        the foreign keys on its path.
+
+        Args:
+            sort (list[str]): Resolved order columns.
+
+        Returns:
+            dict[str, RawSQL]: Annotations named by ``get_sort_fields``.
+        """
+
+        table = self.__model._meta.db_table
+        annotations = {}
+        for column, name in zip(sort, get_sort_fields(sort)):
+            *relations, field_name = column.lstrip("-").split("__")
+            if not relations:
+                continue
+
+            model: Type[Model] = self.__model
+            joins = []
+            for index, relation in enumerate(relations, start=1):
+                field = cast(RelationalField[Model], model._meta.fields_map[relation])
+                model = field.related_model
+                joins.append(
+                    f'JOIN "{model._meta.db_table}" sort{index} '
+                    f'ON sort{index}."{model._meta.db_pk_column}" = '
+                    f'sort{index - 1}."{field.source_field}"',
+                )
+            source_field = model._meta.fields_map[field_name].source_field
+            annotations[name] = RawSQL(
+                f'(SELECT sort{len(relations)}."{source_field or field_name}" '
+                f'FROM "{table}" sort0 {" ".join(joins)} '
+                f'WHERE sort0."id" = "{table}"."id")',
+            )
+        return annotations
+
+    def _is_nullable(self, field_path: str) -> bool:
+        """Check whether a (related) field can hold NULL.
+
+        Args:
+            field_path (str): Field name, e.g. ``created_by_user__username``.
+
+        Returns:
+            bool: True if the field or any foreign key on its path is nullable.
+        """
+
+        model: Type[Model] = self.__model
+        for name in field_path.split("__"):
+            field = model._meta.fields_map.get(name)
+            if field is None:
+                return False
+            if field.null:
+                return True
+            model = getattr(field, "related_model", None) or model
+        return False
+
+    def _get_keyset_filter(self, sort: list[str], values: list[Any]) -> Q:
+        """Build a filter that selects rows ordered after the cursor row.
+
+        Rows ordered by ``(a, b, id)`` follow ``(x, y, z)`` when
+        ``a > x OR (a = x AND b > y) OR (a = x AND b = y AND id > z)``.
+        Comparisons are flipped for descending columns, and NULLs are
+        placed the way Postgres orders them: last ascending, first descending.
+
+        Args:
+            sort (list[str]): Resolved order columns ending with ``id``.
+            values (list[Any]): Values of the order columns of the cursor row.
+
+        Returns:
+            Q: Filter expression.
+        """
+
+        conditions: list[Q] = []
+        equal: list[Q] = []
+        for column, value in zip(sort, values):
+            field = column.lstrip("-")
+            descending = column.startswith("-")
+            if value is None:
+                after = lookup_filter(f"{field}__isnull", False) if descending else None
+                same = lookup_filter(f"{field}__isnull", True)
+            else:
+                lookup = "lt" if descending else "gt"
+                after = lookup_filter(f"{field}__{lookup}", value)
+                if not descending and self._is_nullable(field):
+                    after |= lookup_filter(f"{field}__isnull", True)
+                same = lookup_filter(field, value)
+
+            if after is not None:
+                conditions.append(Q(*equal, after))
+            equal.append(same)
+
+        return Q(*conditions, join_type="OR")
+
+    async def get_count(
+        self,
+        expr: Optional[dict[str, Any]] = None,
+        strategy: Optional[CountStrategy] = None,
+    ) -> int:
         """Get amount of objects.
 
         Args:
             expr (dict): Filter expression.
+            strategy (Optional[CountStrategy]): Counting strategy.
+                Defaults to the DAO's one.
 
         Returns:
             int: Amount of objects.
@@ -36,76 +397,515 @@ class BaseDAO(Generic[ModelType]):
         if expr is None:
             expr = {}
 
-        amount = await self.__model.filter(**expr).count()
+        strategy = strategy or self.count_strategy
+        if strategy == CountStrategy.ESTIMATED and not expr:
+            amount = await self._get_estimated_count()
+        elif strategy == CountStrategy.CACHED:
+            amount = await self._get_cached_count(expr)
+        else:
+            amount = await self.__model.filter(**expr).using_db(get_read_db()).count()
 
         logger.debug(f"Got amount of {self.name.lower()} {amount}")
         return amount
 
-    async def get(self, obj_id: str) -> ModelType | None:
+    async def _get_estimated_count(self) -> int:
+        """Get amount of objects from planner statistics of the table.
+
+        Falls back to the exact count if the table hasn't been analyzed yet.
+
+        Returns:
+            int: Estimated amount of objects.
+        """
+
+        db = get_read_db()
+        rows = await db.execute_query_dict(
+            "SELECT reltuples::bigint AS estimate FROM pg_class "
+            "WHERE oid = to_regclass($1)",
+            [f'"{self.__model._meta.db_table}"'],
+        )
+        if not rows or rows[0]["estimate"] <= 0:
+            return await self.__model.all().using_db(db).count()
+        return int(rows[0]["estimate"])
+
+    async def _get_cached_count(self, expr: dict[str, Any]) -> int:
+        """Get amount of objects, cached per filter expression.
+
+        Args:
+            expr (dict): Filter expression.
+
+        Returns:
+            int: Amount of objects, at most ``count_cache_ttl`` seconds old.
+        """
+
+        key = (self.name, json.dumps(expr, sort_keys=True, default=str))
+        now = time.monotonic()
+        cached = _count_cache.pop(key, None)
+        if cached is not None and cached[0] > now:
+            _count_cache[key] = cached
+            return cached[1]
+
+        amount = await self.__model.filter(**expr).using_db(get_read_db()).count()
+        if len(_count_cache) >= COUNT_CACHE_SIZE:
+            _count_cache.pop(next(iter(_count_cache)))
+        _count_cache[key] = (now + settings.count_cache_ttl, amount)
+        return amount
+
+    def get_related(self, include: Optional[list[str]] = None) -> list[str]:
+        """Get prefetch paths of the included relations.
+
+        Args:
+            include (Optional[list[str]]): Top-level relations to load.
+                All relations are loaded if None.
+
+        Returns:
+            list[str]: Prefetch paths.
+        """
+
+        if include is None:
+            return self.related
+        return [path for path in self.related if path.split("__")[0] in include]
+
+    async def get(
+        self,
+        obj_id: str,
+        include: Optional[list[str]] = None,
+    ) -> ModelType | None:
         """Get object by id.
 
         Args:
             obj_id (str): ID of object to get.
+            include (Optional[list[str]]): Relations to load. All if None.
 
         Returns:
             ModelType | None: ModelType object.
         """
 
-        db_obj = await self.__model.get_or_none(id=obj_id).prefetch_related(
-            *self.related
+        db_obj = (
+            await self.__model.filter(id=obj_id).using_db(get_read_db()).first()
         )
 
         if db_obj is not None:
-            logger.debug(f"Got {self.name.lower()} {db_obj.id}")
+            await get_loader().load_related([db_obj], self.get_related(include))
+            logger.debug(f"Got {self.name.lower()} {obj_id}")
 
         return db_obj
 
-    async def get_multi(
+    def _get_multi_query(
         self,
         expr: Optional[dict[str, Any]] = None,
         offset: Optional[int] = 0,
         limit: Optional[int] = 100,
         sort: Optional[list[str]] = None,
-    ) -> list[ModelType]:
-        """Get multiple objects ordered by the given orders.
+        cursor: Optional[str] = None,
+    ) -> QuerySet[ModelType]:
+        """Build query selecting a page of objects.
 
         Args:
-            expr (Optional[dict]): SQLAlchemy expression.
-            offset (Optional[int]): Offset.
+            expr (Optional[dict]): Filter expression.
+            offset (Optional[int]): Offset. Ignored if cursor is given.
             limit (Optional[int]): Limit.
             sort (Optional[list[str]]): Order columns.
+            cursor (Optional[str]): Cursor. Empty string means the first page.
 
         Returns:
-            list[ModelType]: Objects.
+            QuerySet[ModelType]: Query.
         """
 
         if expr is None:
             expr = {}
 
-        count_sorts: dict[str, Count] = {}
-        abs_sort = [x.lstrip("-") for x in sort]
-        for field in self.__model._meta.fetch_fields - self.__model._meta.fk_fields:
-            try:
-                i = abs_sort.index(field)
-            except ValueError:
-                continue
-            sort[i] += "_count"
-            count_sorts[sort[i].lstrip("-")] = Count(field)
-
+        sort, count_sorts = self._resolve_sort(sort)
         stmt = (
             self.__model.filter(**expr)
-            .offset(offset)
-            .limit(limit)
+            .using_db(get_read_db())
             .annotate(**count_sorts)
-            .order_by(*sort)
-            .prefetch_related(*self.related)
         )
+        if cursor is None:
+            stmt = stmt.offset(offset or 0)
+        else:
+            sort.append("id")
+            values = decode_cursor(cursor, sort)
+            if values:
+                stmt = stmt.filter(self._get_keyset_filter(sort, values))
+            stmt = stmt.annotate(**self._get_related_sorts(sort))
+
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return stmt.order_by(*sort)
+
+    async def get_multi(
+        self,
+        expr: Optional[dict[str, Any]] = None,
+        offset: Optional[int] = 0,
+        limit: Optional[int] = 100,
+        sort: Optional[list[str]] = None,
+        cursor: Optional[str] = None,
+        include: Optional[list[str]] = None,
+    ) -> list[ModelType]:
+        """Get multiple objects ordered by the given orders.
+
+        If cursor is given, keyset pagination is used instead of offset:
+        objects are ordered by the order columns and ``id``, and only the
+        objects after the cursor row are selected. Values of the order columns
+        are selected along, see ``get_next_cursor``. Relations are loaded by the
+        request's loader, sharing objects with the rest of the request.
+
+        Args:
+            expr (Optional[dict]): SQLAlchemy expression.
+            offset (Optional[int]): Offset. Ignored if cursor is given.
+            limit (Optional[int]): Limit.
+            sort (Optional[list[str]]): Order columns.
+            cursor (Optional[str]): Cursor. Empty string means the first page.
+            include (Optional[list[str]]): Relations to load. All if None.
+
+        Returns:
+            list[ModelType]: Objects.
+        """
 
-        objects = await stmt
+        objects = await self._get_multi_query(expr, offset, limit, sort, cursor)
+        await get_loader().load_related(objects, self.get_related(include))
 
         logger.debug(f"Got {len(objects)} {self.name.lower()}")
         return objects
 
+    def get_json_document(
+        self,
+        alias: str,
+        include: Optional[list[str]] = None,
+    ) -> str:
+        """Build SQL expression serializing a row by the DAO's document spec.
+
+        Only DAOs with a ``document`` spec are read as JSON documents, which
+        is checked on startup by ``check_daos``.
+
+        Args:
+            alias (str): Alias of the model's table.
+            include (Optional[list[str]]): Relations to include. All if None.
+
+        Raises:
+            ValueError: DAO has no document spec.
+
+        Returns:
+            str: SQL expression.
+        """
+
+        if self.document is None:
+            raise ValueError(f"{self.name} has no document spec")
+        return self.document.build(alias, include)
+
+    def get_export_columns(self, alias: str) -> dict[str, str]:
+        """Get names and SQL expressions of exported columns.
+
+        Args:
+            alias (str): Alias of the model's table.
+
+        Returns:
+            dict[str, str]: Column names and expressions.
+        """
+
+        return {column: f'{alias}."{column}"' for column in self.export_columns}
+
+    async def get_json(
+        self,
+        obj_id: str,
+        include: Optional[list[str]] = None,
+    ) -> Optional[str]:
+        """Get object by id serialized to JSON by the database.
+
+        Args:
+            obj_id (str): ID of object to get.
+            include (Optional[list[str]]): Relations to include. All if None.
+
+        Returns:
+            Optional[str]: JSON document.
+        """
+
+        document = self.get_json_document("obj", include)
+        query = (
+            f"SELECT {document}::text AS document "
+            f'FROM "{self.__model._meta.db_table}" obj WHERE obj."id" = $1'
+        )
+        _, rows = await get_read_db().execute_query(query, [obj_id])
+
+        if not rows:
+            return None
+
+        logger.debug(f"Got {self.name.lower()} {obj_id} as JSON")
+        return str(rows[0]["document"])
+
+    async def get_multi_json(
+        self,
+        expr: Optional[dict[str, Any]] = None,
+        offset: Optional[int] = 0,
+        limit: Optional[int] = 100,
+        sort: Optional[list[str]] = None,
+        cursor: Optional[str] = None,
+        include: Optional[list[str]] = None,
+    ) -> list[JSONDocument]:
+        """Get multiple objects serialized to JSON by the database.
+
+        The page and all its relations are selected by a single statement,
+        no model instances are created.
+
+        Args:
+            expr (Optional[dict]): Filter expression.
+            offset (Optional[int]): Offset. Ignored if cursor is given.
+            limit (Optional[int]): Limit.
+            sort (Optional[list[str]]): Order columns.
+            cursor (Optional[str]): Cursor. Empty string means the first page.
+            include (Optional[list[str]]): Relations to include. All if None.
+
+        Returns:
+            list[JSONDocument]: Objects' ids and JSON documents.
+        """
+
+        # Order columns must stay selected, otherwise annotations are dropped
+        resolved_sort, _ = self._resolve_sort(sort)
+        if cursor is not None:
+            resolved_sort.append("id")
+        fields = get_sort_fields(resolved_sort)
+        page = self._get_multi_query(expr, offset, limit, sort, cursor).values_list(
+            "id",
+            *fields,
+        )
+        document = self.get_json_document("obj", include)
+        query = (
+            f'SELECT obj."id", {document}::text AS document, '
+            'page."row"::text AS "sort_values" FROM unnest(ARRAY('
+            f"SELECT to_jsonb(page) FROM ({page.sql()}) page)) "
+            'WITH ORDINALITY AS page("row", "position") '
+            f'JOIN "{self.__model._meta.db_table}" obj '
+            """ON obj."id" = (page."row" ->> '0')::uuid """
+            'ORDER BY page."position"'
+        )
+        _, rows = await get_read_db().execute_query(query)
+        documents = []
+        for row in rows:
+            values = json.loads(row["sort_values"])
+            documents.append(
+                JSONDocument(
+                    row["id"],
+                    row["document"],
+                    tuple(values[str(index)] for index in range(1, len(fields) + 1)),
+                ),
+            )
+
+        logger.debug(f"Got {len(documents)} {self.name.lower()} as JSON")
+        return documents
+
+    async def get_multi_with_count(
+        self,
+        expr: Optional[dict[str, Any]] = None,
+        offset: Optional[int] = 0,
+        limit: Optional[int] = 100,
+        sort: Optional[list[str]] = None,
+        cursor: Optional[str] = None,
+        count: bool = True,
+        include: Optional[list[str]] = None,
+    ) -> tuple[Optional[int], list[ModelType]]:
+        """Get multiple objects and their total amount.
+
+        The count and the page are queried concurrently, each on its own
+        connection from the pool.
+
+        Args:
+            expr (Optional[dict]): Filter expression.
+            offset (Optional[int]): Offset. Ignored if cursor is given.
+            limit (Optional[int]): Limit.
+            sort (Optional[list[str]]): Order columns.
+            cursor (Optional[str]): Cursor. Empty string means the first page.
+            count (bool): Whether to count objects at all.
+            include (Optional[list[str]]): Relations to load. All if None.
+
+        Returns:
+            tuple[Optional[int], list[ModelType]]: Amount (None if not counted)
+                and objects.
+        """
+
+        page = self.get_multi(expr, offset, limit, sort, cursor, include)
+        return await self._with_count(expr, count, page)
+
+    async def get_multi_json_with_count(
+        self,
+        expr: Optional[dict[str, Any]] = None,
+        offset: Optional[int] = 0,
+        limit: Optional[int] = 100,
+        sort: Optional[list[str]] = None,
+        cursor: Optional[str] = None,
+        count: bool = True,
+        include: Optional[list[str]] = None,
+    ) -> tuple[Optional[int], list[JSONDocument]]:
+        """Get multiple objects as JSON documents and their total amount.
+
+        Args:
+            expr (Optional[dict]): Filter expression.
+            offset (Optional[int]): Offset. Ignored if cursor is given.
+            limit (Optional[int]): Limit.
+            sort (Optional[list[str]]): Order columns.
+            cursor (Optional[str]): Cursor. Empty string means the first page.
+            count (bool): Whether to count objects at all.
+            include (Optional[list[str]]): Relations to include. All if None.
+
+        Returns:
+            tuple[Optional[int], list[JSONDocument]]: Amount (None if not
+                counted) and documents.
+        """
+
+        page = self.get_multi_json(expr, offset, limit, sort, cursor, include)
+        return await self._with_count(expr, count, page)
+
+    async def _with_count(
+        self,
+        expr: Optional[dict[str, Any]],
+        count: bool,
+        page: Awaitable[PageType],
+    ) -> tuple[Optional[int], PageType]:
+        if not count:
+            return None, await page
+
+        amount, objects = await asyncio.gather(self.get_count(expr), page)
+        return amount, objects
+
+    def get_next_cursor(
+        self,
+        objects: Sequence[ModelType | JSONDocument],
+        limit: Optional[int] = 100,
+        sort: Optional[list[str]] = None,
+    ) -> Optional[str]:
+        """Get cursor of the page following the given one.
+
+        The cursor is built from values of the order columns selected with the
+        page by ``get_multi`` or ``get_multi_json`` in cursor mode.
+
+        Args:
+            objects (Sequence[ModelType | JSONDocument]): Objects of the page.
+            limit (Optional[int]): Limit.
+            sort (Optional[list[str]]): Order columns.
+
+        Returns:
+            Optional[str]: Cursor or None if the page is the last one.
+        """
+
+        if not objects or limit is None or len(objects) < limit:
+            return None
+
+        sort, _ = self._resolve_sort(sort)
+        sort.append("id")
+        last = objects[-1]
+        if isinstance(last, JSONDocument):
+            return encode_cursor(sort, list(last.sort_values))
+        values = [getattr(last, field) for field in get_sort_fields(sort)]
+        return encode_cursor(sort, values)
+
+    async def get_statistics_rows(self, expr: dict[str, Any]) -> list[dict[str, Any]]:
+        """Get values of objects which statistics tables are computed from.
+
+        DAOs which maintain statistics tables override it.
+
+        Args:
+            expr (dict[str, Any]): Filter expression.
+
+        Returns:
+            list[dict[str, Any]]: Values of objects, nothing by default.
+        """
+
+        return []
+
+    async def update_statistics(self, rows: list[dict[str, Any]], sign: int) -> None:
+        """Add or subtract objects' contribution to statistics tables.
+
+        DAOs which maintain statistics tables override it.
+
+        Args:
+            rows (list[dict[str, Any]]): Values returned by ``get_statistics_rows``.
+            sign (int): 1 to add objects, -1 to subtract them.
+        """
+
+    async def sync_relation(
+        self,
+        field: str,
+        links: dict[uuid.UUID, Collection[uuid.UUID]],
+    ) -> RelationChanges:
+        """Make many-to-many relation of the objects link exactly given objects.
+
+        Links to add and remove are found by the database, so unchanged links
+        aren't touched. Owners are locked first, which keeps concurrent syncs
+        of the same objects from adding duplicate links. Missing related
+        objects are skipped.
+
+        Args:
+            field (str): Many-to-many field of the model.
+            links (dict[uuid.UUID, Collection[uuid.UUID]]): Owners' ids and ids
+                of their related objects.
+
+        Returns:
+            RelationChanges: Added and removed links.
+        """
+
+        if not links:
+            return RelationChanges([], [])
+
+        relation = cast(
+            ManyToManyFieldInstance[Model],
+            self.__model._meta.fields_map[field],
+        )
+        through = relation.through
+        backward_key = relation.backward_key
+        forward_key = relation.forward_key
+        pairs = [
+            (owner_id, related_id)
+            for owner_id, related_ids in links.items()
+            for related_id in related_ids
+        ]
+
+        async with in_transaction(PRIMARY_CONNECTION) as connection:
+            await connection.execute_query(
+                f'SELECT 1 FROM "{self.__model._meta.db_table}" '
+                'WHERE "id" = ANY($1::uuid[]) FOR UPDATE',
+                [list(links)],
+            )
+            rows = await connection.execute_query_dict(
+                "WITH wanted AS ("
+                'SELECT DISTINCT link."owner_id", link."related_id" '
+                'FROM unnest($2::uuid[], $3::uuid[]) AS link("owner_id", "related_id") '
+                f'JOIN "{relation.related_model._meta.db_table}" related '
+                'ON related."id" = link."related_id"'
+                "), removed AS ("
+                f'DELETE FROM "{through}" '
+                f'WHERE "{backward_key}" = ANY($1::uuid[]) AND NOT EXISTS ('
+                'SELECT 1 FROM wanted '
+                f'WHERE wanted."owner_id" = "{through}"."{backward_key}" '
+                f'AND wanted."related_id" = "{through}"."{forward_key}") '
+                f'RETURNING "{backward_key}", "{forward_key}"'
+                "), added AS ("
+                f'INSERT INTO "{through}" ("{backward_key}", "{forward_key}") '
+                'SELECT wanted."owner_id", wanted."related_id" FROM wanted '
+                f'WHERE NOT EXISTS (SELECT 1 FROM "{through}" existing '
+                f'WHERE existing."{backward_key}" = wanted."owner_id" '
+                f'AND existing."{forward_key}" = wanted."related_id") '
+                f'RETURNING "{backward_key}", "{forward_key}"'
+                ") "
+                f'SELECT TRUE AS "added", "{backward_key}" AS "owner_id", '
+                f'"{forward_key}" AS "related_id" FROM added UNION ALL '
+                f'SELECT FALSE, "{backward_key}", "{forward_key}" FROM removed',
+                [
+                    list(links),
+                    [pair[0] for pair in pairs],
+                    [pair[1] for pair in pairs],
+                ],
+            )
+
+        changes = RelationChanges([], [])
+        for row in rows:
+            pair = (row["owner_id"], row["related_id"])
+            (changes.added if row["added"] else changes.removed).append(pair)
+
+        logger.debug(
+            f"Synced {self.name.lower()} {field}: "
+            f"{len(changes.added)} added, {len(changes.removed)} removed",
+        )
+        return changes
+
     async def create_by_user(
         self,
         obj_in: dict[str, Any],
@@ -121,12 +921,32 @@ class BaseDAO(Generic[ModelType]):
             ModelType: Created object.
         """
 
-        db_obj = await self.__model.create(**obj_in, created_by_user_id=user_id)
+        async with in_transaction(PRIMARY_CONNECTION):
+            db_obj = await self.__model.create(**obj_in, created_by_user_id=user_id)
+            rows = await self.get_statistics_rows({"id": db_obj.pk})
+            await self.update_statistics(rows, 1)
+        await invalidate_responses(self.name)
         await db_obj.fetch_related(*self.related)
 
-        logger.debug(f"Created {self.name.lower()} {db_obj.id}")
+        logger.debug(f"Created {self.name.lower()} {db_obj.pk}")
         return db_obj
 
+    async def lock(self, obj_id: str) -> bool:
+        """Lock object's row until the end of the transaction.
+
+        Concurrent updates of the object wait for it, so they read the
+        statistics rows written by this one.
+
+        Args:
+            obj_id (str): Object ID.
+
+        Returns:
+            bool: False if the object doesn't exist.
+        """
+
+        locked = await self.__model.filter(id=obj_id).select_for_update().only("id")
+        return bool(locked)
+
     async def update(
         self,
         obj_in: dict[str, Any],
@@ -142,14 +962,25 @@ class BaseDAO(Generic[ModelType]):
             ModelType: Updated object.
         """
 
-        c = await self.__model.filter(id=obj_id).update(**obj_in)
-        if c != 1:
-            logger.error(f"{self.name} {obj_id} not found")
-            raise ObjectNotFoundException(obj_id)
+        async with in_transaction(PRIMARY_CONNECTION):
+            if not await self.lock(obj_id):
+                logger.error(f"{self.name} {obj_id} not found")
+                raise ObjectNotFoundException(obj_id)
+
+            old_rows = await self.get_statistics_rows({"id": obj_id})
+            await self.__model.filter(id=obj_id).update(**obj_in)
+            new_rows = await self.get_statistics_rows({"id": obj_id})
+            if new_rows != old_rows:
+                await self.update_statistics(old_rows, -1)
+                await self.update_statistics(new_rows, 1)
+        await invalidate_responses(self.name)
 
         db_obj = await self.get(obj_id)
+        if db_obj is None:
+            # Deleted right after the update
+            raise ObjectNotFoundException(obj_id)
 
-        logger.debug(f"Updated {self.name.lower()} {db_obj.id}")
+        logger.debug(f"Updated {self.name.lower()} {obj_id}")
         return db_obj
 
     async def delete(self, obj_id: str) -> None:
@@ -159,11 +990,16 @@ class BaseDAO(Generic[ModelType]):
             obj_id (str): ID of object to delete.
         """
 
-        c = await self.__model.filter(id=obj_id).delete()
+        async with in_transaction(PRIMARY_CONNECTION):
+            rows = await self.get_statistics_rows({"id": obj_id})
+            c = await self.__model.filter(id=obj_id).delete()
 
-        if c != 1:
-            logger.error(f"{self.name} {obj_id} not found")
-            raise ObjectNotFoundException(obj_id)
+            if c != 1:
+                logger.error(f"{self.name} {obj_id} not found")
+                raise ObjectNotFoundException(obj_id)
+
+            await self.update_statistics(rows, -1)
+        await invalidate_responses(*self.delete_tags)
 
         logger.debug(f"Deleted {self.name.lower()} {obj_id}")
 
@@ -174,4 +1010,8 @@ class BaseDAO(Generic[ModelType]):
             obj_ids (list[str]): IDs of objects to delete.
         """
 
-        c = await self.__model.filter(id__in=obj_ids).delete()
+        async with in_transaction(PRIMARY_CONNECTION):
+            rows = await self.get_statistics_rows({"id__in": obj_ids})
+            await self.__model.filter(id__in=obj_ids).delete()
+            await self.update_statistics(rows, -1)
+        await invalidate_responses(*self.delete_tags)
@@ -1,23 +1,13 @@
 import datetime
+from typing import Any
 
 from dateutil.rrule import YEARLY, rrule
-from pypika.terms import Function
-from tortoise.functions import Count
 
 from backend.db import models
 from backend.db.dao.base import BaseDAO
-
-
-class DatePartTrunc:
-    def __init__(self, part: str, field: str):
-        if part not in ("YEAR", "MONTH", "DAY"):
-            raise ValueError
-
-        self.__part = part
-        self.__field = field
-
-    def __repr__(self) -> str:
-        return f"{self.__part} from {self.__field}"
+from backend.db.dao.documents import COMPANY_COLUMNS
+from backend.db.dao.statistics import StatisticsDAO
+from backend.db.routing import get_read_db
 
 
 class CompanyDAO(BaseDAO[models.Company]):
@@ -29,15 +19,22 @@ class CompanyDAO(BaseDAO[models.Company]):
             "created_by_user",
             "games",
         ]
+        self.export_columns = (*COMPANY_COLUMNS, "created_by_user_id")
+        self.statistics = StatisticsDAO()
 
-    async def get_foundation_statistics(self) -> list[dict]:
+    async def get_statistics_rows(
+        self,
+        expr: dict[str, Any],
+    ) -> list[dict[str, Any]]:
+        return await self.model.filter(**expr).values("id", "founded_at")
+
+    async def update_statistics(self, rows: list[dict[str, Any]], sign: int) -> None:
+        await self.statistics.add_companies(rows, sign)
+
+    async def get_foundation_statistics(self) -> list[dict[str, Any]]:
         data = (
-            await self.model.all()
-            .annotate(
-                year=Function("EXTRACT", DatePartTrunc("YEAR", "founded_at")),
-                companies=Count("id"),
-            )
-            .group_by("year")
+            await models.CompanyFoundationStatistics.filter(companies__gt=0)
+            .using_db(get_read_db())
             .order_by("year")
             .values("year", "companies")
         )
@@ -51,10 +48,8 @@ class CompanyDAO(BaseDAO[models.Company]):
             data.append({"year": y, "companies": 0})
         return sorted(data, key=lambda x: x["year"])
 
-    async def get_games_statistics(self) -> list[dict]:
-        data = (
-            await self.model.all()
-            .annotate(games_count=Count("games"))
-            .values("title", "games_count")
+    async def get_games_statistics(self) -> list[dict[str, Any]]:
+        return await models.Company.all().using_db(get_read_db()).values(
+            "title",
+            "games_count",
         )
-        return data
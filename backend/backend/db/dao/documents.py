@@ -0,0 +1,249 @@
+"""SQL expressions serializing rows to JSON shaped like the API schemas."""
+from typing import Callable, NamedTuple, Optional
+
+USER_COLUMNS = ("id", "username", "email", "is_superuser", "is_primary", "created_at")
+COMPANY_COLUMNS = ("id", "title", "founded_at", "created_at")
+GAME_COLUMNS = ("id", "title", "released_at", "created_at")
+GENRE_COLUMNS = ("id", "title")
+PLATFORM_COLUMNS = ("id", "title")
+SALE_COLUMNS = ("id", "amount")
+BACKUP_COLUMNS = ("id", "title", "url", "format", "size", "created_at")
+
+
+def build_object(alias: str, columns: tuple[str, ...], **relations: str) -> str:
+    """Build ``json_build_object`` of the row's columns and relations.
+
+    Args:
+        alias (str): Table alias.
+        columns (tuple[str, ...]): Columns to include.
+        relations (str): Relation names and SQL expressions of their documents.
+
+    Returns:
+        str: SQL expression.
+    """
+
+    pairs = [f"'{column}', {alias}.\"{column}\"" for column in columns]
+    pairs += [f"'{name}', {expression}" for name, expression in relations.items()]
+    return f"json_build_object({', '.join(pairs)})"
+
+
+def related_object(
+    table: str,
+    alias: str,
+    columns: tuple[str, ...],
+    foreign_key: str,
+) -> str:
+    """Build subquery serializing a row referenced by a foreign key.
+
+    Args:
+        table (str): Related table.
+        alias (str): Alias for the related table.
+        columns (tuple[str, ...]): Columns to include.
+        foreign_key (str): Qualified foreign key column, e.g. ``game."user_id"``.
+
+    Returns:
+        str: SQL expression, NULL if the foreign key is NULL.
+    """
+
+    return (
+        f'(SELECT {build_object(alias, columns)} FROM "{table}" {alias} '
+        f'WHERE {alias}."id" = {foreign_key})'
+    )
+
+
+def related_list(table: str, alias: str, document: str, condition: str) -> str:
+    """Build subquery aggregating related rows into a JSON array.
+
+    Args:
+        table (str): Related table, may be followed by joins.
+        alias (str): Alias for the related table.
+        document (str): SQL expression of a related row's document.
+        condition (str): Condition selecting the related rows.
+
+    Returns:
+        str: SQL expression, empty array if there are no related rows.
+    """
+
+    return (
+        f'COALESCE((SELECT json_agg({document}) FROM "{table}" {alias} '
+        f"WHERE {condition}), '[]'::json)"
+    )
+
+
+def many_to_many_list(
+    table: str,
+    alias: str,
+    columns: tuple[str, ...],
+    through: str,
+    backward_key: str,
+    forward_key: str,
+    owner: str,
+) -> str:
+    """Build subquery aggregating rows related through a join table.
+
+    Args:
+        table (str): Related table.
+        alias (str): Alias for the related table.
+        columns (tuple[str, ...]): Columns to include.
+        through (str): Join table.
+        backward_key (str): Join table column referencing the owner.
+        forward_key (str): Join table column referencing the related table.
+        owner (str): Qualified primary key of the owner row.
+
+    Returns:
+        str: SQL expression, empty array if there are no related rows.
+    """
+
+    return (
+        f"COALESCE((SELECT json_agg({build_object(alias, columns)}) "
+        f'FROM "{through}" JOIN "{table}" {alias} '
+        f'ON {alias}."id" = "{through}"."{forward_key}" '
+        f"WHERE \"{through}\".\"{backward_key}\" = {owner}), '[]'::json)"
+    )
+
+
+def sale_document(alias: str) -> str:
+    """Build document of a sale with its game, platform and creator.
+
+    Args:
+        alias (str): Alias of the sale table.
+
+    Returns:
+        str: SQL expression.
+    """
+
+    return build_object(
+        alias,
+        SALE_COLUMNS,
+        game=related_object(
+            "game",
+            f"{alias}_game",
+            GAME_COLUMNS,
+            f'{alias}."game_id"',
+        ),
+        platform=related_object(
+            "platform",
+            f"{alias}_platform",
+            PLATFORM_COLUMNS,
+            f'{alias}."platform_id"',
+        ),
+        created_by_user=related_object(
+            "user",
+            f"{alias}_user",
+            USER_COLUMNS,
+            f'{alias}."created_by_user_id"',
+        ),
+    )
+
+
+class DocumentSpec(NamedTuple):
+    """Shape of the JSON documents rows of a table are serialized to."""
+
+    columns: tuple[str, ...]
+    # Builds relation names and their documents for the table alias
+    relations: Callable[[str], dict[str, str]]
+
+    def build(self, alias: str, include: Optional[list[str]] = None) -> str:
+        """Build SQL expression serializing a row.
+
+        Args:
+            alias (str): Alias of the table.
+            include (Optional[list[str]]): Relations to include. All if None.
+
+        Returns:
+            str: SQL expression.
+        """
+
+        relations = self.relations(alias)
+        if include is not None:
+            relations = {key: relations[key] for key in relations if key in include}
+        return build_object(alias, self.columns, **relations)
+
+
+def game_relations(alias: str) -> dict[str, str]:
+    """Build documents of game relations, like the ``Game`` schema.
+
+    Args:
+        alias (str): Alias of the game table.
+
+    Returns:
+        dict[str, str]: Relation names and SQL expressions.
+    """
+
+    return {
+        "created_by_company": related_object(
+            "company",
+            f"{alias}_company",
+            COMPANY_COLUMNS,
+            f'{alias}."created_by_company_id"',
+        ),
+        "created_by_user": related_object(
+            "user",
+            f"{alias}_user",
+            USER_COLUMNS,
+            f'{alias}."created_by_user_id"',
+        ),
+        "genres": many_to_many_list(
+            "genre",
+            f"{alias}_genre",
+            GENRE_COLUMNS,
+            "game_genre",
+            "game_id",
+            "genre_id",
+            f'{alias}."id"',
+        ),
+        "platforms": many_to_many_list(
+            "platform",
+            f"{alias}_platform",
+            PLATFORM_COLUMNS,
+            "game_platform",
+            "game_id",
+            "platform_id",
+            f'{alias}."id"',
+        ),
+        "sales": related_list(
+            "sale",
+            f"{alias}_sale",
+            sale_document(f"{alias}_sale"),
+            f'{alias}_sale."game_id" = {alias}."id"',
+        ),
+    }
+
+
+def user_relations(alias: str) -> dict[str, str]:
+    """Build documents of user relations, like the ``User`` schema.
+
+    Args:
+        alias (str): Alias of the user table.
+
+    Returns:
+        dict[str, str]: Relation names and SQL expressions.
+    """
+
+    created = {
+        "created_companies": ("company", COMPANY_COLUMNS),
+        "created_platforms": ("platform", PLATFORM_COLUMNS),
+        "created_games": ("game", GAME_COLUMNS),
+        "created_genres": ("genre", GENRE_COLUMNS),
+        "created_backups": ("backup", BACKUP_COLUMNS),
+    }
+    relations = {
+        name: related_list(
+            table,
+            f"{alias}_{table}",
+            build_object(f"{alias}_{table}", columns),
+            f'{alias}_{table}."created_by_user_id" = {alias}."id"',
+        )
+        for name, (table, columns) in created.items()
+    }
+    relations["created_sales"] = related_list(
+        "sale",
+        f"{alias}_sale",
+        sale_document(f"{alias}_sale"),
+        f'{alias}_sale."created_by_user_id" = {alias}."id"',
+    )
+    return relations
+
+
+GAME_DOCUMENT = DocumentSpec(GAME_COLUMNS, game_relations)
+USER_DOCUMENT = DocumentSpec(USER_COLUMNS, user_relations)
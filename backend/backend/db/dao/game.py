@@ -1,10 +1,16 @@
 import logging
+import uuid
 from typing import Any
 
-from tortoise.functions import Coalesce, Sum
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.transactions import in_transaction
 
+from backend.cache import invalidate_responses
 from backend.db import models
-from backend.db.dao.base import BaseDAO
+from backend.db.dao.base import BaseDAO, BulkRow
+from backend.db.dao.documents import GAME_COLUMNS, GAME_DOCUMENT
+from backend.db.dao.statistics import StatisticsDAO
+from backend.db.routing import PRIMARY_CONNECTION, get_read_db
 from backend.exceptions import ObjectNotFoundException
 
 logger = logging.getLogger(__name__)
@@ -24,6 +30,30 @@ class GameDAO(BaseDAO[models.Game]):
             "sales__platform",
             "sales__created_by_user",
         ]
+        self.export_columns = (
+            *GAME_COLUMNS,
+            "created_by_company_id",
+            "created_by_user_id",
+        )
+        self.document = GAME_DOCUMENT
+        self.statistics = StatisticsDAO()
+
+    async def get_statistics_rows(self, expr: dict[str, Any]) -> list[dict[str, Any]]:
+        return await self.model.filter(**expr).values("id")
+
+    async def update_statistics(self, rows: list[dict[str, Any]], sign: int) -> None:
+        if sign > 0:
+            # Statistics of deleted games are deleted by cascade
+            await self.statistics.add_games_sales({row["id"]: 0 for row in rows})
+
+    def get_export_columns(self, alias: str) -> dict[str, str]:
+        columns = super().get_export_columns(alias)
+        for relation, table in (("platforms", "platform"), ("genres", "genre")):
+            columns[relation] = (
+                f'ARRAY(SELECT "{table}_id" FROM "game_{table}" '
+                f'WHERE "game_id" = {alias}."id")'
+            )
+        return columns
 
     async def create_by_user(
         self,
@@ -40,20 +70,19 @@ class GameDAO(BaseDAO[models.Game]):
             models.Game: Game.
         """
 
-        db_game = await self.model.create(
-            title=game_in["title"],
-            released_at=game_in["released_at"],
-            created_by_company_id=game_in["created_by_company_id"],
-            created_by_user_id=user_id,
-        )
-
-        if "genres" in game_in:
-            genres = await models.Genre.filter(id__in=game_in["genres"])
-            await db_game.genres.add(*genres)
-
-        if "platforms" in game_in:
-            platforms = await models.Platform.filter(id__in=game_in["platforms"])
-            await db_game.platforms.add(*platforms)
+        async with in_transaction(PRIMARY_CONNECTION):
+            db_game = await self.model.create(
+                title=game_in["title"],
+                released_at=game_in["released_at"],
+                created_by_company_id=game_in["created_by_company_id"],
+                created_by_user_id=user_id,
+            )
+            rows = await self.get_statistics_rows({"id": db_game.id})
+            await self.update_statistics(rows, 1)
+            for field in ("genres", "platforms"):
+                if field in game_in:
+                    await self.sync_relation(field, {db_game.id: game_in[field]})
+        await invalidate_responses(self.name)
 
         await db_game.fetch_related(*self.related)
 
@@ -75,51 +104,162 @@ class GameDAO(BaseDAO[models.Game]):
             models.Game: Game.
         """
 
+        links = {
+            field: set(game_in.pop(field))
+            for field in ("genres", "platforms")
+            if field in game_in
+        }
+
+        async with in_transaction(PRIMARY_CONNECTION):
+            if not await self.lock(game_id):
+                logger.error(f"Game {game_id} not found")
+                raise ObjectNotFoundException(game_id)
+
+            old_rows = await self.get_statistics_rows({"id": game_id})
+
+            if game_in:
+                await self.model.filter(id=game_id).update(**game_in)
+            for field, related_ids in links.items():
+                await self.sync_relation(field, {uuid.UUID(game_id): related_ids})
+
+            new_rows = await self.get_statistics_rows({"id": game_id})
+            if new_rows != old_rows:
+                await self.update_statistics(old_rows, -1)
+                await self.update_statistics(new_rows, 1)
+        await invalidate_responses(self.name)
         db_game = await self.get(game_id)
-        if not db_game:
-            logger.error(f"Game {game_id} not found")
+        if db_game is None:
+            # Deleted right after the update
             raise ObjectNotFoundException(game_id)
 
-        if "genres" in game_in:
-            genres = await models.Genre.filter(id__in=game_in["genres"])
-            await db_game.genres.add(*genres)
+        logger.debug(f"Updated game {game_id}")
+        return db_game
 
-            to_remove: list[models.Genre] = []
-            for genre in db_game.genres:
-                if genre not in genres:
-                    to_remove.append(genre)
+    async def upsert_many(
+        self,
+        games_in: list[tuple[int, dict[str, Any]]],
+        user_id: str,
+    ) -> list[BulkRow]:
+        """Create games or update existing games with the same titles.
 
-            if to_remove:
-                await db_game.genres.remove(*to_remove)
-            game_in.pop("genres")
+        Rows of missing companies and repeated titles fail, the rest are
+        upserted by a single statement. Given platforms and genres replace the
+        ones of existing games. Everything runs in one transaction.
 
-        if "platforms" in game_in:
-            platforms = await models.Platform.filter(id__in=game_in["platforms"])
-            await db_game.platforms.add(*platforms)
+        Args:
+            games_in (list[tuple[int, dict[str, Any]]]): Indexes of the rows
+                and games' data.
+            user_id (str): Creator ID.
 
-            to_remove: list[models.Platform] = []
-            for platform in db_game.platforms:
-                if platform not in platforms:
-                    to_remove.append(platform)
+        Returns:
+            list[BulkRow]: Outcomes of the rows.
+        """
 
-            if to_remove:
-                await db_game.platforms.remove(*to_remove)
-            game_in.pop("platforms")
+        async with in_transaction(PRIMARY_CONNECTION) as connection:
+            titles, results = await self._validate_bulk(games_in)
+            if not titles:
+                return results
+            rows = await self._upsert_titles(connection, titles, user_id)
+        await invalidate_responses(self.name)
 
-        for field in game_in:
-            setattr(db_game, field, game_in[field])
+        for row in rows:
+            index, _ = titles[row["title"]]
+            results.append(BulkRow(index, row["id"], row["created"]))
 
-        await db_game.save()
-        db_game = await self.model.get(id=game_id).prefetch_related(*self.related)
+        logger.debug(f"Upserted {len(rows)} games")
+        return results
 
-        logger.debug(f"Updated game {db_game.id}")
-        return db_game
+    async def _validate_bulk(
+        self,
+        games_in: list[tuple[int, dict[str, Any]]],
+    ) -> tuple[dict[str, tuple[int, dict[str, Any]]], list[BulkRow]]:
+        """Fail rows of missing companies and repeated titles.
+
+        Args:
+            games_in (list[tuple[int, dict[str, Any]]]): Indexes of the rows
+                and games' data.
+
+        Returns:
+            tuple[dict[str, tuple[int, dict[str, Any]]], list[BulkRow]]: Title
+                -> index of the row and game's data, failed rows.
+        """
+
+        companies = {game_in["created_by_company_id"] for _, game_in in games_in}
+        company_ids = set(
+            await models.Company.filter(id__in=companies).values_list(
+                "id",
+                flat=True,
+            ),
+        )
+
+        titles: dict[str, tuple[int, dict[str, Any]]] = {}
+        errors: list[BulkRow] = []
+        for index, game_in in games_in:
+            if game_in["created_by_company_id"] not in company_ids:
+                error = f"Company {game_in['created_by_company_id']} not found"
+            elif game_in["title"] in titles:
+                error = f"Duplicate of row {titles[game_in['title']][0]}"
+            else:
+                titles[game_in["title"]] = (index, game_in)
+                continue
+            errors.append(BulkRow(index, error=error))
+        return titles, errors
+
+    async def _upsert_titles(
+        self,
+        connection: BaseDBAsyncClient,
+        titles: dict[str, tuple[int, dict[str, Any]]],
+        user_id: str,
+    ) -> list[dict[str, Any]]:
+        """Upsert validated games with their statistics and relations.
+
+        Args:
+            connection (BaseDBAsyncClient): Connection of the transaction.
+            titles (dict[str, tuple[int, dict[str, Any]]]): Title -> index of
+                the row and game's data.
+            user_id (str): Creator ID.
+
+        Returns:
+            list[dict[str, Any]]: Upserted rows.
+        """
+
+        old_rows = await self.get_statistics_rows({"title__in": list(titles)})
+        rows = await connection.execute_query_dict(
+            'INSERT INTO "game" '
+            '("id", "title", "released_at", "created_by_company_id", '
+            '"created_by_user_id") '
+            "SELECT *, $5::uuid FROM "
+            "unnest($1::uuid[], $2::varchar[], $3::date[], $4::uuid[]) "
+            'ON CONFLICT ("title") DO UPDATE SET '
+            '"released_at" = EXCLUDED."released_at", '
+            '"created_by_company_id" = EXCLUDED."created_by_company_id" '
+            'RETURNING "id", "title", "created_by_company_id", '
+            '(xmax = 0) AS "created"',
+            [
+                [uuid.uuid4() for _ in titles],
+                list(titles),
+                [game_in["released_at"] for _, game_in in titles.values()],
+                [game_in["created_by_company_id"] for _, game_in in titles.values()],
+                user_id,
+            ],
+        )
+        await self.update_statistics(old_rows, -1)
+        await self.update_statistics(rows, 1)
+
+        for field in ("genres", "platforms"):
+            links = {
+                row["id"]: titles[row["title"]][1][field]
+                for row in rows
+                if titles[row["title"]][1].get(field) is not None
+            }
+            await self.sync_relation(field, links)
+        return rows
 
-    async def get_popularity_statistics(self) -> list[dict]:
+    async def get_popularity_statistics(self) -> list[dict[str, Any]]:
         data = (
-            await self.model.all()
-            .annotate(sales_sum=Coalesce(Sum("sales__amount"), 0))
+            await models.GameStatistics.all()
+            .using_db(get_read_db())
             .order_by("sales_sum")
-            .values("title", "sales_sum")
+            .values("sales_sum", title="game__title")
         )
         return data
@@ -1,5 +1,6 @@
 from backend.db import models
 from backend.db.dao.base import BaseDAO
+from backend.db.dao.documents import GENRE_COLUMNS
 
 
 class GenreDAO(BaseDAO[models.Genre]):
@@ -11,3 +12,4 @@ class GenreDAO(BaseDAO[models.Genre]):
             "created_by_user",
             "games",
         ]
+        self.export_columns = (*GENRE_COLUMNS, "created_at", "created_by_user_id")
@@ -1,5 +1,14 @@
+import logging
+from typing import Any
+
+from backend.cache import invalidate_responses
 from backend.db import models
 from backend.db.dao.base import BaseDAO
+from backend.db.dao.documents import PLATFORM_COLUMNS
+from backend.db.dao.statistics import StatisticsDAO
+from backend.exceptions import ObjectNotFoundException
+
+logger = logging.getLogger(__name__)
 
 
 class PlatformDAO(BaseDAO[models.Platform]):
@@ -14,3 +23,47 @@ class PlatformDAO(BaseDAO[models.Platform]):
             "sales__created_by_user",
             "games",
         ]
+        self.export_columns = (*PLATFORM_COLUMNS, "created_by_user_id")
+        self.statistics = StatisticsDAO()
+
+    async def get_statistics_rows(self, expr: dict[str, Any]) -> list[dict[str, Any]]:
+        # Sales of deleted platforms are deleted by cascade
+        sales_expr = {f"platform__{key}": value for key, value in expr.items()}
+        return await models.Sale.filter(**sales_expr).values("game_id", "amount")
+
+    async def update_statistics(self, rows: list[dict[str, Any]], sign: int) -> None:
+        await self.statistics.add_sales(rows, sign)
+
+    async def update(
+        self,
+        platform_in: dict[str, Any],
+        platform_id: str,
+    ) -> models.Platform:
+        """Update a platform.
+
+        Platform's fields don't change sales statistics, so its sales
+        aren't read.
+
+        Args:
+            platform_in (dict[str, Any]): Platform data.
+            platform_id (str): Platform ID.
+
+        Raises:
+            ObjectNotFoundException: Platform doesn't exist.
+
+        Returns:
+            models.Platform: Platform.
+        """
+
+        c = await self.model.filter(id=platform_id).update(**platform_in)
+        if c != 1:
+            logger.error(f"Platform {platform_id} not found")
+            raise ObjectNotFoundException(platform_id)
+        await invalidate_responses(self.name)
+
+        db_platform = await self.get(platform_id)
+        if db_platform is None:
+            raise ObjectNotFoundException(platform_id)
+
+        logger.debug(f"Updated platform {db_platform.id}")
+        return db_platform
@@ -1,10 +1,22 @@
 import logging
+import uuid
+from typing import Any
 
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.transactions import in_transaction
+
+from backend.cache import invalidate_responses
 from backend.db import models
-from backend.db.dao.base import BaseDAO
+from backend.db.dao.base import BaseDAO, BulkRow
+from backend.db.dao.documents import SALE_COLUMNS
+from backend.db.dao.statistics import StatisticsDAO
+from backend.db.routing import PRIMARY_CONNECTION, get_read_db
 
 logger = logging.getLogger(__name__)
 
+# Game and platform IDs of a sale
+Pair = tuple[uuid.UUID, uuid.UUID]
+
 
 class SaleDAO(BaseDAO[models.Sale]):
     def __init__(self):
@@ -14,10 +26,146 @@ class SaleDAO(BaseDAO[models.Sale]):
             "platform",
             "created_by_user",
         ]
+        self.export_columns = (
+            *SALE_COLUMNS,
+            "game_id",
+            "platform_id",
+            "created_by_user_id",
+        )
+        self.statistics = StatisticsDAO()
+
+    async def get_statistics_rows(self, expr: dict[str, Any]) -> list[dict[str, Any]]:
+        return await self.model.filter(**expr).values("game_id", "amount")
+
+    async def update_statistics(self, rows: list[dict[str, Any]], sign: int) -> None:
+        await self.statistics.add_sales(rows, sign)
+
+    async def upsert_many(
+        self,
+        sales_in: list[tuple[int, dict[str, Any]]],
+        user_id: str,
+    ) -> list[BulkRow]:
+        """Create sales or update amounts of existing sales of the same pairs.
+
+        Rows of missing games or platforms and repeated pairs fail, the rest
+        are upserted by a single statement. Everything runs in one transaction.
+
+        Args:
+            sales_in (list[tuple[int, dict[str, Any]]]): Indexes of the rows
+                and sales' data.
+            user_id (str): Creator ID.
+
+        Returns:
+            list[BulkRow]: Outcomes of the rows.
+        """
+
+        async with in_transaction(PRIMARY_CONNECTION) as connection:
+            pairs, results = await self._validate_bulk(sales_in)
+            if not pairs:
+                return results
+            rows = await self._upsert_pairs(connection, pairs, user_id)
+        await invalidate_responses(self.name)
+
+        for row in rows:
+            index, _ = pairs[(row["game_id"], row["platform_id"])]
+            results.append(BulkRow(index, row["id"], row["created"]))
+
+        logger.debug(f"Upserted {len(rows)} sales")
+        return results
+
+    async def _validate_bulk(
+        self,
+        sales_in: list[tuple[int, dict[str, Any]]],
+    ) -> tuple[dict[Pair, tuple[int, int]], list[BulkRow]]:
+        """Fail rows of missing games or platforms and repeated pairs.
+
+        Args:
+            sales_in (list[tuple[int, dict[str, Any]]]): Indexes of the rows
+                and sales' data.
+
+        Returns:
+            tuple[dict[Pair, tuple[int, int]], list[BulkRow]]: Pair of game and
+                platform -> index of the row and amount, failed rows.
+        """
+
+        game_ids = set(
+            await models.Game.filter(
+                id__in={sale_in["game_id"] for _, sale_in in sales_in},
+            ).values_list("id", flat=True),
+        )
+        platform_ids = set(
+            await models.Platform.filter(
+                id__in={sale_in["platform_id"] for _, sale_in in sales_in},
+            ).values_list("id", flat=True),
+        )
+
+        pairs: dict[Pair, tuple[int, int]] = {}
+        errors: list[BulkRow] = []
+        for index, sale_in in sales_in:
+            pair = (sale_in["game_id"], sale_in["platform_id"])
+            if pair[0] not in game_ids:
+                error = f"Game {pair[0]} not found"
+            elif pair[1] not in platform_ids:
+                error = f"Platform {pair[1]} not found"
+            elif pair in pairs:
+                error = f"Duplicate of row {pairs[pair][0]}"
+            else:
+                pairs[pair] = (index, sale_in["amount"])
+                continue
+            errors.append(BulkRow(index, error=error))
+        return pairs, errors
+
+    async def _upsert_pairs(
+        self,
+        connection: BaseDBAsyncClient,
+        pairs: dict[Pair, tuple[int, int]],
+        user_id: str,
+    ) -> list[dict[str, Any]]:
+        """Upsert validated sales with their statistics.
+
+        Args:
+            connection (BaseDBAsyncClient): Connection of the transaction.
+            pairs (dict[Pair, tuple[int, int]]): Pair of game and platform ->
+                index of the row and amount.
+            user_id (str): Creator ID.
+
+        Returns:
+            list[dict[str, Any]]: Upserted rows.
+        """
+
+        games = [game_id for game_id, _ in pairs]
+        platforms = [platform_id for _, platform_id in pairs]
+        old_rows = await connection.execute_query_dict(
+            'SELECT "game_id", "amount" FROM "sale" '
+            'WHERE ("game_id", "platform_id") IN '
+            "(SELECT * FROM unnest($1::uuid[], $2::uuid[])) FOR UPDATE",
+            [games, platforms],
+        )
+        rows = await connection.execute_query_dict(
+            'INSERT INTO "sale" '
+            '("id", "game_id", "platform_id", "amount", "created_by_user_id") '
+            "SELECT *, $5::uuid FROM "
+            "unnest($1::uuid[], $2::uuid[], $3::uuid[], $4::bigint[]) "
+            'ON CONFLICT ("game_id", "platform_id") '
+            'DO UPDATE SET "amount" = EXCLUDED."amount" '
+            'RETURNING "id", "game_id", "platform_id", "amount", '
+            '(xmax = 0) AS "created"',
+            [
+                [uuid.uuid4() for _ in pairs],
+                games,
+                platforms,
+                [amount for _, amount in pairs.values()],
+                user_id,
+            ],
+        )
+        await self.update_statistics(old_rows, -1)
+        await self.update_statistics(rows, 1)
+        return rows
 
-    async def get_popularity_statistics(self) -> list[dict]:
+    async def get_popularity_statistics(self) -> list[dict[str, Any]]:
         data = (
             await self.model.all()
+            .using_db(get_read_db())
             .order_by("amount")
             .values("game__title", "platform__title", "amount")
         )
@@ -0,0 +1,62 @@
+import logging
+from typing import Any, Optional
+
+from tortoise.filters import escape_like
+
+from backend.custom_types import SearchKind
+from backend.db.routing import get_read_db
+
+logger = logging.getLogger(__name__)
+
+# Kind -> table with the trigram-indexed "title" column
+SEARCH_TABLES = {
+    SearchKind.GAME: "game",
+    SearchKind.COMPANY: "company",
+    SearchKind.GENRE: "genre",
+    SearchKind.PLATFORM: "platform",
+}
+
+
+class SearchDAO:
+    """Class for searching objects of several kinds by title"""
+
+    async def search(
+        self,
+        query: str,
+        kinds: Optional[list[SearchKind]] = None,
+        limit: int = 20,
+    ) -> list[dict[str, Any]]:
+        """Search titles of games, companies, genres and platforms at once.
+
+        Rows match if the query is a part of the title or is similar to one of
+        its words, both served by trigram indexes. They are ranked by word
+        similarity, so a whole-word match ranks first.
+
+        Args:
+            query (str): Text to search for.
+            kinds (Optional[list[SearchKind]]): Kinds to search. All if None.
+            limit (int): Maximum amount of results.
+
+        Returns:
+            list[dict[str, Any]]: Results' ``kind``, ``id``, ``title`` and ``rank``.
+        """
+
+        pattern = f"%{escape_like(query)}%"
+        selects = [
+            f"SELECT '{kind.value}' AS \"kind\", \"id\", \"title\", "
+            f'word_similarity($1, "title") AS "rank" FROM "{table}" '
+            f'WHERE $1 <% "title" OR "title" ILIKE $2'
+            for kind, table in SEARCH_TABLES.items()
+            if kinds is None or kind in kinds
+        ]
+        sql = (
+            f"SELECT * FROM ({' UNION ALL '.join(selects)}) result "
+            'ORDER BY "rank" DESC, "title" LIMIT $3'
+        )
+        rows = await get_read_db().execute_query_dict(
+            sql,
+            [query, pattern, limit],
+        )
+
+        logger.debug(f"Found {len(rows)} objects by {query!r}")
+        return rows
@@ -0,0 +1,156 @@
+import datetime
+import logging
+import uuid
+from collections import defaultdict
+from typing import Any, Type
+
+from tortoise.models import Model
+from tortoise.transactions import in_transaction
+
+from backend.db import models
+from backend.db.routing import PRIMARY_CONNECTION
+
+logger = logging.getLogger(__name__)
+
+REBUILD_QUERIES = (
+    'INSERT INTO "game_statistics" ("game_id", "sales_sum") '
+    'SELECT game."id", COALESCE(SUM(sale."amount"), 0) FROM "game" game '
+    'LEFT JOIN "sale" sale ON sale."game_id" = game."id" GROUP BY game."id"',
+    'INSERT INTO "company_foundation_statistics" ("year", "companies") '
+    'SELECT EXTRACT(YEAR FROM "founded_at"), COUNT(*) FROM "company" GROUP BY 1',
+    'INSERT INTO "user_creation_statistics" ("date", "users") '
+    'SELECT DATE("created_at"), COUNT(*) FROM "user" GROUP BY 1',
+    'INSERT INTO "user_role_statistics" ("is_superuser", "users") '
+    'SELECT "is_superuser", COUNT(*) FROM "user" GROUP BY 1',
+)
+
+# Counters kept by triggers: table, counter, referencing table and its column
+COUNTERS = (
+    ("game", "sales_count", "sale", "game_id"),
+    ("game", "platforms_count", "game_platform", "game_id"),
+    ("game", "genres_count", "game_genre", "game_id"),
+    ("company", "games_count", "game", "created_by_company_id"),
+    ("platform", "games_count", "game_platform", "platform_id"),
+    ("platform", "sales_count", "sale", "platform_id"),
+    ("genre", "games_count", "game_genre", "genre_id"),
+    ("user", "created_companies_count", "company", "created_by_user_id"),
+    ("user", "created_platforms_count", "platform", "created_by_user_id"),
+    ("user", "created_games_count", "game", "created_by_user_id"),
+    ("user", "created_genres_count", "genre", "created_by_user_id"),
+    ("user", "created_sales_count", "sale", "created_by_user_id"),
+    ("user", "created_backups_count", "backup", "created_by_user_id"),
+)
+REBUILD_COUNTER_QUERIES = tuple(
+    f'UPDATE "{table}" counted SET "{counter}" = counts."count" '
+    f'FROM (SELECT obj."id", COUNT(related."{column}") AS "count" '
+    f'FROM "{table}" obj LEFT JOIN "{related_table}" related '
+    f'ON related."{column}" = obj."id" GROUP BY obj."id") counts '
+    f'WHERE counts."id" = counted."id" AND counts."count" <> counted."{counter}"'
+    for table, counter, related_table, column in COUNTERS
+)
+
+
+class StatisticsDAO:
+    """Class for maintaining precomputed statistics tables"""
+
+    models: tuple[Type[Model], ...] = (
+        models.GameStatistics,
+        models.CompanyFoundationStatistics,
+        models.UserCreationStatistics,
+        models.UserRoleStatistics,
+    )
+
+    async def _add_many(
+        self,
+        model: Type[Model],
+        key_type: str,
+        column: str,
+        amounts: dict[Any, int],
+    ) -> None:
+        """Add amounts to several counters with a single statement.
+
+        Args:
+            model (Type[Model]): Statistics model.
+            key_type (str): SQL type of the primary key.
+            column (str): Counter column.
+            amounts (dict[Any, int]): Primary keys of the rows and amounts.
+        """
+
+        table = model._meta.db_table
+        pk = model._meta.fields_db_projection[model._meta.pk_attr]
+        await model._meta.db.execute_query(
+            f'INSERT INTO "{table}" ("{pk}", "{column}") '
+            f"SELECT * FROM unnest($1::{key_type}[], $2::bigint[]) "
+            f'ON CONFLICT ("{pk}") DO UPDATE '
+            f'SET "{column}" = "{table}"."{column}" + EXCLUDED."{column}"',
+            [list(amounts.keys()), list(amounts.values())],
+        )
+
+    async def add_sales(self, rows: list[dict[str, Any]], sign: int) -> None:
+        """Add or subtract amounts of sales to their games' sums.
+
+        Args:
+            rows (list[dict[str, Any]]): Sales' ``game_id`` and ``amount``.
+            sign (int): 1 to add sales, -1 to subtract them.
+        """
+
+        sums: defaultdict[uuid.UUID, int] = defaultdict(int)
+        for row in rows:
+            sums[row["game_id"]] += sign * row["amount"]
+
+        await self.add_games_sales(sums)
+
+    async def add_games_sales(self, amounts: dict[uuid.UUID, int]) -> None:
+        if amounts:
+            await self._add_many(models.GameStatistics, "uuid", "sales_sum", amounts)
+
+    async def add_companies(self, rows: list[dict[str, Any]], sign: int) -> None:
+        """Add or subtract companies to counts of their foundation years.
+
+        Args:
+            rows (list[dict[str, Any]]): Companies' ``founded_at``.
+            sign (int): 1 to add companies, -1 to subtract them.
+        """
+
+        years: defaultdict[int, int] = defaultdict(int)
+        for row in rows:
+            years[row["founded_at"].year] += sign
+
+        if years:
+            await self._add_many(
+                models.CompanyFoundationStatistics,
+                "int",
+                "companies",
+                years,
+            )
+
+    async def add_users(self, rows: list[dict[str, Any]], sign: int) -> None:
+        """Add or subtract users to counts of their creation dates and roles.
+
+        Args:
+            rows (list[dict[str, Any]]): Users' ``date`` and ``is_superuser``.
+            sign (int): 1 to add users, -1 to subtract them.
+        """
+
+        dates: defaultdict[datetime.date, int] = defaultdict(int)
+        roles: defaultdict[bool, int] = defaultdict(int)
+        for row in rows:
+            dates[row["date"]] += sign
+            roles[row["is_superuser"]] += sign
+
+        if rows:
+            await self._add_many(models.UserCreationStatistics, "date", "users", dates)
+            await self._add_many(models.UserRoleStatistics, "boolean", "users", roles)
+
+    async def rebuild(self) -> None:
+        """Recompute statistics tables and counters from scratch."""
+
+        async with in_transaction(PRIMARY_CONNECTION) as connection:
+            for model in self.models:
+                await connection.execute_query(
+                    f'DELETE FROM "{model._meta.db_table}"',
+                )
+            for query in (*REBUILD_QUERIES, *REBUILD_COUNTER_QUERIES):
+                await connection.execute_query(query)
+
+        logger.debug("Rebuilt statistics")
@@ -1,19 +1,57 @@
 import datetime
 import logging
-from typing import Any
+import time
+import uuid
+from typing import Any, NamedTuple, Optional
 
 from dateutil.rrule import DAILY, rrule
 from pypika import CustomFunction, Interval, Parameter
 from tortoise.expressions import Q
-from tortoise.functions import Count, Function
+from tortoise.functions import Function
+from tortoise.transactions import in_transaction
 
+from backend.cache import invalidate_responses
 from backend.db import models
 from backend.db.dao.base import BaseDAO
+from backend.db.dao.documents import USER_COLUMNS, USER_DOCUMENT
+from backend.db.dao.statistics import StatisticsDAO
+from backend.db.routing import PRIMARY_CONNECTION, get_read_db
 from backend.exceptions import InvalidPasswordException, ObjectNotFoundException
-from backend.security import hash_password, verify_password
+from backend.security import hash_password_async, verify_password_async
+from backend.settings import settings
 
 logger = logging.getLogger(__name__)
 
+PRINCIPAL_CACHE_SIZE = 1024
+
+
+class Principal(NamedTuple):
+    """Identity and roles of an authenticated user."""
+
+    id: uuid.UUID
+    is_superuser: bool
+    is_primary: bool
+
+
+_principal_cache: dict[str, tuple[float, Principal]] = {}
+
+
+def invalidate_principals(*user_ids: str) -> None:
+    """Drop cached principals of the users.
+
+    Args:
+        user_ids (str): IDs of changed or deleted users.
+    """
+
+    for user_id in user_ids:
+        _principal_cache.pop(str(user_id), None)
+
+
+def clear_principals() -> None:
+    """Drop every cached principal, e.g. once the users are replaced."""
+
+    _principal_cache.clear()
+
 
 class TruncDate(Function):
     database_func = CustomFunction("DATE", ["name"])
@@ -34,6 +72,22 @@ class UserDAO(BaseDAO[models.User]):
             "created_platforms",
             "created_companies",
         ]
+        self.export_columns = USER_COLUMNS
+        self.document = USER_DOCUMENT
+        self.statistics = StatisticsDAO()
+
+    async def get_statistics_rows(
+        self,
+        expr: dict[str, Any],
+    ) -> list[dict[str, Any]]:
+        return (
+            await self.model.filter(**expr)
+            .annotate(date=TruncDate("created_at"))
+            .values("date", "is_superuser")
+        )
+
+    async def update_statistics(self, rows: list[dict[str, Any]], sign: int) -> None:
+        await self.statistics.add_users(rows, sign)
 
     async def create(self, user_in: dict[str, Any]) -> models.User:
         """Create user.
@@ -45,12 +99,16 @@ class UserDAO(BaseDAO[models.User]):
             User: User object.
         """
 
-        user_in["hashed_password"], user_in["salt"] = hash_password(
+        user_in["hashed_password"], user_in["salt"] = await hash_password_async(
             user_in["password"],
         )
         user_in.pop("password", None)
 
-        db_user = await self.model.create(**user_in)
+        async with in_transaction(PRIMARY_CONNECTION):
+            db_user = await self.model.create(**user_in)
+            rows = await self.get_statistics_rows({"id": db_user.id})
+            await self.update_statistics(rows, 1)
+        await invalidate_responses(self.name)
         await db_user.fetch_related(*self.related)
 
         logger.debug(f"Created user {db_user.username}")
@@ -68,11 +126,12 @@ class UserDAO(BaseDAO[models.User]):
         """
 
         if "password" in user_in:
-            hashed_password, salt = hash_password(user_in["password"])
+            hashed_password, salt = await hash_password_async(user_in["password"])
             user_in.pop("password", None)
             user_in.update({"hashed_password": hashed_password, "salt": salt})
 
         db_user = await super().update(user_in, user_id)
+        invalidate_principals(user_id)
         return db_user
 
     async def delete(self, user_id: str) -> None:
@@ -82,11 +141,17 @@ class UserDAO(BaseDAO[models.User]):
             user_id (str): ID of user to delete.
         """
 
-        c = await self.model.filter(Q(id=user_id) & Q(is_primary=False)).delete()
+        async with in_transaction(PRIMARY_CONNECTION):
+            rows = await self.get_statistics_rows({"id": user_id, "is_primary": False})
+            c = await self.model.filter(Q(id=user_id) & Q(is_primary=False)).delete()
+
+            if c != 1:
+                logger.error(f"{self.name} {user_id} not found")
+                raise ObjectNotFoundException(user_id)
 
-        if c != 1:
-            logger.error(f"{self.name} {user_id} not found")
-            raise ObjectNotFoundException(user_id)
+            await self.update_statistics(rows, -1)
+        invalidate_principals(user_id)
+        await invalidate_responses(*self.delete_tags)
 
         logger.debug(f"Deleted user {user_id}")
 
@@ -97,7 +162,14 @@ class UserDAO(BaseDAO[models.User]):
             user_ids (list[str]): IDs of users to delete.
         """
 
-        await self.model.filter(Q(id__in=user_ids) & Q(is_primary=False)).delete()
+        async with in_transaction(PRIMARY_CONNECTION):
+            rows = await self.get_statistics_rows(
+                {"id__in": user_ids, "is_primary": False},
+            )
+            await self.model.filter(Q(id__in=user_ids) & Q(is_primary=False)).delete()
+            await self.update_statistics(rows, -1)
+        invalidate_principals(*user_ids)
+        await invalidate_responses(*self.delete_tags)
 
     async def get_by_expr(self, **kwargs) -> models.User | None:
         """Get user by expression.
@@ -128,6 +200,7 @@ class UserDAO(BaseDAO[models.User]):
         Raises:
             ObjectNotFoundException: User not found.
             InvalidPasswordException: Invalid password.
+            HashingPoolSaturatedException: Too many passwords are being verified.
 
         Returns:
             User: User object.
@@ -139,13 +212,47 @@ class UserDAO(BaseDAO[models.User]):
             logger.error(f"User {username} not found")
             raise ObjectNotFoundException(f"User {username} not found")
 
-        if not verify_password(password, user.salt, user.hashed_password):
+        if not await verify_password_async(password, user.salt, user.hashed_password):
             logger.error(f"User {username} password incorrect")
             raise InvalidPasswordException(f"User {username} password incorrect")
 
         logger.debug(f"Authenticated user {username}")
         return user
 
+    async def get_principal(self, user_id: str) -> Optional[Principal]:
+        """Get user's identity and roles, cached per user.
+
+        Only scalar columns are selected, relations are never loaded.
+
+        Args:
+            user_id (str): User ID.
+
+        Returns:
+            Optional[Principal]: Principal, at most ``principal_cache_ttl``
+                seconds old. None if user doesn't exist.
+        """
+
+        key = str(user_id)
+        now = time.monotonic()
+        cached = _principal_cache.pop(key, None)
+        if cached is not None and cached[0] > now:
+            _principal_cache[key] = cached
+            return cached[1]
+
+        row = (
+            await self.model.filter(id=key)
+            .first()
+            .values("id", "is_superuser", "is_primary")
+        )
+        if row is None:
+            return None
+
+        principal = Principal(**row)
+        if len(_principal_cache) >= PRINCIPAL_CACHE_SIZE:
+            _principal_cache.pop(next(iter(_principal_cache)))
+        _principal_cache[key] = (now + settings.principal_cache_ttl, principal)
+        return principal
+
     async def get_primary_user(self) -> models.User | None:
         """Get primary user.
 
@@ -161,13 +268,13 @@ class UserDAO(BaseDAO[models.User]):
         logger.debug(f"Got primary user {user.username}")
         return user
 
-    async def get_user_creation_statistics(self, days: int) -> list[dict]:
+    async def get_user_creation_statistics(self, days: int) -> list[dict[str, Any]]:
         data = (
-            await self.model.filter(
-                created_at__gte=Parameter("CURRENT_DATE") - Interval(days=days),
+            await models.UserCreationStatistics.filter(
+                date__gte=Parameter("CURRENT_DATE") - Interval(days=days),
+                users__gt=0,
             )
-            .annotate(date=TruncDate("created_at"), users=Count("id"))
-            .group_by("date")
+            .using_db(get_read_db())
             .order_by("date")
             .values("date", "users")
         )
@@ -181,11 +288,10 @@ class UserDAO(BaseDAO[models.User]):
             data.append({"date": d, "users": 0})
         return sorted(data, key=lambda x: x["date"])
 
-    async def get_users_role_statistics(self) -> list[dict]:
+    async def get_users_role_statistics(self) -> list[dict[str, Any]]:
         data = (
-            await self.model.all()
-            .annotate(users=Count("id"))
-            .group_by("is_superuser")
+            await models.UserRoleStatistics.filter(users__gt=0)
+            .using_db(get_read_db())
             .values("is_superuser", "users")
         )
         return data
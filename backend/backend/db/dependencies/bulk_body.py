@@ -0,0 +1,197 @@
+import json
+from typing import Any, AsyncIterator, Optional, Sequence, Type
+from uuid import UUID
+
+from fastapi import HTTPException, Request, status
+from pydantic import BaseModel, ValidationError
+
+from backend.custom_types import BulkResult, BulkRowError
+from backend.db.dao.base import BulkRow
+from backend.settings import settings
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson")
+
+
+def check_size(amount: int) -> None:
+    """Reject the request once it has more rows than allowed.
+
+    Args:
+        amount (int): Amount of rows read so far.
+
+    Raises:
+        HTTPException: Too many rows.
+    """
+
+    if amount > settings.bulk_max_rows:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.bulk_max_rows} rows are allowed",
+        )
+
+
+def check_line_size(size: int) -> None:
+    """Reject the request once a line of the body is longer than allowed.
+
+    Args:
+        size (int): Size of the line read so far, in bytes.
+
+    Raises:
+        HTTPException: Line is too long.
+    """
+
+    if size > settings.bulk_max_line_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Lines must be at most {settings.bulk_max_line_bytes} bytes",
+        )
+
+
+async def read_body(request: Request) -> bytes:
+    """Read the body, rejecting it once it's larger than allowed.
+
+    Args:
+        request (Request): Request.
+
+    Raises:
+        HTTPException: Body is too large.
+
+    Returns:
+        bytes: Body.
+    """
+
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > settings.bulk_max_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Body must be at most {settings.bulk_max_bytes} bytes",
+            )
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def read_lines(request: Request) -> AsyncIterator[bytes]:
+    """Read non-empty lines of the body while it's received.
+
+    Each chunk is split once. Only the pieces of the incomplete last line are
+    kept until its end is received.
+
+    Args:
+        request (Request): Request.
+
+    Yields:
+        bytes: Line.
+    """
+
+    parts: list[bytes] = []
+    size = 0
+    async for chunk in request.stream():
+        *lines, rest = chunk.split(b"\n")
+        if lines:
+            lines[0] = b"".join((*parts, lines[0]))
+            parts, size = [], 0
+        for line in lines:
+            check_line_size(len(line))
+            if line.strip():
+                yield line
+        parts.append(rest)
+        size += len(rest)
+        check_line_size(size)
+
+    line = b"".join(parts)
+    if line.strip():
+        yield line
+
+
+class BulkBody:
+    """Reads rows of a bulk request, validating each row on its own.
+
+    The body is either a JSON array or NDJSON, one row per line. Rows which
+    fail validation are returned as errors instead of rejecting the request.
+    """
+
+    def __init__(self, schema: Type[BaseModel]):
+        self.schema = schema
+
+    async def __call__(self, request: Request) -> list[BaseModel | BulkRowError]:
+        content_type = request.headers.get("content-type", "").split(";")[0]
+        if content_type in NDJSON_TYPES:
+            rows = await self._read_ndjson(request)
+        else:
+            rows = await self._read_json(request)
+        check_size(len(rows))
+        return [self._validate(index, row) for index, row in enumerate(rows)]
+
+    async def _read_json(self, request: Request) -> list[Any]:
+        body = await read_body(request)
+        try:
+            rows = json.loads(body)
+        except ValueError as error:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Body isn't valid JSON",
+            ) from error
+        if not isinstance(rows, list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Body must be a JSON array",
+            )
+        return rows
+
+    async def _read_ndjson(self, request: Request) -> list[Any]:
+        # The rest of the body isn't read once there are too many rows
+        rows = []
+        async for line in read_lines(request):
+            rows.append(self._parse_line(line))
+            check_size(len(rows))
+        return rows
+
+    @staticmethod
+    def _parse_line(line: bytes) -> Any:
+        try:
+            return json.loads(line)
+        except ValueError as error:
+            # Keep the row, so it's reported under its index
+            return error
+
+    def _validate(self, index: int, row: Any) -> BaseModel | BulkRowError:
+        if isinstance(row, ValueError):
+            return BulkRowError(index=index, detail=f"Invalid JSON: {row}")
+        try:
+            return self.schema.parse_obj(row)
+        except ValidationError as error:
+            detail = "; ".join(
+                f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in error.errors()
+            )
+            return BulkRowError(index=index, detail=detail)
+
+
+def get_bulk_result(
+    rows: Sequence[BaseModel | BulkRowError],
+    outcomes: list[BulkRow],
+) -> BulkResult:
+    """Merge validation errors and outcomes of the valid rows.
+
+    Args:
+        rows (Sequence[BaseModel | BulkRowError]): Rows read by ``BulkBody``.
+        outcomes (list[BulkRow]): Outcomes of the valid rows.
+
+    Returns:
+        BulkResult: Result of the bulk request.
+    """
+
+    errors = [row for row in rows if isinstance(row, BulkRowError)]
+    ids: list[Optional[UUID]] = [None] * len(rows)
+    created = updated = 0
+    for outcome in outcomes:
+        if outcome.error is not None:
+            errors.append(BulkRowError(index=outcome.row_index, detail=outcome.error))
+            continue
+        ids[outcome.row_index] = outcome.id
+        created += outcome.created
+        updated += not outcome.created
+
+    errors.sort(key=lambda error: error.index)
+    return BulkResult(created=created, updated=updated, ids=ids, errors=errors)
@@ -0,0 +1,27 @@
+from typing import Optional, Type
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+from pydantic.utils import lenient_issubclass
+
+
+class IncludeValidation:
+    def __init__(self, schema: Type[BaseModel]):
+        self.relations = {
+            name
+            for name, field in schema.__fields__.items()
+            if lenient_issubclass(field.type_, BaseModel)
+        }
+
+    def __call__(self, include: str = Query(default=None)) -> Optional[list[str]]:
+        if include is None:
+            return None
+
+        params = [param.strip() for param in include.split(",") if param.strip()]
+        for param in params:
+            if param not in self.relations:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid include field: {param}",
+                )
+        return params
@@ -0,0 +1,138 @@
+from typing import Any, Awaitable, Optional
+
+from fastapi import HTTPException, Response, status
+
+from backend.custom_types import CommonQueries
+from backend.db.dao.base import BaseDAO, JSONDocument, ModelType, PageType
+from backend.exceptions import InvalidCursorException
+
+
+async def get_page(
+    response: Response,
+    dao: BaseDAO[ModelType],
+    queries: CommonQueries,
+    sort: list[str],
+    include: Optional[list[str]],
+    expr: Optional[dict[str, Any]] = None,
+) -> list[ModelType]:
+    """Get page of a list endpoint and set its pagination headers.
+
+    ``X-Total-Count`` is set unless counting is turned off, ``X-Next-Cursor``
+    if a cursor page is followed by another one.
+
+    Args:
+        response (Response): Response.
+        dao (BaseDAO[ModelType]): DAO of the listed objects.
+        queries (CommonQueries): Query parameters.
+        sort (list[str]): Order parameters.
+        include (Optional[list[str]]): Relations to include.
+        expr (Optional[dict[str, Any]]): Filter expression.
+
+    Returns:
+        list[ModelType]: Objects of the page.
+    """
+
+    page = dao.get_multi_with_count(
+        expr=expr,
+        offset=queries.skip,
+        limit=queries.limit,
+        sort=sort,
+        cursor=queries.cursor,
+        count=queries.count,
+        include=include,
+    )
+    return await paginate(response, dao, queries, sort, page)
+
+
+async def get_json_page(
+    response: Response,
+    dao: BaseDAO[Any],
+    queries: CommonQueries,
+    sort: list[str],
+    include: Optional[list[str]],
+    expr: Optional[dict[str, Any]] = None,
+) -> Response:
+    """Get page of a list endpoint as documents serialized by the database.
+
+    Args:
+        response (Response): Response.
+        dao (BaseDAO[Any]): DAO of the listed objects.
+        queries (CommonQueries): Query parameters.
+        sort (list[str]): Order parameters.
+        include (Optional[list[str]]): Relations to include.
+        expr (Optional[dict[str, Any]]): Filter expression.
+
+    Returns:
+        Response: JSON array with the pagination headers.
+    """
+
+    page = dao.get_multi_json_with_count(
+        expr=expr,
+        offset=queries.skip,
+        limit=queries.limit,
+        sort=sort,
+        cursor=queries.cursor,
+        count=queries.count,
+        include=include,
+    )
+    documents = await paginate(response, dao, queries, sort, page)
+    return get_json_response(response, documents)
+
+
+async def paginate(
+    response: Response,
+    dao: BaseDAO[Any],
+    queries: CommonQueries,
+    sort: list[str],
+    page: Awaitable[tuple[Optional[int], PageType]],
+) -> PageType:
+    """Await the page and set its pagination headers.
+
+    Args:
+        response (Response): Response.
+        dao (BaseDAO[Any]): DAO of the listed objects.
+        queries (CommonQueries): Query parameters.
+        sort (list[str]): Order parameters.
+        page (Awaitable[tuple[Optional[int], PageType]]): Amount and page.
+
+    Raises:
+        HTTPException: Cursor is malformed or doesn't match the order.
+
+    Returns:
+        PageType: Objects or documents of the page.
+    """
+
+    try:
+        amount, objects = await page
+    except InvalidCursorException as error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(error),
+        ) from error
+
+    if queries.cursor is not None:
+        next_cursor = dao.get_next_cursor(objects, queries.limit, sort)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+
+    if amount is not None:
+        response.headers["X-Total-Count"] = str(amount)
+    return objects
+
+
+def get_json_response(response: Response, documents: list[JSONDocument]) -> Response:
+    """Send documents serialized by the database as a JSON array.
+
+    Args:
+        response (Response): Response with the pagination headers.
+        documents (list[JSONDocument]): Documents.
+
+    Returns:
+        Response: JSON array.
+    """
+
+    return Response(
+        content=f"[{','.join(document.document for document in documents)}]",
+        media_type="application/json",
+        headers=dict(response.headers),
+    )
@@ -0,0 +1,23 @@
+from typing import AsyncIterator
+
+from tortoise.transactions import in_transaction
+
+from backend.db.routing import get_read_connection_name
+
+
+class StatementTimeout:
+    """Runs the request's reads in a transaction with a statement timeout.
+
+    Keeps an expensive endpoint from holding a pooled connection for longer
+    than the timeout. Exceeding it raises ``QueryCanceledError``.
+    """
+
+    def __init__(self, milliseconds: int):
+        self.milliseconds = milliseconds
+
+    async def __call__(self) -> AsyncIterator[None]:
+        async with in_transaction(get_read_connection_name()) as connection:
+            await connection.execute_script(
+                f"SET LOCAL statement_timeout = {int(self.milliseconds)}",
+            )
+            yield
@@ -4,8 +4,7 @@ from jose import jwt
 from jose.exceptions import JWTError
 from pydantic import ValidationError
 
-from backend.db.dao import UserDAO
-from backend.db.models.user import User
+from backend.db.dao import Principal, UserDAO
 from backend.settings import settings
 
 reusable_oauth2 = OAuth2PasswordBearer(tokenUrl=f"/api/auth/access-token")
@@ -14,9 +13,11 @@ reusable_oauth2 = OAuth2PasswordBearer(tokenUrl=f"/api/auth/access-token")
 async def get_current_user(
     user_dao: UserDAO = Depends(),
     token: str = Depends(reusable_oauth2),
-) -> User:
+) -> Principal:
     """Get current user.
 
+    Only the user's identity and roles are loaded, cached per user.
+
     Args:
         user_dao (UserDAO): User DAO.
         token (str): JWT token.
@@ -26,7 +27,7 @@ async def get_current_user(
         HTTPException: User not found.
 
     Returns:
-        User: Current user.
+        Principal: Current user.
     """
 
     try:
@@ -42,7 +43,7 @@ async def get_current_user(
             detail="Could not validate credentials",
         )
 
-    user = await user_dao.get(token_data["sub"])
+    user = await user_dao.get_principal(token_data["sub"])
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -51,17 +52,19 @@ async def get_current_user(
     return user
 
 
-async def get_current_superuser(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_superuser(
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     """Get current superuser.
 
     Args:
-        current_user (User): Current user.
+        current_user (Principal): Current user.
 
     Raises:
         HTTPException: User is not superuser.
 
     Returns:
-        User: Current superuser.
+        Principal: Current superuser.
     """
 
     if not current_user.is_superuser:
@@ -0,0 +1,56 @@
+"""Custom filter operators of the models."""
+from typing import Any, Optional, Type
+
+from pypika.terms import Criterion, Term
+from tortoise.filters import Like, escape_like, string_encoder
+from tortoise.models import Model
+
+
+class ILike(Like):
+    def __init__(
+        self,
+        left: Term,
+        right: Term,
+        alias: Optional[str] = None,
+        escape: str = " ESCAPE '\\'",
+    ) -> None:
+        super().__init__(left, right, alias=alias, escape=escape)
+        self.comparator = " ILIKE "
+
+
+def trigram_icontains(field: Term, value: str) -> Criterion:
+    """Case-insensitive containment which trigram indexes can serve.
+
+    Unlike ``icontains`` the column isn't wrapped into ``UPPER(CAST(...))``,
+    so ``"column" ILIKE '%value%'`` matches the ``gin_trgm_ops`` indexes.
+
+    Args:
+        field (Term): Column.
+        value (str): Substring to look for.
+
+    Returns:
+        Criterion: Filter criterion.
+    """
+
+    return ILike(field, field.wrap_constant(f"%{escape_like(value)}%"))
+
+
+def add_trigram_filters(model: Type[Model], *field_names: str) -> None:
+    """Register ``<field>__trigram_icontains`` lookups of the model.
+
+    Must be called before Tortoise is initialized, which compiles the filters.
+
+    Args:
+        model (Type[Model]): Model.
+        field_names (str): Text fields with trigram indexes.
+    """
+
+    for name in field_names:
+        field = model._meta.fields_map[name]
+        lookup: dict[str, Any] = {
+            "field": name,
+            "source_field": field.source_field or name,
+            "operator": trigram_icontains,
+            "value_encoder": string_encoder,
+        }
+        model._meta._filters[f"{name}__trigram_icontains"] = lookup
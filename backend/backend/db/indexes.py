@@ -0,0 +1,392 @@
+"""Indexes needed by the list endpoints and their creation."""
+import logging
+from enum import Enum
+from typing import Any, Callable, Collection, Iterator, NamedTuple, Optional, Type
+
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.backends.base.schema_generator import BaseSchemaGenerator
+from tortoise.fields import BooleanField, Field
+from tortoise.fields.relational import (
+    BackwardFKRelation,
+    BackwardOneToOneRelation,
+    ForeignKeyFieldInstance,
+    ManyToManyFieldInstance,
+    OneToOneFieldInstance,
+)
+from tortoise.models import Model
+
+from backend.custom_types import (
+    CompanyOrderColumns,
+    GameOrderColumns,
+    GenreOrderColumns,
+    PlatformOrderColumns,
+    SaleOrderColumns,
+    UserOrderColumns,
+)
+from backend.db.dao import (
+    CompanyDAO,
+    GameDAO,
+    GenreDAO,
+    PlatformDAO,
+    UserDAO,
+)
+from backend.db.dao.base import BaseDAO
+from backend.db.dao.sale import SaleDAO
+
+logger = logging.getLogger(__name__)
+
+# Lookup served by gin indexes of the trigram operator class, see db/filters.py
+TRIGRAM_LOOKUP = "trigram_icontains"
+TRIGRAM_OPCLASS = "gin_trgm_ops"
+USER_TRIGRAM_FILTER = f"created_by_user__username__{TRIGRAM_LOOKUP}"
+
+# DAOs of the list endpoints, their order columns and filters
+LISTS: tuple[
+    tuple[Callable[[], BaseDAO[Any]], Type[Enum], tuple[str, ...]],
+    ...,
+] = (
+    (
+        GameDAO,
+        GameOrderColumns,
+        (
+            f"title__{TRIGRAM_LOOKUP}",
+            "released_at__gte",
+            USER_TRIGRAM_FILTER,
+            f"created_by_company__title__{TRIGRAM_LOOKUP}",
+        ),
+    ),
+    (
+        SaleDAO,
+        SaleOrderColumns,
+        (
+            f"game__title__{TRIGRAM_LOOKUP}",
+            f"platform__title__{TRIGRAM_LOOKUP}",
+            USER_TRIGRAM_FILTER,
+        ),
+    ),
+    (
+        CompanyDAO,
+        CompanyOrderColumns,
+        (f"title__{TRIGRAM_LOOKUP}", USER_TRIGRAM_FILTER),
+    ),
+    (GenreDAO, GenreOrderColumns, (f"title__{TRIGRAM_LOOKUP}", USER_TRIGRAM_FILTER)),
+    (
+        PlatformDAO,
+        PlatformOrderColumns,
+        (f"title__{TRIGRAM_LOOKUP}", USER_TRIGRAM_FILTER),
+    ),
+    (
+        UserDAO,
+        UserOrderColumns,
+        (f"username__{TRIGRAM_LOOKUP}", f"email__{TRIGRAM_LOOKUP}"),
+    ),
+)
+
+EXISTING_INDEXES_QUERY = """
+SELECT
+    t."relname" AS "table",
+    c."relname" AS "name",
+    i."indisvalid" AS "valid",
+    i."indisprimary" AS "primary",
+    am."amname" AS "method",
+    array(
+        SELECT a."attname"
+        FROM unnest(i."indkey"::int2[]) WITH ORDINALITY AS k("attnum", "position")
+        JOIN pg_attribute a
+            ON a."attrelid" = i."indrelid" AND a."attnum" = k."attnum"
+        ORDER BY k."position"
+    ) AS "columns",
+    array(
+        SELECT o."opcname"
+        FROM unnest(i."indclass"::oid[]) WITH ORDINALITY AS k("oid", "position")
+        JOIN pg_opclass o ON o."oid" = k."oid"
+        ORDER BY k."position"
+    ) AS "opclasses"
+FROM pg_index i
+JOIN pg_class t ON t."oid" = i."indrelid"
+JOIN pg_class c ON c."oid" = i."indexrelid"
+JOIN pg_am am ON am."oid" = c."relam"
+WHERE t."relnamespace" = current_schema()::regnamespace
+    AND am."amname" IN ('btree', 'gin')
+"""
+
+
+class RequiredIndex(NamedTuple):
+    """Index whose leading columns serve a join, filter or order.
+
+    B-tree indexes serve joins, orders and comparisons, gin indexes of
+    ``gin_trgm_ops`` serve trigram filters of a single column.
+    """
+
+    table: str
+    columns: tuple[str, ...]
+    # Why the index is needed, e.g. "Game order by released_at"
+    reason: str
+    # Join tables get it as their primary key
+    primary: bool = False
+    method: str = "btree"
+    # Operator class of the columns, the default one if None
+    opclass: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        """Name tortoise gives indexes of fields with ``index=True``.
+
+        Trigram indexes are named like the ones of the migrations.
+        """
+
+        if self.primary:
+            return f"{self.table}_pkey"
+        if self.opclass == TRIGRAM_OPCLASS:
+            return f"idx_{self.table[:11]}_{self.columns[0][:7]}_trgm"
+        table_hash = BaseSchemaGenerator._make_hash(  # noqa: WPS437
+            self.table,
+            *self.columns,
+            length=6,
+        )
+        return f"idx_{self.table[:11]}_{self.columns[0][:7]}_{table_hash}"
+
+    @property
+    def definition(self) -> str:
+        """Method and columns of ``CREATE INDEX``."""
+
+        opclass = f" {self.opclass}" if self.opclass else ""
+        columns = ", ".join(f'"{column}"{opclass}' for column in self.columns)
+        return f"USING {self.method} ({columns})"
+
+    def is_served_by(self, index: dict[str, Any]) -> bool:
+        """Check whether an existing index serves this one.
+
+        Args:
+            index (dict[str, Any]): Row of ``EXISTING_INDEXES_QUERY``.
+
+        Returns:
+            bool: True if the index is valid, of the same method and starts
+                with the columns, of the operator class if there is one.
+        """
+
+        width = len(self.columns)
+        opclasses = set(index["opclasses"][:width])
+        return (
+            index["table"] == self.table
+            and index["valid"]
+            and index["method"] == self.method
+            and (index["primary"] or not self.primary)
+            and tuple(index["columns"][:width]) == self.columns
+            and (self.opclass is None or opclasses == {self.opclass})
+        )
+
+
+def get_counter_indexes(
+    model: Type[Model],
+    name: str,
+    reason: str,
+) -> Iterator[RequiredIndex]:
+    """Get index of the counter the to-many relation is sorted by.
+
+    Args:
+        model (Type[Model]): Model of the relation.
+        name (str): Name of the relation.
+        reason (str): Why the relation is used.
+
+    Yields:
+        RequiredIndex: Index, if the relation has a counter.
+    """
+
+    counter = f"{name}_count"
+    if counter in model._meta.fields_map:
+        yield RequiredIndex(model._meta.db_table, (counter,), reason)
+
+
+def get_field_indexes(
+    model: Type[Model],
+    name: str,
+    field: Field[Any],
+    reason: str,
+) -> Iterator[RequiredIndex]:
+    """Get indexes joining along the field or filtering and ordering by it.
+
+    Args:
+        model (Type[Model]): Model of the field.
+        name (str): Name of the field.
+        field (Field[Any]): Field.
+        reason (str): Why the field is used.
+
+    Yields:
+        RequiredIndex: Index.
+    """
+
+    table = model._meta.db_table
+    if isinstance(field, (OneToOneFieldInstance, BackwardOneToOneRelation)):
+        # Both sides are primary keys
+        return
+    if isinstance(field, ForeignKeyFieldInstance):
+        yield RequiredIndex(table, (field.source_field or f"{name}_id",), reason)
+    elif isinstance(field, BackwardFKRelation):
+        yield from get_counter_indexes(model, name, reason)
+        related_table = field.related_model._meta.db_table
+        relation_field = field.related_model._meta.fields_map[field.relation_field]
+        yield RequiredIndex(related_table, (relation_field.source_field,), reason)
+    elif isinstance(field, ManyToManyFieldInstance):
+        yield from get_counter_indexes(model, name, reason)
+        # Same for both sides, the second column is looked up by the other
+        keys = tuple(sorted((field.backward_key, field.forward_key)))
+        yield RequiredIndex(field.through, keys, reason, primary=True)
+        yield RequiredIndex(field.through, keys[1:], reason)
+    elif not (field.pk or isinstance(field, BooleanField)):
+        # Two values don't make a useful order or filter
+        yield RequiredIndex(table, (field.source_field or name,), reason)
+
+
+def resolve_path(
+    model: Type[Model],
+    path: str,
+) -> tuple[list[tuple[Type[Model], str, Field[Any]]], list[str]]:
+    """Split field path into its fields and lookups.
+
+    Args:
+        model (Type[Model]): Model the path starts from.
+        path (str): Field path, e.g. ``created_by_user__username__gte``.
+
+    Returns:
+        tuple[list[tuple[Type[Model], str, Field[Any]]], list[str]]: Models,
+            names and fields along the path, and lookups like ``gte``.
+    """
+
+    fields: list[tuple[Type[Model], str, Field[Any]]] = []
+    names = path.split("__")
+    field_model: Optional[Type[Model]] = model
+    for number, name in enumerate(names):
+        field = field_model._meta.fields_map.get(name) if field_model else None
+        if field is None:
+            return fields, names[number:]
+        fields.append((field_model, name, field))  # type: ignore
+        field_model = getattr(field, "related_model", None)
+    return fields, []
+
+
+def get_path_indexes(
+    model: Type[Model],
+    path: str,
+    reason: str,
+) -> Iterator[RequiredIndex]:
+    """Get indexes joining along the field path and filtering its last field.
+
+    Trigram filters need a gin index of the last field instead of a b-tree one.
+
+    Args:
+        model (Type[Model]): Model the path starts from.
+        path (str): Field path, e.g. ``created_by_user__username``.
+        reason (str): Why the path is used.
+
+    Yields:
+        RequiredIndex: Index.
+    """
+
+    fields, lookups = resolve_path(model, path)
+    if lookups == [TRIGRAM_LOOKUP]:
+        field_model, name, field = fields.pop()
+        yield RequiredIndex(
+            field_model._meta.db_table,
+            (field.source_field or name,),
+            reason,
+            method="gin",
+            opclass=TRIGRAM_OPCLASS,
+        )
+    for field_model, name, field in fields:
+        yield from get_field_indexes(field_model, name, field, reason)
+
+
+def get_required_indexes() -> list[RequiredIndex]:
+    """Get indexes used by orders, filters and prefetch paths of the lists.
+
+    Returns:
+        list[RequiredIndex]: Indexes, each table, columns and method once.
+    """
+
+    indexes: dict[tuple[str, tuple[str, ...], str], RequiredIndex] = {}
+    for dao_class, columns_enum, filters in LISTS:
+        dao = dao_class()
+        model = dao.model
+        paths = [
+            *((column.name.lower(), "order by") for column in columns_enum),
+            *((path, "filter by") for path in filters),
+            *((path, "prefetch") for path in dao.related),
+        ]
+        for path, usage in paths:
+            reason = f"{model.__name__} {usage} {path}"
+            for index in get_path_indexes(model, path, reason):
+                indexes.setdefault((index.table, index.columns, index.method), index)
+    return list(indexes.values())
+
+
+async def get_missing_indexes(
+    db: BaseDBAsyncClient,
+) -> tuple[list[RequiredIndex], list[str]]:
+    """Compare required indexes with the existing ones.
+
+    Args:
+        db (BaseDBAsyncClient): Database.
+
+    Returns:
+        tuple[list[RequiredIndex], list[str]]: Missing indexes and names of
+            invalid indexes left by failed concurrent creations.
+    """
+
+    existing = await db.execute_query_dict(EXISTING_INDEXES_QUERY)
+    missing = [
+        required
+        for required in get_required_indexes()
+        if not any(required.is_served_by(index) for index in existing)
+    ]
+    invalid = [index["name"] for index in existing if not index["valid"]]
+    return missing, invalid
+
+
+async def create_index(
+    db: BaseDBAsyncClient,
+    index: RequiredIndex,
+    invalid: Collection[str] = (),
+) -> None:
+    """Create index without blocking writes to the table.
+
+    An invalid index of the same name left by a failed creation is dropped
+    first. Valid indexes are never dropped. Primary keys of join tables are
+    built as unique indexes after removing duplicated links, then attached
+    to the table.
+
+    Args:
+        db (BaseDBAsyncClient): Database, outside of a transaction.
+        index (RequiredIndex): Index.
+        invalid (Collection[str]): Names of invalid indexes reported by
+            ``get_missing_indexes``.
+    """
+
+    if index.name in invalid:
+        await db.execute_script(f'DROP INDEX CONCURRENTLY "{index.name}"')
+        logger.debug(f"Dropped invalid index {index.name}")
+    if not index.primary:
+        await db.execute_script(
+            f'CREATE INDEX CONCURRENTLY "{index.name}" '
+            f'ON "{index.table}" {index.definition}',
+        )
+        logger.debug(f"Created index {index.name}")
+        return
+
+    conditions = " AND ".join(
+        f'duplicate."{column}" = "{index.table}"."{column}"'
+        for column in index.columns
+    )
+    await db.execute_script(
+        f'DELETE FROM "{index.table}" USING "{index.table}" duplicate '
+        f'WHERE {conditions} AND duplicate."ctid" < "{index.table}"."ctid"',
+    )
+    await db.execute_script(
+        f'CREATE UNIQUE INDEX CONCURRENTLY "{index.name}" '
+        f'ON "{index.table}" {index.definition}',
+    )
+    await db.execute_script(
+        f'ALTER TABLE "{index.table}" ADD CONSTRAINT "{index.name}" '
+        f'PRIMARY KEY USING INDEX "{index.name}"',
+    )
+    logger.debug(f"Created primary key {index.name}")
@@ -0,0 +1,352 @@
+"""Request-scoped loading of related objects."""
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterable, Optional, Sequence, Type
+
+from tortoise.fields.relational import (
+    BackwardFKRelation,
+    BackwardOneToOneRelation,
+    ForeignKeyFieldInstance,
+    ManyToManyFieldInstance,
+    OneToOneFieldInstance,
+)
+from tortoise.models import Model
+
+from backend.db.routing import get_read_db
+
+# Prefetch paths split into a tree, e.g. {"sales": {"game": {}}}
+PathTree = dict[str, "PathTree"]
+# Level of the tree: model, objects and relations to load of them
+Level = list[tuple[Type[Model], list[Model], PathTree]]
+# Owner's primary key -> primary keys of its related objects
+Links = dict[Any, list[Any]]
+# Relations the loader handles, see ``DataLoader._handlers``
+LOADED_RELATIONS = (
+    ForeignKeyFieldInstance,
+    OneToOneFieldInstance,
+    BackwardFKRelation,
+    BackwardOneToOneRelation,
+    ManyToManyFieldInstance,
+)
+
+_loader: ContextVar[Optional["DataLoader"]] = ContextVar("loader", default=None)
+
+
+def get_path_tree(model: Type[Model], paths: Sequence[str]) -> PathTree:
+    """Split prefetch paths into a tree, checking the loader handles them.
+
+    Args:
+        model (Type[Model]): Model the paths start from.
+        paths (Sequence[str]): Prefetch paths, e.g. ``sales__game``.
+
+    Raises:
+        ValueError: Path has a field which isn't a relation the loader handles.
+
+    Returns:
+        PathTree: Relations to load.
+    """
+
+    tree: PathTree = {}
+    for path in paths:
+        node, node_model = tree, model
+        for field in path.split("__"):
+            relation: Any = node_model._meta.fields_map.get(field)
+            if type(relation) not in LOADED_RELATIONS:
+                raise ValueError(f"Can't load {node_model.__name__}.{field}")
+            node = node.setdefault(field, {})
+            node_model = relation.related_model
+    return tree
+
+
+def get_relations(model: Type[Model], tree: PathTree) -> list[tuple[str, Any]]:
+    """Get relations of the model on the top level of the tree.
+
+    Args:
+        model (Type[Model]): Model.
+        tree (PathTree): Relations to load.
+
+    Returns:
+        list[tuple[str, Any]]: Names and fields of the relations.
+    """
+
+    return [(field, model._meta.fields_map[field]) for field in tree]
+
+
+class DataLoader:
+    """Loads relations of objects, fetching every object at most once.
+
+    Relations are loaded level by level for all the objects at once. Objects
+    referenced on a level are fetched by a single ``id = ANY(...)`` query per
+    model, skipping the ones loaded before, so the amount of queries doesn't
+    depend on the amount of objects and each row has a single instance shared
+    by all relations referencing it.
+    """
+
+    def __init__(self) -> None:
+        # Model -> primary key -> loaded object
+        self._objects: defaultdict[Type[Model], dict[Any, Model]] = defaultdict(
+            dict,
+        )
+        # Relation type -> links getter and setter of the related objects
+        self._handlers: dict[
+            type,
+            tuple[
+                Callable[[Any, list[Model]], Awaitable[Links]],
+                Callable[[Model, str, list[Model]], None],
+            ],
+        ] = {
+            ForeignKeyFieldInstance: (self._get_fk_links, self._set_fk),
+            OneToOneFieldInstance: (self._get_fk_links, self._set_fk),
+            BackwardFKRelation: (self._get_reverse_links, self._set_many),
+            BackwardOneToOneRelation: (self._get_reverse_links, self._set_reverse_o2o),
+            ManyToManyFieldInstance: (self._get_m2m_links, self._set_many),
+        }
+
+    def clear(self) -> None:
+        """Forget loaded objects, e.g. after they were changed."""
+
+        self._objects.clear()
+
+    def _remember(self, objects: Iterable[Model]) -> list[Model]:
+        """Register objects, replacing the ones loaded before by their instances.
+
+        Args:
+            objects (Iterable[Model]): Fetched objects.
+
+        Returns:
+            list[Model]: Instances of the objects.
+        """
+
+        return [
+            self._objects[type(obj)].setdefault(obj.pk, obj) for obj in objects
+        ]
+
+    async def load(
+        self,
+        model: Type[Model],
+        ids: Iterable[Any],
+    ) -> dict[Any, Model]:
+        """Get objects by primary keys, fetching only the ones not loaded yet.
+
+        Args:
+            model (Type[Model]): Model of the objects.
+            ids (Iterable[Any]): Primary keys.
+
+        Returns:
+            dict[Any, Model]: Primary keys and objects, missing ones are skipped.
+        """
+
+        loaded = self._objects[model]
+        ids = set(ids)
+        missing = [obj_id for obj_id in ids if obj_id not in loaded]
+        if missing:
+            self._remember(
+                await model.filter(pk__in=missing).using_db(get_read_db()),
+            )
+        return {obj_id: loaded[obj_id] for obj_id in ids if obj_id in loaded}
+
+    async def load_related(
+        self,
+        objects: Sequence[Model],
+        paths: Sequence[str],
+    ) -> None:
+        """Load relations of the objects like ``prefetch_related`` does.
+
+        Args:
+            objects (Sequence[Model]): Objects of the same model.
+            paths (Sequence[str]): Prefetch paths, e.g. ``sales__game``.
+        """
+
+        if not objects:
+            return
+
+        # Unsupported paths fail before any query is sent
+        tree = get_path_tree(type(objects[0]), paths)
+        for obj in objects:
+            # Given objects are the freshest ones
+            self._objects[type(obj)][obj.pk] = obj
+
+        level: Level = [(type(objects[0]), list(objects), tree)]
+        while level:
+            level = await self._load_level(level)
+
+    async def _load_level(self, level: Level) -> Level:
+        """Load one level of relations of all the objects.
+
+        Args:
+            level (Level): Models, objects and relations to load.
+
+        Returns:
+            Level: Related objects and their relations to load next.
+        """
+
+        # (model, field) -> links of the objects
+        links: dict[tuple[Type[Model], str], Links] = {}
+        # Related model -> primary keys of its objects referenced on the level
+        wanted: defaultdict[Type[Model], set[Any]] = defaultdict(set)
+        for model, objects, tree in level:
+            for field, relation in get_relations(model, tree):
+                get_links, _ = self._handlers[type(relation)]
+                field_links = links[(model, field)] = await get_links(relation, objects)
+                for related_ids in field_links.values():
+                    wanted[relation.related_model].update(related_ids)
+
+        loaded = {
+            related_model: await self.load(related_model, ids)
+            for related_model, ids in wanted.items()
+        }
+        return self._assign_level(level, links, loaded)
+
+    def _assign_level(
+        self,
+        level: Level,
+        links: dict[tuple[Type[Model], str], Links],
+        loaded: dict[Type[Model], dict[Any, Model]],
+    ) -> Level:
+        """Set loaded related objects to the objects of the level.
+
+        Args:
+            level (Level): Models, objects and relations to load.
+            links (dict[tuple[Type[Model], str], Links]): Links of the objects
+                by their models and relations.
+            loaded (dict[Type[Model], dict[Any, Model]]): Related objects by
+                their models and primary keys.
+
+        Returns:
+            Level: Related objects and their relations to load next.
+        """
+
+        next_level = []
+        for model, objects, tree in level:
+            for field, relation in get_relations(model, tree):
+                related_model = relation.related_model
+                children = self._assign(
+                    relation,
+                    field,
+                    objects,
+                    links[(model, field)],
+                    loaded.get(related_model, {}),
+                )
+                if tree[field] and children:
+                    next_level.append((related_model, children, tree[field]))
+        return next_level
+
+    def _assign(
+        self,
+        relation: Any,
+        field: str,
+        objects: list[Model],
+        links: Links,
+        related_by_id: dict[Any, Model],
+    ) -> list[Model]:
+        """Set related objects of a relation to the objects.
+
+        Args:
+            relation (Any): Relation.
+            field (str): Name of the relation.
+            objects (list[Model]): Objects.
+            links (Links): Links of the objects.
+            related_by_id (dict[Any, Model]): Loaded related objects.
+
+        Returns:
+            list[Model]: Distinct related objects.
+        """
+
+        _, set_related = self._handlers[type(relation)]
+        children: dict[int, Model] = {}
+        for obj in objects:
+            related = [
+                related_by_id[related_id]
+                for related_id in links.get(obj.pk, [])
+                if related_id in related_by_id
+            ]
+            set_related(obj, field, related)
+            children.update((id(related_obj), related_obj) for related_obj in related)
+        return list(children.values())
+
+    async def _get_fk_links(
+        self,
+        relation: ForeignKeyFieldInstance[Model],
+        objects: list[Model],
+    ) -> Links:
+        """Links of foreign keys and one-to-one fields, held by the objects."""
+
+        links: Links = {}
+        for obj in objects:
+            related_id = getattr(obj, f"{relation.model_field_name}_id")
+            if related_id is not None:
+                links[obj.pk] = [related_id]
+        return links
+
+    async def _get_reverse_links(
+        self,
+        relation: BackwardFKRelation[Model],
+        objects: list[Model],
+    ) -> Links:
+        """Links of reverse foreign keys and one-to-one fields.
+
+        Related objects are fetched right away, the links are their only source.
+        """
+
+        related_objects = self._remember(
+            await relation.related_model.filter(
+                **{f"{relation.relation_field}__in": [obj.pk for obj in objects]},
+            ).using_db(get_read_db()),
+        )
+        links: defaultdict[Any, list[Any]] = defaultdict(list)
+        for related in related_objects:
+            links[getattr(related, relation.relation_field)].append(related.pk)
+        return links
+
+    async def _get_m2m_links(
+        self,
+        relation: ManyToManyFieldInstance[Model],
+        objects: list[Model],
+    ) -> Links:
+        """Links of many-to-many fields, read from their through table."""
+
+        rows = await get_read_db().execute_query_dict(
+            f'SELECT "{relation.backward_key}" AS "owner", '
+            f'"{relation.forward_key}" AS "related" '
+            f'FROM "{relation.through}" '
+            f'WHERE "{relation.backward_key}" = ANY($1)',
+            [[obj.pk for obj in objects]],
+        )
+        links: defaultdict[Any, list[Any]] = defaultdict(list)
+        for row in rows:
+            links[row["owner"]].append(row["related"])
+        return links
+
+    @staticmethod
+    def _set_fk(obj: Model, field: str, related: list[Model]) -> None:
+        setattr(obj, field, related[0] if related else None)
+
+    @staticmethod
+    def _set_reverse_o2o(obj: Model, field: str, related: list[Model]) -> None:
+        # Reverse one-to-one fields are read-only properties cached like this
+        setattr(obj, f"_{field}", related[0] if related else None)
+
+    @staticmethod
+    def _set_many(obj: Model, field: str, related: list[Model]) -> None:
+        getattr(obj, field)._set_result_for_query(related)
+
+
+def get_loader() -> DataLoader:
+    """Get loader of the current request.
+
+    Outside of requests every call gets a new loader.
+
+    Returns:
+        DataLoader: Loader.
+    """
+
+    return _loader.get() or DataLoader()
+
+
+async def use_request_loader() -> None:
+    """Dependency giving the request its own loader.
+
+    Each request runs in its own context, so the loader is dropped with it.
+    """
+
+    _loader.set(DataLoader())
@@ -0,0 +1,12 @@
+-- upgrade --
+-- Games of companies are counted by "company"."games_count", kept by a trigger
+DROP TABLE IF EXISTS "company_statistics";
+-- Counter rows are locked in the order of their ids, so concurrent statements changing the same counters don't deadlock
+CREATE OR REPLACE FUNCTION "update_counter"() RETURNS trigger AS $$ DECLARE changes text; BEGIN IF TG_OP = 'INSERT' THEN changes := format('SELECT %I AS "key", 1 AS "delta" FROM new_rows', TG_ARGV[2]); ELSIF TG_OP = 'DELETE' THEN changes := format('SELECT %I AS "key", -1 AS "delta" FROM old_rows', TG_ARGV[2]); ELSE changes := format('SELECT %1$I AS "key", 1 AS "delta" FROM new_rows UNION ALL SELECT %1$I, -1 FROM old_rows', TG_ARGV[2]); END IF; changes := format('SELECT "key", SUM("delta") AS "delta" FROM (%s) rows WHERE "key" IS NOT NULL GROUP BY "key" HAVING SUM("delta") <> 0', changes); EXECUTE format('SELECT 1 FROM %1$I counted JOIN (%2$s) changes ON counted."id" = changes."key" ORDER BY counted."id" FOR NO KEY UPDATE OF counted', TG_ARGV[0], changes); EXECUTE format('UPDATE %1$I counted SET %2$I = counted.%2$I + changes."delta" FROM (%3$s) changes WHERE counted."id" = changes."key"', TG_ARGV[0], TG_ARGV[1], changes); RETURN NULL; END $$ LANGUAGE plpgsql;
+-- downgrade --
+CREATE OR REPLACE FUNCTION "update_counter"() RETURNS trigger AS $$ DECLARE changes text; BEGIN IF TG_OP = 'INSERT' THEN changes := format('SELECT %I AS "key", 1 AS "delta" FROM new_rows', TG_ARGV[2]); ELSIF TG_OP = 'DELETE' THEN changes := format('SELECT %I AS "key", -1 AS "delta" FROM old_rows', TG_ARGV[2]); ELSE changes := format('SELECT %1$I AS "key", 1 AS "delta" FROM new_rows UNION ALL SELECT %1$I, -1 FROM old_rows', TG_ARGV[2]); END IF; EXECUTE format('UPDATE %1$I counted SET %2$I = counted.%2$I + changes."delta" FROM (SELECT "key", SUM("delta") AS "delta" FROM (%3$s) rows WHERE "key" IS NOT NULL GROUP BY "key") changes WHERE counted."id" = changes."key" AND changes."delta" <> 0', TG_ARGV[0], TG_ARGV[1], changes); RETURN NULL; END $$ LANGUAGE plpgsql;
+CREATE TABLE IF NOT EXISTS "company_statistics" (
+    "games_count" INT NOT NULL  DEFAULT 0,
+    "company_id" UUID NOT NULL  PRIMARY KEY REFERENCES "company" ("id") ON DELETE CASCADE
+);
+INSERT INTO "company_statistics" ("company_id", "games_count") SELECT "id", "games_count" FROM "company";
@@ -0,0 +1,16 @@
+-- upgrade --
+CREATE TABLE IF NOT EXISTS "backup_job" (
+    "id" UUID NOT NULL  PRIMARY KEY,
+    "kind" VARCHAR(16) NOT NULL,
+    "status" VARCHAR(7) NOT NULL  DEFAULT 'queued',
+    "bytes_processed" BIGINT NOT NULL  DEFAULT 0,
+    "error" TEXT,
+    "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "started_at" TIMESTAMPTZ,
+    "finished_at" TIMESTAMPTZ
+);
+CREATE INDEX IF NOT EXISTS "idx_backup_job_finishe_35d23a" ON "backup_job" ("finished_at");
+COMMENT ON COLUMN "backup_job"."status" IS 'QUEUED: queued\nRUNNING: running\nDONE: done\nFAILED: failed';
+COMMENT ON TABLE "backup_job" IS 'Status of a backup or restore, shared by all workers.';
+-- downgrade --
+DROP TABLE IF EXISTS "backup_job";
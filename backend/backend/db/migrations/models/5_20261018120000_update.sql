@@ -0,0 +1,32 @@
+-- upgrade --
+CREATE TABLE IF NOT EXISTS "company_statistics" (
+    "games_count" INT NOT NULL  DEFAULT 0,
+    "company_id" UUID NOT NULL  PRIMARY KEY REFERENCES "company" ("id") ON DELETE CASCADE
+);
+CREATE TABLE IF NOT EXISTS "game_statistics" (
+    "sales_sum" BIGINT NOT NULL  DEFAULT 0,
+    "game_id" UUID NOT NULL  PRIMARY KEY REFERENCES "game" ("id") ON DELETE CASCADE
+);
+CREATE TABLE IF NOT EXISTS "company_foundation_statistics" (
+    "year" INT NOT NULL  PRIMARY KEY,
+    "companies" INT NOT NULL  DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS "user_creation_statistics" (
+    "date" DATE NOT NULL  PRIMARY KEY,
+    "users" INT NOT NULL  DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS "user_role_statistics" (
+    "is_superuser" BOOL NOT NULL  PRIMARY KEY,
+    "users" INT NOT NULL  DEFAULT 0
+);
+INSERT INTO "game_statistics" ("game_id", "sales_sum") SELECT game."id", COALESCE(SUM(sale."amount"), 0) FROM "game" game LEFT JOIN "sale" sale ON sale."game_id" = game."id" GROUP BY game."id";
+INSERT INTO "company_statistics" ("company_id", "games_count") SELECT company."id", COUNT(game."id") FROM "company" company LEFT JOIN "game" game ON game."created_by_company_id" = company."id" GROUP BY company."id";
+INSERT INTO "company_foundation_statistics" ("year", "companies") SELECT EXTRACT(YEAR FROM "founded_at"), COUNT(*) FROM "company" GROUP BY 1;
+INSERT INTO "user_creation_statistics" ("date", "users") SELECT DATE("created_at"), COUNT(*) FROM "user" GROUP BY 1;
+INSERT INTO "user_role_statistics" ("is_superuser", "users") SELECT "is_superuser", COUNT(*) FROM "user" GROUP BY 1;
+-- downgrade --
+DROP TABLE IF EXISTS "company_statistics";
+DROP TABLE IF EXISTS "game_statistics";
+DROP TABLE IF EXISTS "company_foundation_statistics";
+DROP TABLE IF EXISTS "user_creation_statistics";
+DROP TABLE IF EXISTS "user_role_statistics";
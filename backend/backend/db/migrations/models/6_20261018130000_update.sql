@@ -0,0 +1,7 @@
+-- upgrade --
+ALTER TABLE "backup" ADD "format" VARCHAR(9) NOT NULL  DEFAULT 'custom';
+ALTER TABLE "backup" ADD "size" BIGINT;
+COMMENT ON COLUMN "backup"."format" IS 'CUSTOM: custom\nDIRECTORY: directory';
+-- downgrade --
+ALTER TABLE "backup" DROP COLUMN "format";
+ALTER TABLE "backup" DROP COLUMN "size";
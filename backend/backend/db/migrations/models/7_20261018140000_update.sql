@@ -0,0 +1,15 @@
+-- upgrade --
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS "idx_user_usernam_trgm" ON "user" USING GIN ("username" gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS "idx_user_email_trgm" ON "user" USING GIN ("email" gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS "idx_company_title_trgm" ON "company" USING GIN ("title" gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS "idx_game_title_trgm" ON "game" USING GIN ("title" gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS "idx_genre_title_trgm" ON "genre" USING GIN ("title" gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS "idx_platform_title_trgm" ON "platform" USING GIN ("title" gin_trgm_ops);
+-- downgrade --
+DROP INDEX IF EXISTS "idx_user_usernam_trgm";
+DROP INDEX IF EXISTS "idx_user_email_trgm";
+DROP INDEX IF EXISTS "idx_company_title_trgm";
+DROP INDEX IF EXISTS "idx_game_title_trgm";
+DROP INDEX IF EXISTS "idx_genre_title_trgm";
+DROP INDEX IF EXISTS "idx_platform_title_trgm";
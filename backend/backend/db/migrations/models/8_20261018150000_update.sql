@@ -0,0 +1,42 @@
+-- upgrade --
+-- On large databases run "backend db check-indexes --create" first, it builds
+-- these indexes concurrently and the statements below are skipped
+CREATE INDEX IF NOT EXISTS "idx_user_created_b19d59" ON "user" ("created_at");
+CREATE INDEX IF NOT EXISTS "idx_backup_created_b17ff0" ON "backup" ("created_by_user_id");
+CREATE INDEX IF NOT EXISTS "idx_company_founded_a2e090" ON "company" ("founded_at");
+CREATE INDEX IF NOT EXISTS "idx_company_created_976855" ON "company" ("created_at");
+CREATE INDEX IF NOT EXISTS "idx_company_created_345491" ON "company" ("created_by_user_id");
+CREATE INDEX IF NOT EXISTS "idx_game_release_9d8d10" ON "game" ("released_at");
+CREATE INDEX IF NOT EXISTS "idx_game_created_241d19" ON "game" ("created_at");
+CREATE INDEX IF NOT EXISTS "idx_game_created_79ece4" ON "game" ("created_by_company_id");
+CREATE INDEX IF NOT EXISTS "idx_game_created_46fbe5" ON "game" ("created_by_user_id");
+CREATE INDEX IF NOT EXISTS "idx_genre_created_9fdaba" ON "genre" ("created_by_user_id");
+CREATE INDEX IF NOT EXISTS "idx_platform_created_97d123" ON "platform" ("created_by_user_id");
+CREATE INDEX IF NOT EXISTS "idx_sale_amount_25543e" ON "sale" ("amount");
+CREATE INDEX IF NOT EXISTS "idx_sale_created_ca7e48" ON "sale" ("created_by_user_id");
+CREATE INDEX IF NOT EXISTS "idx_sale_platfor_5f3fdc" ON "sale" ("platform_id");
+DELETE FROM "game_platform" USING "game_platform" duplicate WHERE duplicate."game_id" = "game_platform"."game_id" AND duplicate."platform_id" = "game_platform"."platform_id" AND duplicate."ctid" < "game_platform"."ctid";
+DO $$ BEGIN IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'game_platform_pkey') THEN ALTER TABLE "game_platform" ADD CONSTRAINT "game_platform_pkey" PRIMARY KEY ("game_id", "platform_id"); END IF; END $$;
+CREATE INDEX IF NOT EXISTS "idx_game_platfo_platfor_72ff37" ON "game_platform" ("platform_id");
+DELETE FROM "game_genre" USING "game_genre" duplicate WHERE duplicate."game_id" = "game_genre"."game_id" AND duplicate."genre_id" = "game_genre"."genre_id" AND duplicate."ctid" < "game_genre"."ctid";
+DO $$ BEGIN IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'game_genre_pkey') THEN ALTER TABLE "game_genre" ADD CONSTRAINT "game_genre_pkey" PRIMARY KEY ("game_id", "genre_id"); END IF; END $$;
+CREATE INDEX IF NOT EXISTS "idx_game_genre_genre_i_637ad8" ON "game_genre" ("genre_id");
+-- downgrade --
+DROP INDEX IF EXISTS "idx_user_created_b19d59";
+DROP INDEX IF EXISTS "idx_backup_created_b17ff0";
+DROP INDEX IF EXISTS "idx_company_founded_a2e090";
+DROP INDEX IF EXISTS "idx_company_created_976855";
+DROP INDEX IF EXISTS "idx_company_created_345491";
+DROP INDEX IF EXISTS "idx_game_release_9d8d10";
+DROP INDEX IF EXISTS "idx_game_created_241d19";
+DROP INDEX IF EXISTS "idx_game_created_79ece4";
+DROP INDEX IF EXISTS "idx_game_created_46fbe5";
+DROP INDEX IF EXISTS "idx_genre_created_9fdaba";
+DROP INDEX IF EXISTS "idx_platform_created_97d123";
+DROP INDEX IF EXISTS "idx_sale_amount_25543e";
+DROP INDEX IF EXISTS "idx_sale_created_ca7e48";
+DROP INDEX IF EXISTS "idx_sale_platfor_5f3fdc";
+ALTER TABLE "game_platform" DROP CONSTRAINT IF EXISTS "game_platform_pkey";
+DROP INDEX IF EXISTS "idx_game_platfo_platfor_72ff37";
+ALTER TABLE "game_genre" DROP CONSTRAINT IF EXISTS "game_genre_pkey";
+DROP INDEX IF EXISTS "idx_game_genre_genre_i_637ad8";
@@ -0,0 +1,135 @@
+-- upgrade --
+-- Counters of the to-many relations lists are sorted by, kept by triggers
+ALTER TABLE "game" ADD "sales_count" INT NOT NULL  DEFAULT 0;
+ALTER TABLE "game" ADD "platforms_count" INT NOT NULL  DEFAULT 0;
+ALTER TABLE "game" ADD "genres_count" INT NOT NULL  DEFAULT 0;
+ALTER TABLE "company" ADD "games_count" INT NOT NULL  DEFAULT 0;
+ALTER TABLE "platform" ADD "games_count" INT NOT NULL  DEFAULT 0;
+ALTER TABLE "platform" ADD "sales_count" INT NOT NULL  DEFAULT 0;
+ALTER TABLE "genre" ADD "games_count" INT NOT NULL  DEFAULT 0;
+ALTER TABLE "user" ADD "created_companies_count" INT NOT NULL  DEFAULT 0;
+ALTER TABLE "user" ADD "created_platforms_count" INT NOT NULL  DEFAULT 0;
+ALTER TABLE "user" ADD "created_games_count" INT NOT NULL  DEFAULT 0;
+ALTER TABLE "user" ADD "created_genres_count" INT NOT NULL  DEFAULT 0;
+ALTER TABLE "user" ADD "created_sales_count" INT NOT NULL  DEFAULT 0;
+ALTER TABLE "user" ADD "created_backups_count" INT NOT NULL  DEFAULT 0;
+CREATE OR REPLACE FUNCTION "update_counter"() RETURNS trigger AS $$ DECLARE changes text; BEGIN IF TG_OP = 'INSERT' THEN changes := format('SELECT %I AS "key", 1 AS "delta" FROM new_rows', TG_ARGV[2]); ELSIF TG_OP = 'DELETE' THEN changes := format('SELECT %I AS "key", -1 AS "delta" FROM old_rows', TG_ARGV[2]); ELSE changes := format('SELECT %1$I AS "key", 1 AS "delta" FROM new_rows UNION ALL SELECT %1$I, -1 FROM old_rows', TG_ARGV[2]); END IF; EXECUTE format('UPDATE %1$I counted SET %2$I = counted.%2$I + changes."delta" FROM (SELECT "key", SUM("delta") AS "delta" FROM (%3$s) rows WHERE "key" IS NOT NULL GROUP BY "key") changes WHERE counted."id" = changes."key" AND changes."delta" <> 0', TG_ARGV[0], TG_ARGV[1], changes); RETURN NULL; END $$ LANGUAGE plpgsql;
+UPDATE "game" SET "sales_count" = counts."count" FROM (SELECT "game_id", COUNT(*) AS "count" FROM "sale" GROUP BY 1) counts WHERE counts."game_id" = "game"."id";
+UPDATE "game" SET "platforms_count" = counts."count" FROM (SELECT "game_id", COUNT(*) AS "count" FROM "game_platform" GROUP BY 1) counts WHERE counts."game_id" = "game"."id";
+UPDATE "game" SET "genres_count" = counts."count" FROM (SELECT "game_id", COUNT(*) AS "count" FROM "game_genre" GROUP BY 1) counts WHERE counts."game_id" = "game"."id";
+UPDATE "company" SET "games_count" = counts."count" FROM (SELECT "created_by_company_id", COUNT(*) AS "count" FROM "game" GROUP BY 1) counts WHERE counts."created_by_company_id" = "company"."id";
+UPDATE "platform" SET "games_count" = counts."count" FROM (SELECT "platform_id", COUNT(*) AS "count" FROM "game_platform" GROUP BY 1) counts WHERE counts."platform_id" = "platform"."id";
+UPDATE "platform" SET "sales_count" = counts."count" FROM (SELECT "platform_id", COUNT(*) AS "count" FROM "sale" GROUP BY 1) counts WHERE counts."platform_id" = "platform"."id";
+UPDATE "genre" SET "games_count" = counts."count" FROM (SELECT "genre_id", COUNT(*) AS "count" FROM "game_genre" GROUP BY 1) counts WHERE counts."genre_id" = "genre"."id";
+UPDATE "user" SET "created_companies_count" = counts."count" FROM (SELECT "created_by_user_id", COUNT(*) AS "count" FROM "company" GROUP BY 1) counts WHERE counts."created_by_user_id" = "user"."id";
+UPDATE "user" SET "created_platforms_count" = counts."count" FROM (SELECT "created_by_user_id", COUNT(*) AS "count" FROM "platform" GROUP BY 1) counts WHERE counts."created_by_user_id" = "user"."id";
+UPDATE "user" SET "created_games_count" = counts."count" FROM (SELECT "created_by_user_id", COUNT(*) AS "count" FROM "game" GROUP BY 1) counts WHERE counts."created_by_user_id" = "user"."id";
+UPDATE "user" SET "created_genres_count" = counts."count" FROM (SELECT "created_by_user_id", COUNT(*) AS "count" FROM "genre" GROUP BY 1) counts WHERE counts."created_by_user_id" = "user"."id";
+UPDATE "user" SET "created_sales_count" = counts."count" FROM (SELECT "created_by_user_id", COUNT(*) AS "count" FROM "sale" GROUP BY 1) counts WHERE counts."created_by_user_id" = "user"."id";
+UPDATE "user" SET "created_backups_count" = counts."count" FROM (SELECT "created_by_user_id", COUNT(*) AS "count" FROM "backup" GROUP BY 1) counts WHERE counts."created_by_user_id" = "user"."id";
+CREATE TRIGGER "game_sales_count_insert" AFTER INSERT ON "sale" REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('game', 'sales_count', 'game_id');
+CREATE TRIGGER "game_sales_count_update" AFTER UPDATE ON "sale" REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('game', 'sales_count', 'game_id');
+CREATE TRIGGER "game_sales_count_delete" AFTER DELETE ON "sale" REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('game', 'sales_count', 'game_id');
+CREATE TRIGGER "game_platforms_count_insert" AFTER INSERT ON "game_platform" REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('game', 'platforms_count', 'game_id');
+CREATE TRIGGER "game_platforms_count_update" AFTER UPDATE ON "game_platform" REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('game', 'platforms_count', 'game_id');
+CREATE TRIGGER "game_platforms_count_delete" AFTER DELETE ON "game_platform" REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('game', 'platforms_count', 'game_id');
+CREATE TRIGGER "game_genres_count_insert" AFTER INSERT ON "game_genre" REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('game', 'genres_count', 'game_id');
+CREATE TRIGGER "game_genres_count_update" AFTER UPDATE ON "game_genre" REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('game', 'genres_count', 'game_id');
+CREATE TRIGGER "game_genres_count_delete" AFTER DELETE ON "game_genre" REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('game', 'genres_count', 'game_id');
+CREATE TRIGGER "company_games_count_insert" AFTER INSERT ON "game" REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('company', 'games_count', 'created_by_company_id');
+CREATE TRIGGER "company_games_count_update" AFTER UPDATE ON "game" REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('company', 'games_count', 'created_by_company_id');
+CREATE TRIGGER "company_games_count_delete" AFTER DELETE ON "game" REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('company', 'games_count', 'created_by_company_id');
+CREATE TRIGGER "platform_games_count_insert" AFTER INSERT ON "game_platform" REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('platform', 'games_count', 'platform_id');
+CREATE TRIGGER "platform_games_count_update" AFTER UPDATE ON "game_platform" REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('platform', 'games_count', 'platform_id');
+CREATE TRIGGER "platform_games_count_delete" AFTER DELETE ON "game_platform" REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('platform', 'games_count', 'platform_id');
+CREATE TRIGGER "platform_sales_count_insert" AFTER INSERT ON "sale" REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('platform', 'sales_count', 'platform_id');
+CREATE TRIGGER "platform_sales_count_update" AFTER UPDATE ON "sale" REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('platform', 'sales_count', 'platform_id');
+CREATE TRIGGER "platform_sales_count_delete" AFTER DELETE ON "sale" REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('platform', 'sales_count', 'platform_id');
+CREATE TRIGGER "genre_games_count_insert" AFTER INSERT ON "game_genre" REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('genre', 'games_count', 'genre_id');
+CREATE TRIGGER "genre_games_count_update" AFTER UPDATE ON "game_genre" REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('genre', 'games_count', 'genre_id');
+CREATE TRIGGER "genre_games_count_delete" AFTER DELETE ON "game_genre" REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('genre', 'games_count', 'genre_id');
+CREATE TRIGGER "user_created_companies_count_insert" AFTER INSERT ON "company" REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('user', 'created_companies_count', 'created_by_user_id');
+CREATE TRIGGER "user_created_companies_count_update" AFTER UPDATE ON "company" REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('user', 'created_companies_count', 'created_by_user_id');
+CREATE TRIGGER "user_created_companies_count_delete" AFTER DELETE ON "company" REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('user', 'created_companies_count', 'created_by_user_id');
+CREATE TRIGGER "user_created_platforms_count_insert" AFTER INSERT ON "platform" REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('user', 'created_platforms_count', 'created_by_user_id');
+CREATE TRIGGER "user_created_platforms_count_update" AFTER UPDATE ON "platform" REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('user', 'created_platforms_count', 'created_by_user_id');
+CREATE TRIGGER "user_created_platforms_count_delete" AFTER DELETE ON "platform" REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('user', 'created_platforms_count', 'created_by_user_id');
+CREATE TRIGGER "user_created_games_count_insert" AFTER INSERT ON "game" REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('user', 'created_games_count', 'created_by_user_id');
+CREATE TRIGGER "user_created_games_count_update" AFTER UPDATE ON "game" REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('user', 'created_games_count', 'created_by_user_id');
+CREATE TRIGGER "user_created_games_count_delete" AFTER DELETE ON "game" REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('user', 'created_games_count', 'created_by_user_id');
+CREATE TRIGGER "user_created_genres_count_insert" AFTER INSERT ON "genre" REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('user', 'created_genres_count', 'created_by_user_id');
+CREATE TRIGGER "user_created_genres_count_update" AFTER UPDATE ON "genre" REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('user', 'created_genres_count', 'created_by_user_id');
+CREATE TRIGGER "user_created_genres_count_delete" AFTER DELETE ON "genre" REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('user', 'created_genres_count', 'created_by_user_id');
+CREATE TRIGGER "user_created_sales_count_insert" AFTER INSERT ON "sale" REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('user', 'created_sales_count', 'created_by_user_id');
+CREATE TRIGGER "user_created_sales_count_update" AFTER UPDATE ON "sale" REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('user', 'created_sales_count', 'created_by_user_id');
+CREATE TRIGGER "user_created_sales_count_delete" AFTER DELETE ON "sale" REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('user', 'created_sales_count', 'created_by_user_id');
+CREATE TRIGGER "user_created_backups_count_insert" AFTER INSERT ON "backup" REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('user', 'created_backups_count', 'created_by_user_id');
+CREATE TRIGGER "user_created_backups_count_update" AFTER UPDATE ON "backup" REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('user', 'created_backups_count', 'created_by_user_id');
+CREATE TRIGGER "user_created_backups_count_delete" AFTER DELETE ON "backup" REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION "update_counter"('user', 'created_backups_count', 'created_by_user_id');
+CREATE INDEX IF NOT EXISTS "idx_game_sales_c_7f26ec" ON "game" ("sales_count");
+CREATE INDEX IF NOT EXISTS "idx_game_platfor_97f965" ON "game" ("platforms_count");
+CREATE INDEX IF NOT EXISTS "idx_game_genres__634236" ON "game" ("genres_count");
+CREATE INDEX IF NOT EXISTS "idx_company_games_c_168348" ON "company" ("games_count");
+CREATE INDEX IF NOT EXISTS "idx_platform_games_c_3ac163" ON "platform" ("games_count");
+CREATE INDEX IF NOT EXISTS "idx_platform_sales_c_c07b36" ON "platform" ("sales_count");
+CREATE INDEX IF NOT EXISTS "idx_genre_games_c_1da111" ON "genre" ("games_count");
+CREATE INDEX IF NOT EXISTS "idx_user_created_6ebe51" ON "user" ("created_companies_count");
+CREATE INDEX IF NOT EXISTS "idx_user_created_86d699" ON "user" ("created_platforms_count");
+CREATE INDEX IF NOT EXISTS "idx_user_created_9025fe" ON "user" ("created_games_count");
+CREATE INDEX IF NOT EXISTS "idx_user_created_f62790" ON "user" ("created_genres_count");
+CREATE INDEX IF NOT EXISTS "idx_user_created_a77bf7" ON "user" ("created_sales_count");
+CREATE INDEX IF NOT EXISTS "idx_user_created_1d8e21" ON "user" ("created_backups_count");
+-- downgrade --
+DROP TRIGGER IF EXISTS "game_sales_count_insert" ON "sale";
+DROP TRIGGER IF EXISTS "game_sales_count_update" ON "sale";
+DROP TRIGGER IF EXISTS "game_sales_count_delete" ON "sale";
+DROP TRIGGER IF EXISTS "game_platforms_count_insert" ON "game_platform";
+DROP TRIGGER IF EXISTS "game_platforms_count_update" ON "game_platform";
+DROP TRIGGER IF EXISTS "game_platforms_count_delete" ON "game_platform";
+DROP TRIGGER IF EXISTS "game_genres_count_insert" ON "game_genre";
+DROP TRIGGER IF EXISTS "game_genres_count_update" ON "game_genre";
+DROP TRIGGER IF EXISTS "game_genres_count_delete" ON "game_genre";
+DROP TRIGGER IF EXISTS "company_games_count_insert" ON "game";
+DROP TRIGGER IF EXISTS "company_games_count_update" ON "game";
+DROP TRIGGER IF EXISTS "company_games_count_delete" ON "game";
+DROP TRIGGER IF EXISTS "platform_games_count_insert" ON "game_platform";
+DROP TRIGGER IF EXISTS "platform_games_count_update" ON "game_platform";
+DROP TRIGGER IF EXISTS "platform_games_count_delete" ON "game_platform";
+DROP TRIGGER IF EXISTS "platform_sales_count_insert" ON "sale";
+DROP TRIGGER IF EXISTS "platform_sales_count_update" ON "sale";
+DROP TRIGGER IF EXISTS "platform_sales_count_delete" ON "sale";
+DROP TRIGGER IF EXISTS "genre_games_count_insert" ON "game_genre";
+DROP TRIGGER IF EXISTS "genre_games_count_update" ON "game_genre";
+DROP TRIGGER IF EXISTS "genre_games_count_delete" ON "game_genre";
+DROP TRIGGER IF EXISTS "user_created_companies_count_insert" ON "company";
+DROP TRIGGER IF EXISTS "user_created_companies_count_update" ON "company";
+DROP TRIGGER IF EXISTS "user_created_companies_count_delete" ON "company";
+DROP TRIGGER IF EXISTS "user_created_platforms_count_insert" ON "platform";
+DROP TRIGGER IF EXISTS "user_created_platforms_count_update" ON "platform";
+DROP TRIGGER IF EXISTS "user_created_platforms_count_delete" ON "platform";
+DROP TRIGGER IF EXISTS "user_created_games_count_insert" ON "game";
+DROP TRIGGER IF EXISTS "user_created_games_count_update" ON "game";
+DROP TRIGGER IF EXISTS "user_created_games_count_delete" ON "game";
+DROP TRIGGER IF EXISTS "user_created_genres_count_insert" ON "genre";
+DROP TRIGGER IF EXISTS "user_created_genres_count_update" ON "genre";
+DROP TRIGGER IF EXISTS "user_created_genres_count_delete" ON "genre";
+DROP TRIGGER IF EXISTS "user_created_sales_count_insert" ON "sale";
+DROP TRIGGER IF EXISTS "user_created_sales_count_update" ON "sale";
+DROP TRIGGER IF EXISTS "user_created_sales_count_delete" ON "sale";
+DROP TRIGGER IF EXISTS "user_created_backups_count_insert" ON "backup";
+DROP TRIGGER IF EXISTS "user_created_backups_count_update" ON "backup";
+DROP TRIGGER IF EXISTS "user_created_backups_count_delete" ON "backup";
+DROP FUNCTION IF EXISTS "update_counter";
+ALTER TABLE "game" DROP COLUMN "sales_count";
+ALTER TABLE "game" DROP COLUMN "platforms_count";
+ALTER TABLE "game" DROP COLUMN "genres_count";
+ALTER TABLE "company" DROP COLUMN "games_count";
+ALTER TABLE "platform" DROP COLUMN "games_count";
+ALTER TABLE "platform" DROP COLUMN "sales_count";
+ALTER TABLE "genre" DROP COLUMN "games_count";
+ALTER TABLE "user" DROP COLUMN "created_companies_count";
+ALTER TABLE "user" DROP COLUMN "created_platforms_count";
+ALTER TABLE "user" DROP COLUMN "created_games_count";
+ALTER TABLE "user" DROP COLUMN "created_genres_count";
+ALTER TABLE "user" DROP COLUMN "created_sales_count";
+ALTER TABLE "user" DROP COLUMN "created_backups_count";
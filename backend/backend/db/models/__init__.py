@@ -2,13 +2,28 @@
 import pkgutil
 from pathlib import Path
 
+from backend.db.filters import add_trigram_filters
 from backend.db.models.backup import Backup
+from backend.db.models.backup_job import BackupJob
 from backend.db.models.company import Company
+from backend.db.models.company_foundation_statistics import (
+    CompanyFoundationStatistics,
+)
 from backend.db.models.game import Game
+from backend.db.models.game_statistics import GameStatistics
 from backend.db.models.genre import Genre
 from backend.db.models.platform import Platform
 from backend.db.models.sale import Sale
 from backend.db.models.user import User
+from backend.db.models.user_creation_statistics import UserCreationStatistics
+from backend.db.models.user_role_statistics import UserRoleStatistics
+
+# Columns with trigram indexes
+add_trigram_filters(User, "username", "email")
+add_trigram_filters(Company, "title")
+add_trigram_filters(Game, "title")
+add_trigram_filters(Genre, "title")
+add_trigram_filters(Platform, "title")
 
 
 def load_all_models() -> None:
@@ -24,11 +39,16 @@ def load_all_models() -> None:
 
 __all__ = [
     "Backup",
+    "BackupJob",
     "Company",
     "User",
     "Game",
     "Genre",
     "Platform",
     "Sale",
+    "GameStatistics",
+    "CompanyFoundationStatistics",
+    "UserCreationStatistics",
+    "UserRoleStatistics",
     "load_all_models",
 ]
@@ -1,18 +1,27 @@
 from tortoise import fields, models
 
+from backend.custom_types import BackupFormat
+
 
 class Backup(models.Model):
     id = fields.UUIDField(pk=True, auto_generate=True, index=True)
     title = fields.CharField(max_length=512, unique=True, index=True)
     url = fields.CharField(1024)
+    format = fields.CharEnumField(BackupFormat, default=BackupFormat.CUSTOM)
+    size = fields.BigIntField(null=True)
     created_at = fields.DatetimeField(auto_now_add=True)
 
     created_by_user: fields.ForeignKeyRelation["User"] = fields.ForeignKeyField(
         "models.User",
         related_name="created_backups",
         null=True,
+        index=True,
         on_delete=fields.SET_NULL,
     )
 
+    @property
+    def filename(self) -> str:
+        return self.title + BackupFormat(self.format).extension
+
 
 from backend.db.models.user import User  # noqa: E402
@@ -0,0 +1,29 @@
+import datetime
+from typing import Optional
+
+from tortoise import fields, models
+
+from backend.custom_types import JobStatus
+
+
+class BackupJob(models.Model):
+    """Status of a backup or restore, shared by all workers."""
+
+    id = fields.UUIDField(pk=True)
+    kind = fields.CharField(max_length=16)
+    status = fields.CharEnumField(JobStatus, default=JobStatus.QUEUED)
+    bytes_processed = fields.BigIntField(default=0)
+    error = fields.TextField(null=True)
+    created_at = fields.DatetimeField(auto_now_add=True)
+    started_at = fields.DatetimeField(null=True)
+    finished_at = fields.DatetimeField(null=True, index=True)
+
+    class Meta:
+        table = "backup_job"
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        finished_at = self.finished_at or datetime.datetime.now(datetime.timezone.utc)
+        return (finished_at - self.started_at).total_seconds()
@@ -0,0 +1,9 @@
+from tortoise import fields, models
+
+
+class CompanyFoundationStatistics(models.Model):
+    year = fields.IntField(pk=True, generated=False)
+    companies = fields.IntField(default=0)
+
+    class Meta:
+        table = "company_foundation_statistics"
@@ -4,18 +4,24 @@ from tortoise import fields, models
 class Game(models.Model):
     id = fields.UUIDField(pk=True, auto_generate=True, index=True)
     title = fields.CharField(max_length=512, unique=True, index=True)
-    released_at = fields.DateField()
-    created_at = fields.DatetimeField(auto_now_add=True)
+    released_at = fields.DateField(index=True)
+    created_at = fields.DatetimeField(auto_now_add=True, index=True)
+    # Amounts of related objects, kept by database triggers
+    sales_count = fields.IntField(default=0, index=True)
+    platforms_count = fields.IntField(default=0, index=True)
+    genres_count = fields.IntField(default=0, index=True)
 
     created_by_user: fields.ForeignKeyRelation["User"] = fields.ForeignKeyField(
         "models.User",
         related_name="created_games",
         null=True,
+        index=True,
         on_delete=fields.SET_NULL,
     )
     created_by_company: fields.ForeignKeyRelation["Company"] = fields.ForeignKeyField(
         "models.Company",
         related_name="games",
+        index=True,
     )
 
     platforms: fields.ManyToManyRelation["Platform"] = fields.ManyToManyField(
@@ -29,9 +35,11 @@ class Game(models.Model):
         through="game_genre",
     )
     sales: fields.ReverseRelation["Sale"]
+    statistics: fields.BackwardOneToOneRelation["GameStatistics"]
 
 
 from backend.db.models.company import Company  # noqa: E402
+from backend.db.models.game_statistics import GameStatistics  # noqa: E402
 from backend.db.models.genre import Genre  # noqa: E402
 from backend.db.models.platform import Platform  # noqa: E402
 from backend.db.models.sale import Sale  # noqa: E402
@@ -0,0 +1,16 @@
+from tortoise import fields, models
+
+
+class GameStatistics(models.Model):
+    game: fields.OneToOneRelation["Game"] = fields.OneToOneField(
+        "models.Game",
+        related_name="statistics",
+        pk=True,
+    )
+    sales_sum = fields.BigIntField(default=0)
+
+    class Meta:
+        table = "game_statistics"
+
+
+from backend.db.models.game import Game  # noqa: E402
@@ -5,11 +5,14 @@ class Genre(models.Model):
     id = fields.UUIDField(pk=True, auto_generate=True, index=True)
     title = fields.CharField(max_length=512, unique=True, index=True)
     created_at = fields.DatetimeField(auto_now_add=True)
+    # Amounts of related objects, kept by database triggers
+    games_count = fields.IntField(default=0, index=True)
 
     created_by_user: fields.ForeignKeyRelation["User"] = fields.ForeignKeyField(
         "models.User",
         related_name="created_genres",
         null=True,
+        index=True,
         on_delete=fields.SET_NULL,
     )
     games: fields.ManyToManyRelation["Game"]
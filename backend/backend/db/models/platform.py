@@ -4,11 +4,15 @@ from tortoise import fields, models
 class Platform(models.Model):
     id = fields.UUIDField(pk=True, auto_generate=True, index=True)
     title = fields.CharField(max_length=512, unique=True, index=True)
+    # Amounts of related objects, kept by database triggers
+    games_count = fields.IntField(default=0, index=True)
+    sales_count = fields.IntField(default=0, index=True)
 
     created_by_user: fields.ForeignKeyRelation["User"] = fields.ForeignKeyField(
         "models.User",
         related_name="created_platforms",
         null=True,
+        index=True,
         on_delete=fields.SET_NULL,
     )
     games: fields.ManyToManyRelation["Game"]
@@ -6,7 +6,7 @@ class Sale(models.Model):
         unique_together = (("game", "platform"),)
 
     id = fields.UUIDField(pk=True, auto_generate=True, index=True)
-    amount = fields.BigIntField()
+    amount = fields.BigIntField(index=True)
 
     game: fields.ForeignKeyRelation["Game"] = fields.ForeignKeyField(
         "models.Game",
@@ -15,11 +15,13 @@ class Sale(models.Model):
     platform: fields.ForeignKeyRelation["Platform"] = fields.ForeignKeyField(
         "models.Platform",
         related_name="sales",
+        index=True,
     )
     created_by_user: fields.ForeignKeyRelation["User"] = fields.ForeignKeyField(
         "models.User",
         related_name="created_sales",
         null=True,
+        index=True,
         on_delete=fields.SET_NULL,
     )
 
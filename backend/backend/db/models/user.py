@@ -8,8 +8,15 @@ class User(models.Model):
     hashed_password = fields.CharField(max_length=256)
     is_superuser = fields.BooleanField(default=False)
     is_primary = fields.BooleanField(default=False)
-    created_at = fields.DatetimeField(auto_now_add=True)
+    created_at = fields.DatetimeField(auto_now_add=True, index=True)
     salt = fields.CharField(1024)
+    # Amounts of related objects, kept by database triggers
+    created_companies_count = fields.IntField(default=0, index=True)
+    created_platforms_count = fields.IntField(default=0, index=True)
+    created_games_count = fields.IntField(default=0, index=True)
+    created_genres_count = fields.IntField(default=0, index=True)
+    created_sales_count = fields.IntField(default=0, index=True)
+    created_backups_count = fields.IntField(default=0, index=True)
 
     created_companies: fields.ReverseRelation["Company"]
     created_platforms: fields.ReverseRelation["Platform"]
@@ -0,0 +1,9 @@
+from tortoise import fields, models
+
+
+class UserCreationStatistics(models.Model):
+    date = fields.DateField(pk=True)
+    users = fields.IntField(default=0)
+
+    class Meta:
+        table = "user_creation_statistics"
@@ -0,0 +1,9 @@
+from tortoise import fields, models
+
+
+class UserRoleStatistics(models.Model):
+    is_superuser = fields.BooleanField(pk=True)
+    users = fields.IntField(default=0)
+
+    class Meta:
+        table = "user_role_statistics"
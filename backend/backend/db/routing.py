@@ -0,0 +1,53 @@
+"""Routing of reads to the replica database."""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from tortoise import connections
+from tortoise.backends.base.client import BaseDBAsyncClient, BaseTransactionWrapper
+
+from backend.settings import settings
+
+PRIMARY_CONNECTION = "default"
+REPLICA_CONNECTION = "replica"
+
+_primary_reads: ContextVar[bool] = ContextVar("primary_reads", default=False)
+
+
+@contextmanager
+def primary_reads() -> Iterator[None]:
+    """Read from the primary in the block, e.g. right after a write."""
+
+    token = _primary_reads.set(True)
+    try:
+        yield
+    finally:
+        _primary_reads.reset(token)
+
+
+def get_read_connection_name() -> str:
+    """Get name of the connection reads should go to.
+
+    Reads go to the replica if it's configured, unless they were routed to the
+    primary or run in a transaction of the primary, whose changes the replica
+    hasn't seen yet.
+
+    Returns:
+        str: Connection name.
+    """
+
+    if settings.db_replica_host is None or _primary_reads.get():
+        return PRIMARY_CONNECTION
+    if isinstance(connections.get(PRIMARY_CONNECTION), BaseTransactionWrapper):
+        return PRIMARY_CONNECTION
+    return REPLICA_CONNECTION
+
+
+def get_read_db() -> BaseDBAsyncClient:
+    """Get connection reads should go to.
+
+    Returns:
+        BaseDBAsyncClient: Replica or primary connection, or their transaction.
+    """
+
+    return connections.get(get_read_connection_name())
@@ -4,3 +4,19 @@ class ObjectNotFoundException(Exception):
 
 class InvalidPasswordException(Exception):
     """Raised when an invalid password is provided"""
+
+
+class InvalidCursorException(Exception):
+    """Raised when a pagination cursor is malformed or doesn't match the order"""
+
+
+class HashingPoolSaturatedException(Exception):
+    """Raised when too many passwords are waiting to be hashed or verified"""
+
+
+class BackupException(Exception):
+    """Raised when pg_dump or pg_restore fails"""
+
+
+class ImportException(Exception):
+    """Raised when a row of an imported file is invalid"""
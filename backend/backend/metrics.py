@@ -0,0 +1,63 @@
+"""In-process metrics exposed by the health router."""
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class Summary:
+    """Amount, total and maximum of observed values."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record an observed value.
+
+        Args:
+            value (float): Observed value.
+        """
+
+        self.count += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe seconds spent in the block."""
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def as_dict(self) -> dict[str, float]:
+        return {"count": self.count, "total": self.total, "maximum": self.maximum}
+
+
+_summaries: dict[str, Summary] = {}
+
+
+def get_summary(name: str) -> Summary:
+    """Get summary by name, creating it on first use.
+
+    Args:
+        name (str): Metric name.
+
+    Returns:
+        Summary: Summary.
+    """
+
+    return _summaries.setdefault(name, Summary())
+
+
+def get_metrics() -> dict[str, dict[str, float]]:
+    """Get values of all metrics.
+
+    Returns:
+        dict[str, dict[str, float]]: Metric names and values.
+    """
+
+    return {name: summary.as_dict() for name, summary in _summaries.items()}
@@ -1,13 +1,21 @@
+import asyncio
 import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Optional, TypeVar
 
 from jose import jwt
 from passlib.context import CryptContext
 
+from backend.exceptions import HashingPoolSaturatedException
+from backend.metrics import get_summary
 from backend.settings import settings
 
+ResultType = TypeVar("ResultType")
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+hashing_time = get_summary("password_hashing_seconds")
 
 
 def create_access_token(
@@ -67,3 +75,107 @@ def verify_password(plain_password: str, salt: str, hashed_password: str) -> boo
     """
 
     return pwd_context.verify(plain_password + salt, hashed_password)
+
+
+class HashingPool:
+    """Bounded pool of threads hashing and verifying passwords.
+
+    bcrypt releases the GIL, so hashing in threads keeps the event loop free.
+    """
+
+    def __init__(self, workers: int, queue_size: int) -> None:
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="password-hashing",
+        )
+        self.limit = workers + queue_size
+        self.pending = 0
+
+    async def run(self, func: Callable[..., ResultType], *args: Any) -> ResultType:
+        """Run function in the pool.
+
+        Args:
+            func (Callable): Function to run.
+            args (Any): Function arguments.
+
+        Raises:
+            HashingPoolSaturatedException: Too many functions are waiting.
+
+        Returns:
+            ResultType: Function result.
+        """
+
+        if self.pending >= self.limit:
+            raise HashingPoolSaturatedException(
+                f"{self.pending} passwords are already being hashed",
+            )
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result, elapsed = await loop.run_in_executor(
+                self.executor,
+                _timed,
+                func,
+                *args,
+            )
+        finally:
+            self.pending -= 1
+
+        hashing_time.observe(elapsed)
+        return result
+
+
+def _timed(func: Callable[..., ResultType], *args: Any) -> tuple[ResultType, float]:
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+hashing_pool = HashingPool(
+    settings.password_hashing_workers,
+    settings.password_hashing_queue_size,
+)
+
+
+async def hash_password_async(password: str) -> tuple[str, str]:
+    """Returns a hashed version of the password, hashed in the hashing pool.
+
+    Args:
+        password (str): The password to hash.
+
+    Raises:
+        HashingPoolSaturatedException: Hashing pool is saturated.
+
+    Returns:
+        tuple[str, str]: A tuple containing the hashed password and the salt.
+    """
+
+    return await hashing_pool.run(hash_password, password)
+
+
+async def verify_password_async(
+    plain_password: str,
+    salt: str,
+    hashed_password: str,
+) -> bool:
+    """Returns True if the password matches the hash, verified in the hashing pool.
+
+    Args:
+        plain_password (str): The password to check.
+        salt (str): The salt used to hash the password.
+        hashed_password (str): The hashed password to check against.
+
+    Raises:
+        HashingPoolSaturatedException: Hashing pool is saturated.
+
+    Returns:
+        bool: True if the password matches the hash.
+    """
+
+    return await hashing_pool.run(
+        verify_password,
+        plain_password,
+        salt,
+        hashed_password,
+    )
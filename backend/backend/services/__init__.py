@@ -5,10 +5,14 @@ from backend.services.backup import (
     process_multi_backup_removal,
     remove_remote_backup,
 )
+from backend.services.jobs import BackupJob, create_job, get_job
 
 __all__ = [
     "remove_remote_backup",
     "process_backup_creation",
     "process_backup_restoring",
     "process_multi_backup_removal",
+    "BackupJob",
+    "create_job",
+    "get_job",
 ]
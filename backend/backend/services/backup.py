@@ -1,147 +1,334 @@
-import concurrent.futures
+import asyncio
 import datetime
-import subprocess
+import os
+import shutil
+import tempfile
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, cast
 
-import aiofiles
-import aiofiles.os
-import aiohttp
-import cloudinary.uploader
+from tortoise import Tortoise
 
-from backend.custom_types import CloudinaryResponse
+from backend.cache import invalidate_responses
+from backend.custom_types import BackupFormat
 from backend.db.dao import BackupDAO
-from backend.settings import settings
+from backend.db.dao.user import clear_principals
+from backend.exceptions import BackupException
+from backend.services.jobs import BackupJob, count_bytes, run_job
+from backend.services.storage import backup_executor, get_backup_storage
+from backend.settings import TEMP_DIR, settings
 
+# Job statuses aren't part of backups, so restores don't replace them
+EXCLUDED_TABLES = ("backup_job",)
 
-def upload_backup(filename: str) -> CloudinaryResponse:
-    """Uploads backup file to Cloudinary by file's name.
+
+def remove_remote_backup(filename: str) -> None:
+    """Removes backup file from the backup storage.
 
     Args:
         filename (str): File's name.
-
-    Returns:
-        CloudinaryResponse: Response from Cloudinary
     """
 
-    r = cloudinary.uploader.upload(
-        filename,
-        folder="backups",
-        public_id=filename,
-        overwrite=True,
-        resource_type="raw",
-    )
-    return CloudinaryResponse(**r)
+    get_backup_storage().remove(filename)
 
 
-async def download_backup(url: str) -> str:
-    """Downloads file by url.
+async def read_process(*args: str, **kwargs: Any) -> AsyncIterator[bytes]:
+    """Streams stdout of the process.
 
     Args:
-        url (str): Url.
+        args (str): Program and its arguments.
+        kwargs (Any): Keyword arguments of ``create_subprocess_exec``.
 
-    Returns:
-        str: Filename.
+    Yields:
+        bytes: Chunk of the output.
+
+    Raises:
+        BackupException: Process failed.
     """
 
-    filename = url.split("/")[-1]
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as resp:
-            if resp.status == 200:
-                async with aiofiles.open(filename, "wb") as f:
-                    await f.write(await resp.read())
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        **kwargs,
+    )
+    stdout = cast(asyncio.StreamReader, process.stdout)
+    stderr = cast(asyncio.StreamReader, process.stderr)
+    errors = asyncio.create_task(stderr.read())
+    try:
+        while chunk := await stdout.read(settings.backup_chunk_size):
+            yield chunk
+
+        if await process.wait() != 0:
+            raise BackupException((await errors).decode().strip())
+    finally:
+        # Upload failed, so the rest of the output isn't needed
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        errors.cancel()
+
+
+async def write_process(
+    chunks: AsyncIterator[bytes],
+    *args: str,
+    **kwargs: Any,
+) -> None:
+    """Feeds chunks to stdin of the process and waits for it to finish.
 
-    return filename
+    Args:
+        chunks (AsyncIterator[bytes]): Input of the process.
+        args (str): Program and its arguments.
+        kwargs (Any): Keyword arguments of ``create_subprocess_exec``.
 
+    Raises:
+        BackupException: Process failed.
+    """
 
-def remove_remote_backup(filename: str):
-    """Removes backup file on Cloudinary.
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdin=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        **kwargs,
+    )
+    stdin = cast(asyncio.StreamWriter, process.stdin)
+    stderr = cast(asyncio.StreamReader, process.stderr)
+    errors = asyncio.create_task(stderr.read())
+    try:
+        try:
+            async for chunk in chunks:
+                stdin.write(chunk)
+                await stdin.drain()
+            stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            # Process exited early, its errors explain why
+            pass
+
+        if await process.wait() != 0:
+            raise BackupException((await errors).decode().strip())
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        errors.cancel()
+
+
+async def run_process(*args: str, **kwargs: Any) -> None:
+    """Runs the process to completion.
 
     Args:
-        filename (str): File's name.
+        args (str): Program and its arguments.
+        kwargs (Any): Keyword arguments of ``create_subprocess_exec``.
+
+    Raises:
+        BackupException: Process failed.
     """
 
-    filename = filename.rstrip(".dump")
-    cloudinary.uploader.destroy(f"backups/{filename}.dump", resource_type="raw")
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+        **kwargs,
+    )
+    _, errors = await process.communicate()
+    if process.returncode != 0:
+        raise BackupException(errors.decode().strip())
 
 
-async def remove_backup_file(filename: str) -> None:
-    """Removes file by its name.
+@asynccontextmanager
+async def temporary_directory() -> AsyncIterator[Path]:
+    """Creates temporary directory for a directory-format dump.
 
-    Args:
-        filename (str): File's name.
+    Yields:
+        Path: Directory, removed afterwards.
     """
 
-    if await aiofiles.os.path.exists(filename):
-        await aiofiles.os.remove(filename)
-
+    directory = Path(tempfile.mkdtemp(prefix="backup-", dir=TEMP_DIR))
+    try:
+        yield directory
+    finally:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(backup_executor, shutil.rmtree, directory)
 
-def create_backup() -> str:
-    """Creates backup using pg_dump util.
-
-    Returns:
-        str: File's name.
-    """
 
-    filename = f"backup-{datetime.datetime.utcnow()}.dump".replace(" ", "T")
-    cmd = f"pg_dump -h {settings.db_host} -U {settings.db_user} -Fc {settings.db_base} -f {filename}".split()
-    popen = subprocess.Popen(cmd, stdout=subprocess.PIPE, universal_newlines=True)
+async def stream_backup(backup_format: BackupFormat) -> AsyncIterator[bytes]:
+    """Streams backup created by pg_dump util.
 
-    popen.stdout.close()
-    popen.wait()
+    Custom format is streamed straight from pg_dump. Directory format is dumped
+    by parallel jobs into a temporary directory first, then streamed as a tar.
 
-    return filename
+    Args:
+        backup_format (BackupFormat): Format of the dump.
 
+    Yields:
+        bytes: Chunk of the backup.
 
-def restore_backup(filename: str) -> None:
-    """Restores from backup using pg_restore util."""
+    Raises:
+        BackupException: pg_dump or tar failed.
+    """
 
-    cmd = f"pg_restore -h {settings.db_host} -U {settings.db_user} -d {settings.db_base} --clean {filename}".split()
-    popen = subprocess.Popen(cmd, stdout=subprocess.PIPE, universal_newlines=True)
+    if backup_format == BackupFormat.CUSTOM:
+        async for chunk in read_process(
+            "pg_dump",
+            *get_dump_args(),
+            "-Fc",
+            settings.db_base,
+            env=get_connection_env(),
+        ):
+            yield chunk
+        return
+
+    async with temporary_directory() as directory:
+        dump = directory / "dump"
+        await run_process(
+            "pg_dump",
+            *get_dump_args(),
+            "-Fd",
+            "-j",
+            str(get_parallel_jobs()),
+            "-f",
+            str(dump),
+            settings.db_base,
+            env=get_connection_env(),
+        )
+        async for chunk in read_process("tar", "-C", str(dump), "-cf", "-", "."):
+            yield chunk
+
+
+async def restore_backup(
+    chunks: AsyncIterator[bytes],
+    backup_format: BackupFormat,
+) -> None:
+    """Restores from backup using pg_restore util.
+
+    Custom format is piped into pg_restore. Directory format is unpacked into
+    a temporary directory first, since pg_restore runs parallel jobs only with
+    a dump it can seek in.
 
-    popen.stdout.close()
-    popen.wait()
+    Args:
+        chunks (AsyncIterator[bytes]): Backup content.
+        backup_format (BackupFormat): Format of the dump.
 
+    Raises:
+        BackupException: pg_restore or tar failed.
+    """
 
-async def process_backup_creation(backup_dao: BackupDAO, user_id: str):
+    restore_args = [
+        "pg_restore",
+        *get_connection_args(),
+        "-d",
+        settings.db_base,
+        "--clean",
+        "--if-exists",
+    ]
+    if backup_format == BackupFormat.CUSTOM:
+        await write_process(chunks, *restore_args, env=get_connection_env())
+        return
+
+    async with temporary_directory() as directory:
+        await write_process(chunks, "tar", "-C", str(directory), "-xf", "-")
+        await run_process(
+            *restore_args,
+            "-Fd",
+            "-j",
+            str(get_parallel_jobs()),
+            str(directory),
+            env=get_connection_env(),
+        )
+
+
+def get_connection_args() -> list[str]:
+    return [
+        "-h",
+        settings.db_host,
+        "-p",
+        str(settings.db_port),
+        "-U",
+        settings.db_user,
+    ]
+
+
+def get_dump_args() -> list[str]:
+    return [
+        *get_connection_args(),
+        *(f"--exclude-table={table}" for table in EXCLUDED_TABLES),
+    ]
+
+
+def get_connection_env() -> dict[str, str]:
+    return {**os.environ, "PGPASSWORD": settings.db_pass}
+
+
+def get_parallel_jobs() -> int:
+    return settings.backup_parallel_jobs or os.cpu_count() or 1
+
+
+async def process_backup_creation(
+    backup_dao: BackupDAO,
+    user_id: str,
+    job: BackupJob,
+) -> None:
     """Processes creation of backup.
 
+    Custom-format dump is uploaded while pg_dump is running, so it's never
+    stored locally. Directory-format dump is stored in a temporary directory
+    until it's uploaded.
+
     Args:
         backup_dao (BackupDAO): Backup DAO.
         user_id (str): User's id.
+        job (BackupJob): Job tracking the backup.
     """
 
-    filename = create_backup()
-    response = upload_backup(filename)
-    backup_in = {
-        "title": response.original_filename,
-        "url": str(response.url),
-    }
-    await backup_dao.create_by_user(backup_in, user_id)
-    await remove_backup_file(filename)
-
-
-def process_multi_backup_removal(titles: list[str]):
+    async with run_job(job):
+        backup_format = settings.backup_format
+        title = f"backup-{datetime.datetime.utcnow()}".replace(" ", "T")
+        url = await get_backup_storage().upload(
+            title + backup_format.extension,
+            count_bytes(job, stream_backup(backup_format)),
+        )
+        backup_in = {
+            "title": title,
+            "url": url,
+            "format": backup_format,
+            "size": job.bytes_processed,
+        }
+        await backup_dao.create_by_user(backup_in, user_id)
+
+
+def process_multi_backup_removal(filenames: list[str]) -> None:
     """Processes removal of multiple remote backups.
 
     Args:
-        titles (list[str]): List of backup titles.
+        filenames (list[str]): List of backup file names.
     """
 
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        futures = []
-        for title in titles:
-            futures.append(executor.submit(remove_remote_backup, title))
-        for future in concurrent.futures.as_completed(futures):
-            future.result()
+    get_backup_storage().remove_many(filenames)
 
 
-async def process_backup_restoring(url: str):
+async def process_backup_restoring(
+    url: str,
+    filename: str,
+    backup_format: BackupFormat,
+    job: BackupJob,
+) -> None:
     """Processes restoring of backup.
 
+    The backup is fed to pg_restore or tar while it's downloaded.
+
     Args:
         url (str): Url.
+        filename (str): Backup file's name.
+        backup_format (BackupFormat): Format of the dump.
+        job (BackupJob): Job tracking the restore.
     """
 
-    filename = await download_backup(url)
-    remove_remote_backup(filename)
-    restore_backup(filename)
-    await remove_backup_file(filename)
+    async with run_job(job):
+        chunks = count_bytes(job, get_backup_storage().download(url))
+        await restore_backup(chunks, backup_format)
+        # Every cached response and principal may come from the replaced data
+        clear_principals()
+        await invalidate_responses(*Tortoise.apps["models"])
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(backup_executor, remove_remote_backup, filename)
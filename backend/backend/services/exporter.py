@@ -0,0 +1,163 @@
+import csv
+import datetime
+import io
+from typing import Any, AsyncIterator, Callable, Mapping
+
+from fastapi.responses import StreamingResponse
+
+from backend.custom_types import ExportFormat
+from backend.db.dao.base import BaseDAO
+from backend.db.dao.documents import build_object
+from backend.db.routing import get_read_db
+from backend.settings import settings
+
+# Separator of ids in list columns of CSV files
+CSV_LIST_SEPARATOR = "|"
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, list):
+        return CSV_LIST_SEPARATOR.join(map(str, value))
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+def build_export_query(
+    dao: BaseDAO[Any],
+    columns: dict[str, str],
+    file_format: ExportFormat,
+) -> str:
+    """Build query selecting the exported rows, ordered by id.
+
+    Args:
+        dao (BaseDAO[Any]): DAO of the exported model.
+        columns (dict[str, str]): Column -> SQL expression.
+        file_format (ExportFormat): Format of the export.
+
+    Returns:
+        str: Query selecting documents for NDJSON, columns for CSV.
+    """
+
+    if file_format == ExportFormat.NDJSON:
+        select = f'{build_object("obj", (), **columns)}::text AS "document"'
+    else:
+        select = ", ".join(
+            f'{expression} AS "{name}"' for name, expression in columns.items()
+        )
+    return f'SELECT {select} FROM "{dao.model._meta.db_table}" obj ORDER BY obj."id"'
+
+
+def get_row_writer(
+    buffer: io.StringIO,
+    columns: dict[str, str],
+    file_format: ExportFormat,
+) -> Callable[[Mapping[str, Any]], None]:
+    """Get function writing a selected row into the buffer.
+
+    CSV header is written right away.
+
+    Args:
+        buffer (io.StringIO): Buffer of the batch.
+        columns (dict[str, str]): Column -> SQL expression.
+        file_format (ExportFormat): Format of the export.
+
+    Returns:
+        Callable[[Mapping[str, Any]], None]: Writes a row.
+    """
+
+    def write_document(record: Mapping[str, Any]) -> None:
+        buffer.write(record["document"])
+        buffer.write("\n")
+
+    def write_csv_row(record: Mapping[str, Any]) -> None:
+        writer.writerow([_csv_value(value) for value in record.values()])
+
+    if file_format == ExportFormat.NDJSON:
+        return write_document
+
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    return write_csv_row
+
+
+def _flush(buffer: io.StringIO) -> bytes:
+    batch = buffer.getvalue().encode()
+    buffer.seek(0)
+    buffer.truncate()
+    return batch
+
+
+async def stream_export(
+    dao: BaseDAO[Any],
+    file_format: ExportFormat,
+) -> AsyncIterator[bytes]:
+    """Stream all objects of the DAO's model in the given format.
+
+    Rows are read from a server-side cursor in a read-only snapshot of the
+    replica, so memory doesn't depend on the amount of objects. NDJSON
+    documents are built by the database.
+
+    Args:
+        dao (BaseDAO[Any]): DAO of the exported model.
+        file_format (ExportFormat): Format of the export.
+
+    Yields:
+        bytes: Batch of serialized rows, CSV starts with the header.
+    """
+
+    columns = dao.get_export_columns("obj")
+    query = build_export_query(dao, columns, file_format)
+    buffer = io.StringIO()
+    write_row = get_row_writer(buffer, columns, file_format)
+
+    batch_size = settings.export_batch_size
+    db = get_read_db()
+    async with db.acquire_connection() as connection:
+        async with connection.transaction(
+            isolation="repeatable_read",
+            readonly=True,
+        ):
+            rows = 0
+            async for record in connection.cursor(query, prefetch=batch_size):
+                write_row(record)
+                rows += 1
+                if rows % batch_size == 0:
+                    yield _flush(buffer)
+
+    if buffer.tell():
+        yield _flush(buffer)
+
+
+def get_export_response(
+    dao: BaseDAO[Any],
+    file_format: ExportFormat,
+    name: str,
+) -> StreamingResponse:
+    """Build response streaming the export as an attachment.
+
+    Args:
+        dao (BaseDAO[Any]): DAO of the exported model.
+        file_format (ExportFormat): Format of the export.
+        name (str): Name of the attached file without extension.
+
+    Returns:
+        StreamingResponse: Response.
+    """
+
+    return StreamingResponse(
+        stream_export(dao, file_format),
+        media_type=MEDIA_TYPES[file_format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="{name}.{file_format.value}"'
+            ),
+        },
+    )
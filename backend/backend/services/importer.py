@@ -0,0 +1,304 @@
+import csv
+import datetime
+import json
+import logging
+from pathlib import Path
+from typing import Any, Callable, Iterator, NamedTuple, Optional, TextIO
+
+from tortoise import connections
+
+from backend.custom_types import ImportFormat, ImportKind
+from backend.exceptions import ImportException
+
+logger = logging.getLogger(__name__)
+
+STAGING_TABLE = "import_staging"
+TITLE_LENGTH = 512
+# Separator of titles in list columns of CSV files
+CSV_LIST_SEPARATOR = "|"
+
+
+def _text(value: Any) -> str:
+    if not isinstance(value, str) or not value:
+        raise ValueError("must be a non-empty string")
+    if len(value) > TITLE_LENGTH:
+        raise ValueError(f"must be at most {TITLE_LENGTH} characters long")
+    return value
+
+
+def _date(value: Any) -> datetime.date:
+    return datetime.date.fromisoformat(_text(value))
+
+
+def _integer(value: Any) -> int:
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError("must be an integer")
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError("must be an integer") from None
+
+
+def _titles(value: Any) -> Optional[list[str]]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.split(CSV_LIST_SEPARATOR) if value else []
+    if not isinstance(value, list):
+        raise ValueError("must be a list of titles")
+    return [_text(title) for title in value]
+
+
+class Column(NamedTuple):
+    name: str
+    sql_type: str
+    convert: Callable[[Any], Any]
+    required: bool = True
+
+
+class ImportSpec(NamedTuple):
+    """How rows of a kind are staged and merged into the real tables."""
+
+    columns: tuple[Column, ...]
+    # Merges the last staged row of each natural key, returning "created" flags
+    merge: str
+    # Statements run after the merge
+    after: tuple[str, ...] = ()
+
+
+def _latest(key: tuple[str, ...]) -> str:
+    columns = ", ".join(f'"{column}"' for column in key)
+    return (
+        f'(SELECT DISTINCT ON ({columns}) * FROM "{STAGING_TABLE}" '
+        f'ORDER BY {columns}, "position" DESC) staging'
+    )
+
+
+def _replace_game_links(table: str, key: str, column: str) -> tuple[str, str]:
+    """Build statements replacing links of imported games with given titles.
+
+    Args:
+        table (str): Related table.
+        key (str): Join table column referencing the related table.
+        column (str): Staging column with titles of the related objects.
+
+    Returns:
+        tuple[str, str]: Statements removing old links and adding new ones.
+    """
+
+    through = f"game_{table}"
+    latest = _latest(("title",))
+    return (
+        f'DELETE FROM "{through}" USING "game" game, {latest} '
+        f'WHERE game."id" = "{through}"."game_id" '
+        f'AND game."title" = staging."title" AND staging."{column}" IS NOT NULL',
+        f'INSERT INTO "{through}" ("game_id", "{key}") '
+        f'SELECT DISTINCT game."id", related."id" FROM {latest} '
+        f'CROSS JOIN unnest(staging."{column}") AS link("title") '
+        'JOIN "game" game ON game."title" = staging."title" '
+        f'JOIN "{table}" related ON related."title" = link."title"',
+    )
+
+
+SPECS = {
+    ImportKind.COMPANIES: ImportSpec(
+        columns=(
+            Column("title", "varchar", _text),
+            Column("founded_at", "date", _date),
+        ),
+        merge=(
+            'INSERT INTO "company" ("id", "title", "founded_at") '
+            'SELECT gen_random_uuid(), staging."title", staging."founded_at" '
+            f'FROM {_latest(("title",))} '
+            'ON CONFLICT ("title") DO UPDATE '
+            'SET "founded_at" = EXCLUDED."founded_at" '
+            'RETURNING (xmax = 0) AS "created"'
+        ),
+    ),
+    ImportKind.PLATFORMS: ImportSpec(
+        columns=(Column("title", "varchar", _text),),
+        merge=(
+            'INSERT INTO "platform" ("id", "title") '
+            'SELECT gen_random_uuid(), staging."title" '
+            f'FROM {_latest(("title",))} '
+            'ON CONFLICT ("title") DO NOTHING '
+            'RETURNING TRUE AS "created"'
+        ),
+    ),
+    ImportKind.GENRES: ImportSpec(
+        columns=(Column("title", "varchar", _text),),
+        merge=(
+            'INSERT INTO "genre" ("id", "title") '
+            'SELECT gen_random_uuid(), staging."title" '
+            f'FROM {_latest(("title",))} '
+            'ON CONFLICT ("title") DO NOTHING '
+            'RETURNING TRUE AS "created"'
+        ),
+    ),
+    ImportKind.GAMES: ImportSpec(
+        columns=(
+            Column("title", "varchar", _text),
+            Column("released_at", "date", _date),
+            Column("company", "varchar", _text),
+            Column("platforms", "varchar[]", _titles, required=False),
+            Column("genres", "varchar[]", _titles, required=False),
+        ),
+        merge=(
+            'INSERT INTO "game" '
+            '("id", "title", "released_at", "created_by_company_id") '
+            "SELECT gen_random_uuid(), staging.\"title\", staging.\"released_at\", "
+            f'company."id" FROM {_latest(("title",))} '
+            'JOIN "company" company ON company."title" = staging."company" '
+            'ON CONFLICT ("title") DO UPDATE '
+            'SET "released_at" = EXCLUDED."released_at", '
+            '"created_by_company_id" = EXCLUDED."created_by_company_id" '
+            'RETURNING (xmax = 0) AS "created"'
+        ),
+        after=(
+            *_replace_game_links("platform", "platform_id", "platforms"),
+            *_replace_game_links("genre", "genre_id", "genres"),
+        ),
+    ),
+    ImportKind.SALES: ImportSpec(
+        columns=(
+            Column("game", "varchar", _text),
+            Column("platform", "varchar", _text),
+            Column("amount", "bigint", _integer),
+        ),
+        merge=(
+            'INSERT INTO "sale" ("id", "game_id", "platform_id", "amount") '
+            'SELECT gen_random_uuid(), game."id", platform."id", staging."amount" '
+            f'FROM {_latest(("game", "platform"))} '
+            'JOIN "game" game ON game."title" = staging."game" '
+            'JOIN "platform" platform ON platform."title" = staging."platform" '
+            'ON CONFLICT ("game_id", "platform_id") DO UPDATE '
+            'SET "amount" = EXCLUDED."amount" '
+            'RETURNING (xmax = 0) AS "created"'
+        ),
+    ),
+}
+
+
+class ImportResult(NamedTuple):
+    rows: int
+    created: int
+    updated: int
+
+    @property
+    def skipped(self) -> int:
+        """Repeated rows, existing platforms and genres, and rows referencing
+        missing objects."""
+
+        return self.rows - self.created - self.updated
+
+
+# Line number and the row
+Row = tuple[int, dict[str, Any]]
+
+
+def read_rows(path: Path, file_format: ImportFormat) -> Iterator[Row]:
+    """Read rows of the file one by one.
+
+    Args:
+        path (Path): CSV file with a header or NDJSON file.
+        file_format (ImportFormat): Format of the file.
+
+    Yields:
+        Row: Line number and the row.
+    """
+
+    read = _read_csv if file_format == ImportFormat.CSV else _read_ndjson
+    with path.open(newline="", encoding="utf-8") as file:
+        yield from read(file)
+
+
+def _read_csv(file: TextIO) -> Iterator[Row]:
+    reader = csv.DictReader(file)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def _read_ndjson(file: TextIO) -> Iterator[Row]:
+    for line_number, line in enumerate(file, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            raise ImportException(f"Line {line_number}: {error}") from error
+        if not isinstance(row, dict):
+            raise ImportException(f"Line {line_number}: must be an object")
+        yield line_number, row
+
+
+def _to_records(
+    spec: ImportSpec,
+    rows: Iterator[Row],
+) -> Iterator[tuple[Any, ...]]:
+    for position, (line_number, row) in enumerate(rows):
+        record: list[Any] = [position]
+        for column in spec.columns:
+            value = row.get(column.name)
+            if value in (None, "") and not column.required:
+                record.append(None)
+                continue
+            try:
+                record.append(column.convert(value))
+            except ValueError as error:
+                raise ImportException(
+                    f"Line {line_number}: {column.name} {error}",
+                ) from error
+        yield tuple(record)
+
+
+async def import_rows(
+    kind: ImportKind,
+    rows: Iterator[Row],
+) -> ImportResult:
+    """Import rows into the real tables in a single transaction.
+
+    Rows are streamed by COPY into a temporary staging table, then merged by
+    a few set-based statements which resolve titles to ids. Rows referencing
+    missing objects are skipped.
+
+    Args:
+        kind (ImportKind): Kind of the rows.
+        rows (Iterator[Row]): Line numbers and rows.
+
+    Returns:
+        ImportResult: Amounts of staged, created and updated rows.
+    """
+
+    spec = SPECS[kind]
+    columns = ", ".join(
+        f'"{column.name}" {column.sql_type}' for column in spec.columns
+    )
+    db = connections.get("default")
+    async with db.acquire_connection() as connection:
+        async with connection.transaction():
+            await connection.execute(
+                f'CREATE TEMP TABLE "{STAGING_TABLE}" '
+                f'("position" bigint, {columns}) ON COMMIT DROP',
+            )
+            await connection.copy_records_to_table(
+                STAGING_TABLE,
+                records=_to_records(spec, rows),
+                columns=["position", *(column.name for column in spec.columns)],
+            )
+            staged = await connection.fetchval(
+                f'SELECT count(*) FROM "{STAGING_TABLE}"',
+            )
+            # Temporary tables aren't analyzed automatically
+            await connection.execute(f'ANALYZE "{STAGING_TABLE}"')
+
+            merged = await connection.fetchrow(
+                f"WITH merged AS ({spec.merge}) SELECT "
+                'count(*) FILTER (WHERE "created") AS "created", '
+                'count(*) FILTER (WHERE NOT "created") AS "updated" FROM merged',
+            )
+            for statement in spec.after:
+                await connection.execute(statement)
+
+    result = ImportResult(staged, merged["created"], merged["updated"])
+    logger.debug(f"Imported {kind.value}: {result}")
+    return result
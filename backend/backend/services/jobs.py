@@ -0,0 +1,143 @@
+import datetime
+import logging
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from backend.custom_types import JobStatus
+from backend.db.models import BackupJob
+from backend.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+async def create_job(kind: str) -> BackupJob:
+    """Creates queued job, forgetting the oldest finished ones.
+
+    Jobs are stored in the database, so any worker reports their status.
+
+    Args:
+        kind (str): Kind of the job, e.g. ``backup`` or ``restore``.
+
+    Returns:
+        BackupJob: Job.
+    """
+
+    stale_ids = (
+        await BackupJob.filter(status__in=[JobStatus.DONE, JobStatus.FAILED])
+        .order_by("-finished_at")
+        .offset(settings.backup_jobs_history)
+        .values_list("id", flat=True)
+    )
+    if stale_ids:
+        await BackupJob.filter(id__in=stale_ids).delete()
+
+    return await BackupJob.create(id=uuid.uuid4(), kind=kind)
+
+
+async def get_job(job_id: uuid.UUID) -> Optional[BackupJob]:
+    """Returns job by id.
+
+    Args:
+        job_id (uuid.UUID): Job id.
+
+    Returns:
+        Optional[BackupJob]: Job, None if it's unknown.
+    """
+
+    return await BackupJob.get_or_none(id=job_id)
+
+
+async def fail_stale_jobs() -> int:
+    """Marks jobs left queued or running by a stopped process as failed.
+
+    Jobs run in the process which created them, so they can't be resumed.
+    Called on startup, before new jobs are created.
+
+    Returns:
+        int: Amount of failed jobs.
+    """
+
+    amount = await BackupJob.filter(
+        status__in=[JobStatus.QUEUED, JobStatus.RUNNING],
+    ).update(
+        status=JobStatus.FAILED,
+        error="Interrupted by a restart",
+        finished_at=datetime.datetime.now(datetime.timezone.utc),
+    )
+    if amount:
+        logger.warning(f"Marked {amount} interrupted jobs as failed")
+    return amount
+
+
+async def _finish_job(job: BackupJob, status: JobStatus) -> None:
+    job.status = status
+    job.finished_at = datetime.datetime.now(datetime.timezone.utc)
+    await job.save(
+        update_fields=["status", "error", "bytes_processed", "finished_at"],
+    )
+
+
+@asynccontextmanager
+async def run_job(job: BackupJob) -> AsyncIterator[None]:
+    """Tracks status of the job running in the block.
+
+    Errors are logged and stored in the job instead of being raised.
+    Cancellation and other ``BaseException`` fail the job and are re-raised.
+
+    Args:
+        job (BackupJob): Job.
+
+    Yields:
+        None: Nothing.
+    """
+
+    job.status = JobStatus.RUNNING
+    job.started_at = datetime.datetime.now(datetime.timezone.utc)
+    await job.save(update_fields=["status", "started_at"])
+    try:
+        yield
+    except Exception as error:
+        logger.exception(f"{job.kind.capitalize()} job {job.id} failed")
+        job.error = str(error)
+        await _finish_job(job, JobStatus.FAILED)
+    except BaseException:
+        logger.warning(f"{job.kind.capitalize()} job {job.id} was interrupted")
+        job.error = "Interrupted"
+        await _finish_job(job, JobStatus.FAILED)
+        raise
+    else:
+        await _finish_job(job, JobStatus.DONE)
+
+
+async def count_bytes(
+    job: BackupJob,
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[bytes]:
+    """Counts bytes passing through the job.
+
+    The count is saved once ``backup_job_progress_bytes`` bytes or
+    ``backup_job_progress_seconds`` seconds have passed since the last save.
+    ``run_job`` saves the final count.
+
+    Args:
+        job (BackupJob): Job.
+        chunks (AsyncIterator[bytes]): Chunks.
+
+    Yields:
+        bytes: The same chunks.
+    """
+
+    saved_bytes = job.bytes_processed
+    saved_at = time.monotonic()
+    async for chunk in chunks:
+        job.bytes_processed += len(chunk)
+        now = time.monotonic()
+        if (
+            job.bytes_processed - saved_bytes >= settings.backup_job_progress_bytes
+            or now - saved_at >= settings.backup_job_progress_seconds
+        ):
+            await job.save(update_fields=["bytes_processed"])
+            saved_bytes, saved_at = job.bytes_processed, now
+        yield chunk
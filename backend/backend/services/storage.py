@@ -0,0 +1,192 @@
+import asyncio
+import functools
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+import aiofiles
+import aiohttp
+import cloudinary.api
+import cloudinary.uploader
+import cloudinary.utils
+
+from backend.custom_types import BackupStorageType, CloudinaryResponse
+from backend.settings import settings
+
+# Most resources deleted by one Admin API call
+CLOUDINARY_DELETE_LIMIT = 100
+
+# Runs blocking calls of storages' SDKs off the event loop
+backup_executor = ThreadPoolExecutor(
+    max_workers=settings.backup_workers,
+    thread_name_prefix="backup",
+)
+
+
+class BackupStorage(ABC):
+    """Storage of backup files."""
+
+    @abstractmethod
+    async def upload(self, filename: str, chunks: AsyncIterator[bytes]) -> str:
+        """Uploads backup read from chunks.
+
+        Args:
+            filename (str): Backup file's name.
+            chunks (AsyncIterator[bytes]): Backup content.
+
+        Returns:
+            str: Backup url.
+        """
+
+    @abstractmethod
+    def download(self, url: str) -> AsyncIterator[bytes]:
+        """Downloads backup in chunks.
+
+        Args:
+            url (str): Backup url.
+
+        Returns:
+            AsyncIterator[bytes]: Backup content.
+        """
+
+    @abstractmethod
+    def remove(self, filename: str) -> None:
+        """Removes backup.
+
+        Args:
+            filename (str): Backup file's name.
+        """
+
+    def remove_many(self, filenames: list[str]) -> None:
+        """Removes backups, one by one unless the storage has a bulk API.
+
+        Args:
+            filenames (list[str]): Backup files' names.
+        """
+
+        for filename in filenames:
+            self.remove(filename)
+
+
+class CloudinaryStorage(BackupStorage):
+    """Stores backups as raw Cloudinary resources, uploaded in chunks."""
+
+    async def upload(self, filename: str, chunks: AsyncIterator[bytes]) -> str:
+        upload_id = cloudinary.utils.random_public_id()
+
+        # Total size is known only with the last chunk, so read one chunk ahead
+        position = 0
+        chunk = b""
+        async for next_chunk in _rechunk(chunks, settings.backup_chunk_size):
+            if chunk:
+                await self._upload_part(filename, chunk, position, -1, upload_id)
+                position += len(chunk)
+            chunk = next_chunk
+
+        response = await self._upload_part(
+            filename,
+            chunk,
+            position,
+            position + len(chunk),
+            upload_id,
+        )
+        return str(CloudinaryResponse(**response).url)
+
+    async def _upload_part(
+        self,
+        filename: str,
+        chunk: bytes,
+        position: int,
+        total: int,
+        upload_id: str,
+    ) -> dict[str, Any]:
+        end = position + len(chunk) - 1
+        upload_part = functools.partial(
+            cloudinary.uploader.upload_large_part,
+            (filename, chunk),
+            http_headers={
+                "Content-Range": f"bytes {position}-{end}/{total}",
+                "X-Unique-Upload-Id": upload_id,
+            },
+            folder="backups",
+            public_id=filename,
+            overwrite=True,
+            resource_type="raw",
+        )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(backup_executor, upload_part)
+
+    async def download(self, url: str) -> AsyncIterator[bytes]:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url) as resp:
+                resp.raise_for_status()
+                async for chunk in resp.content.iter_chunked(
+                    settings.backup_chunk_size,
+                ):
+                    yield chunk
+
+    def remove(self, filename: str) -> None:
+        cloudinary.uploader.destroy(f"backups/{filename}", resource_type="raw")
+
+    def remove_many(self, filenames: list[str]) -> None:
+        public_ids = [f"backups/{filename}" for filename in filenames]
+        for start in range(0, len(public_ids), CLOUDINARY_DELETE_LIMIT):
+            cloudinary.api.delete_resources(
+                public_ids[start : start + CLOUDINARY_DELETE_LIMIT],
+                resource_type="raw",
+            )
+
+
+class LocalStorage(BackupStorage):
+    """Stores backups in a local directory."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    async def upload(self, filename: str, chunks: AsyncIterator[bytes]) -> str:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / filename
+        try:
+            async with aiofiles.open(path, "wb") as f:
+                async for chunk in chunks:
+                    await f.write(chunk)
+        except BaseException:
+            path.unlink(missing_ok=True)
+            raise
+        return path.resolve().as_uri()
+
+    async def download(self, url: str) -> AsyncIterator[bytes]:
+        async with aiofiles.open(url2pathname(urlparse(url).path), "rb") as f:
+            while chunk := await f.read(settings.backup_chunk_size):
+                yield chunk
+
+    def remove(self, filename: str) -> None:
+        (self.directory / filename).unlink(missing_ok=True)
+
+
+async def _rechunk(chunks: AsyncIterator[bytes], size: int) -> AsyncIterator[bytes]:
+    """Joins chunks into chunks of the given size, except the last one."""
+
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= size:
+            yield bytes(buffer[:size])
+            del buffer[:size]
+    if buffer:
+        yield bytes(buffer)
+
+
+def get_backup_storage() -> BackupStorage:
+    """Returns storage chosen by settings.
+
+    Returns:
+        BackupStorage: Backup storage.
+    """
+
+    if settings.backup_storage == BackupStorageType.LOCAL:
+        return LocalStorage(settings.backup_directory)
+    return CloudinaryStorage()
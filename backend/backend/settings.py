@@ -1,10 +1,17 @@
 from pathlib import Path
 from tempfile import gettempdir
-from typing import Optional
+from typing import Any, Optional
 
-from pydantic import BaseSettings
+from pydantic import BaseSettings, validator
 from yarl import URL
 
+from backend.custom_types import (
+    BackupFormat,
+    BackupStorageType,
+    CountStrategy,
+    ResponseCacheType,
+)
+
 TEMP_DIR = Path(gettempdir())
 
 
@@ -20,6 +27,73 @@ class Settings(BaseSettings):
     # Enable uvicorn reloading
     reload: bool = True
     db_echo: bool = True
+    # How list endpoints count total amount of objects
+    count_strategy: CountStrategy = CountStrategy.EXACT
+    # Lifetime of cached counts in seconds
+    count_cache_ttl: int = 10
+    # Lifetime of cached authenticated users in seconds
+    principal_cache_ttl: int = 60
+    # Threads hashing and verifying passwords
+    password_hashing_workers: int = 4
+    # Passwords allowed to wait for a hashing thread, the rest are rejected
+    password_hashing_queue_size: int = 64
+    # Format of new backups, directory ones are dumped and restored in parallel
+    backup_format: BackupFormat = BackupFormat.CUSTOM
+    # Parallel jobs of pg_dump and pg_restore, 0 means amount of CPUs
+    backup_parallel_jobs: int = 0
+    # Where backups are uploaded to
+    backup_storage: BackupStorageType = BackupStorageType.CLOUDINARY
+    # Directory of the local backup storage
+    backup_directory: Path = TEMP_DIR / "backups"
+    # Size of chunks backups are streamed in, Cloudinary requires at least 5 MB
+    backup_chunk_size: int = 20 * 1024 * 1024
+    # Threads running blocking calls of the backup storage
+    backup_workers: int = 2
+    # Amount of finished backup jobs whose status is kept
+    backup_jobs_history: int = 100
+    # Progress of a backup job is saved once this many bytes
+    # or seconds have passed since the last save
+    backup_job_progress_bytes: int = 1048576
+    backup_job_progress_seconds: float = 1.0
+    # Maximum amount of rows accepted by bulk endpoints
+    bulk_max_rows: int = 10000
+    # Maximum size of a JSON body of bulk endpoints, in bytes
+    bulk_max_bytes: int = 16777216
+    # Maximum size of a line of an NDJSON body of bulk endpoints, in bytes
+    bulk_max_line_bytes: int = 65536
+    # Rows fetched from the export cursor and sent at once
+    export_batch_size: int = 1000
+    # Connections kept in the database pool of each worker
+    db_pool_min_size: int = 1
+    db_pool_max_size: int = 5
+    # Seconds an idle pooled connection is kept open
+    db_pool_max_inactive_lifetime: float = 300
+    # Prepared statements cached per connection, 0 disables caching (PgBouncer)
+    db_statement_cache_size: int = 100
+    # Milliseconds a statement may run, 0 means no limit
+    db_statement_timeout: int = 0
+    # Milliseconds a statement of the statistics endpoints may run
+    statistics_statement_timeout: int = 5000
+    # Seconds reads of a client go to the primary after it wrote, 0 disables it
+    replica_sticky_seconds: int = 5
+    # Where catalog responses are cached. The in-process cache of a worker isn't
+    # invalidated by writes of other workers and of CLI commands, so it's only
+    # allowed with a single worker, which alone writes to the database.
+    response_cache: ResponseCacheType = ResponseCacheType.NONE
+    # Seconds a cached response is kept
+    response_cache_ttl: int = 60
+    # Responses kept by the in-process cache
+    response_cache_size: int = 1024
+    # Server of the Redis response cache
+    redis_url: str = "redis://localhost:6379/0"
+    # Smallest response body in bytes worth compressing
+    compression_minimum_size: int = 1024
+    # Smallest response body in bytes compressed in a thread
+    compression_thread_size: int = 262144
+    # Gzip compression level, 1 is the fastest and 9 the smallest
+    compression_gzip_level: int = 6
+    # Brotli compression quality, 0 is the fastest and 11 the smallest
+    compression_brotli_quality: int = 4
 
     # Variables from environment
     secret_key: Optional[str] = None
@@ -28,6 +102,30 @@ class Settings(BaseSettings):
     db_user: str = "backend"
     db_pass: str = "backend"
     db_base: str = "backend"
+    # Replica serving reads, all queries go to the primary if it isn't set
+    db_replica_host: Optional[str] = None
+    db_replica_port: int = 5432
+
+    @validator("response_cache")
+    def check_response_cache(
+        cls,  # noqa: N805
+        response_cache: ResponseCacheType,
+        values: dict[str, Any],
+    ) -> ResponseCacheType:
+        """
+        Forbid the in-process response cache with several workers.
+
+        :param response_cache: response cache type.
+        :param values: settings validated before.
+        :raises ValueError: in-process cache is used by several workers.
+        :return: response cache type.
+        """
+        if (
+            response_cache == ResponseCacheType.MEMORY
+            and values.get("workers_count", 1) > 1
+        ):
+            raise ValueError("Several workers require the Redis response cache")
+        return response_cache
 
     @property
     def db_url(self) -> URL:
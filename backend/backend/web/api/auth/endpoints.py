@@ -1,15 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 
-from backend.db.dao import UserDAO
+from backend.db.dao import Principal, UserDAO
 from backend.db.dependencies.user import get_current_user
 from backend.db.models.user import User
-from backend.exceptions import InvalidPasswordException, ObjectNotFoundException
+from backend.exceptions import (
+    InvalidPasswordException,
+    ObjectNotFoundException,
+)
 from backend.security import create_access_token
 from backend.web.api.auth.schema import Token
 from backend.web.api.user.schema.user import User as UserSchema
+from backend.web.responses import ORJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ORJSONRoute)
 
 
 @router.post("/access-token", response_model=Token)
@@ -44,15 +48,26 @@ async def login_access_token(
 
 @router.post("/test-token", response_model=UserSchema)
 async def token_test(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
+    user_dao: UserDAO = Depends(),
 ) -> User:
     """Returns current user if valid access token is provided
 
     Args:
-        current_user (User): Current user.
+        current_user (Principal): Current user.
+        user_dao (UserDAO): User DAO.
+
+    Raises:
+        HTTPException: User was deleted after the principal was cached.
 
     Returns:
         User: Current user.
     """
 
-    return current_user
+    db_user = await user_dao.get(str(current_user.id))
+    if db_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
+    return db_user
@@ -1,15 +1,20 @@
+from typing import Optional
 from uuid import UUID
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status
 
 from backend.custom_types import BackupOrderColumns
-from backend.db import models
-from backend.db.dao import BackupDAO
+from backend.db.dao import BackupDAO, Principal
+from backend.db.dependencies.include_validation import IncludeValidation
 from backend.db.dependencies.order_validation import OrderValidation
+from backend.db.dependencies.pagination import get_page
 from backend.db.dependencies.user import get_current_superuser
 from backend.db.models.backup import Backup
 from backend.exceptions import ObjectNotFoundException
 from backend.services import (
+    BackupJob,
+    create_job,
+    get_job,
     process_backup_creation,
     process_backup_restoring,
     process_multi_backup_removal,
@@ -17,17 +22,23 @@ from backend.services import (
 )
 from backend.web.api.backup import schema
 from backend.web.api.backup.schema.backup import Backup as BackupSchema
+from backend.web.responses import ORJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ORJSONRoute)
 
 
-@router.get("/", response_model=list[BackupSchema])
+@router.get(
+    "/",
+    response_model=list[BackupSchema],
+    response_model_exclude_unset=True,
+)
 async def get_multi(
     response: Response,
     queries: schema.BackupQueries = Depends(),
     sort: list[str] = Depends(OrderValidation(BackupOrderColumns)),
+    include: Optional[list[str]] = Depends(IncludeValidation(BackupSchema)),
     backup_dao: BackupDAO = Depends(),
-    current_superuser: models.User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
 ) -> list[Backup]:
     """Get list of backups.
 
@@ -35,47 +46,42 @@ async def get_multi(
         response (Response): Response.
         queries (BackupQueries, optional): Query parameters.
         sort (list[str], optional): Order parameters.
+        include (Optional[list[str]]): Relations to include.
         backup_dao (BackupDAO, optional): Backup DAO.
-        current_superuser (User, optional): Current superuser.
+        current_superuser (Principal, optional): Current superuser.
 
     Returns:
         list[Backup]: List of backups.
     """
 
-    amount = await backup_dao.get_count()
-    companies = await backup_dao.get_multi(
-        offset=queries.skip,
-        limit=queries.limit,
-        sort=sort,
-    )
-
-    response.headers["X-Total-Count"] = str(amount)
-    return companies
+    return await get_page(response, backup_dao, queries, sort, include)
 
 
 @router.post("/")
 async def create(
     background_tasks: BackgroundTasks,
     backup_dao: BackupDAO = Depends(),
-    current_superuser: models.User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
 ) -> dict:
     """Creates backup of database and uploads it to Cloudinary.
 
     Args:
         background_tasks (BackgroundTasks): Background tasks.
         backup_dao (BackupDAO, optional): Backup DAO.
-        current_superuser (User, optional): Current superuser.
+        current_superuser (Principal, optional): Current superuser.
 
     Returns:
-        Backup: Backup.
+        dict: Message and id of the backup job.
     """
 
+    job = await create_job("backup")
     background_tasks.add_task(
         process_backup_creation,
         backup_dao,
         str(current_superuser.id),
+        job,
     )
-    return {"message": "Backup creation started in background."}
+    return {"message": "Backup creation started in background.", "job_id": job.id}
 
 
 @router.post("/restore/{backup_id}")
@@ -83,7 +89,7 @@ async def restore(
     backup_id: UUID,
     background_tasks: BackgroundTasks,
     backup_dao: BackupDAO = Depends(),
-    current_superuser: models.User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
 ) -> dict:
     """Restores database from backup.
 
@@ -91,10 +97,10 @@ async def restore(
         backup_id (UUID): Backup id.
         background_tasks (BackgroundTasks): Background tasks.
         backup_dao (BackupDAO, optional): Backup DAO.
-        current_superuser (User, optional): Current superuser.
+        current_superuser (Principal, optional): Current superuser.
 
     Returns:
-        Backup: Backup.
+        dict: Message and id of the restore job.
     """
 
     backup = await backup_dao.get(str(backup_id))
@@ -104,11 +110,45 @@ async def restore(
             detail="Backup not found",
         )
 
-    last_backups_titles = await backup_dao.get_last(backup.created_at)
+    last_backups_filenames = await backup_dao.get_last(backup.created_at)
+
+    background_tasks.add_task(process_multi_backup_removal, last_backups_filenames)
+    job = await create_job("restore")
+    background_tasks.add_task(
+        process_backup_restoring,
+        backup.url,
+        backup.filename,
+        backup.format,
+        job,
+    )
+    return {"message": "Backup restoring started in background.", "job_id": job.id}
+
+
+@router.get("/jobs/{job_id}", response_model=schema.BackupJob)
+async def get_job_status(
+    job_id: UUID,
+    current_superuser: Principal = Depends(get_current_superuser),
+) -> BackupJob:
+    """Get status of backup or restore job.
+
+    Args:
+        job_id (UUID): Job id.
+        current_superuser (Principal, optional): Current superuser.
 
-    background_tasks.add_task(process_multi_backup_removal, last_backups_titles)
-    background_tasks.add_task(process_backup_restoring, backup.url)
-    return {"message": "Backup restoring started in background."}
+    Raises:
+        HTTPException: Job not found.
+
+    Returns:
+        BackupJob: Job.
+    """
+
+    job = await get_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found",
+        )
+    return job
 
 
 @router.delete("/", status_code=status.HTTP_204_NO_CONTENT)
@@ -116,7 +156,7 @@ async def delete_multi(
     background_tasks: BackgroundTasks,
     backup_ids: list[UUID],
     backup_dao: BackupDAO = Depends(),
-    current_superuser: models.User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
 ) -> None:
     """Delete backups.
 
@@ -124,11 +164,13 @@ async def delete_multi(
         background_tasks (BackgroundTasks): Background tasks.
         backup_ids (list[UUID]): List of backup ids.
         backup_dao (BackupDAO, optional): Backup DAO.
-        current_superuser (User, optional): Current superuser.
+        current_superuser (Principal, optional): Current superuser.
     """
 
-    titles = await backup_dao.delete_multi([str(backup_id) for backup_id in backup_ids])
-    background_tasks.add_task(process_multi_backup_removal, titles)
+    filenames = await backup_dao.delete_multi(
+        [str(backup_id) for backup_id in backup_ids],
+    )
+    background_tasks.add_task(process_multi_backup_removal, filenames)
 
 
 @router.delete("/{backup_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -136,7 +178,7 @@ async def delete(
     background_tasks: BackgroundTasks,
     backup_id: UUID,
     backup_dao: BackupDAO = Depends(),
-    current_superuser: models.User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
 ) -> None:
     """Delete backups.
 
@@ -144,15 +186,15 @@ async def delete(
         background_tasks (BackgroundTasks): Background tasks.
         backup_id (UUID): Backup id.
         backup_dao (BackupDAO, optional): Backup DAO.
-        current_superuser (User, optional): Current superuser.
+        current_superuser (Principal, optional): Current superuser.
     """
 
     try:
-        title = await backup_dao.delete(str(backup_id))
+        filename = await backup_dao.delete(str(backup_id))
     except ObjectNotFoundException:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Backup not found",
         )
     else:
-        background_tasks.add_task(remove_remote_backup, title)
+        background_tasks.add_task(remove_remote_backup, filename)
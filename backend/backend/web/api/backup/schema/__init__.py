@@ -1,7 +1,9 @@
 from backend.web.api.backup.schema.backup_in_db import BackupInDB
+from backend.web.api.backup.schema.backup_job import BackupJob
 from backend.web.api.backup.schema.backup_queries import BackupQueries
 
 __all__ = [
     "BackupInDB",
+    "BackupJob",
     "BackupQueries",
 ]
@@ -1,8 +1,12 @@
 from typing import Optional
 
+from backend.custom_types import PrefetchedGetterDict
 from backend.web.api.backup.schema import BackupInDB
 from backend.web.api.user.schema.user_in_db import UserInDB
 
 
 class Backup(BackupInDB):
     created_by_user: Optional[UserInDB] = None
+
+    class Config:
+        getter_dict = PrefetchedGetterDict
@@ -1,13 +1,18 @@
 from datetime import datetime
+from typing import Optional
 from uuid import UUID
 
-from pydantic import AnyHttpUrl, BaseModel
+from pydantic import BaseModel
+
+from backend.custom_types import BackupFormat
 
 
 class BackupInDB(BaseModel):
     id: UUID
     title: str
-    url: AnyHttpUrl
+    url: str
+    format: BackupFormat
+    size: Optional[int]
     created_at: datetime
 
     class Config:
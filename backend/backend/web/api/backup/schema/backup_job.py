@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from backend.custom_types import JobStatus
+
+
+class BackupJob(BaseModel):
+    id: UUID
+    kind: str
+    status: JobStatus
+    bytes_processed: int
+    error: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    duration: Optional[float]
+
+    class Config:
+        orm_mode = True
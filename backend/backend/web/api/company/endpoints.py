@@ -1,26 +1,38 @@
+from typing import Any, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from tortoise.exceptions import IntegrityError
 
-from backend.custom_types import CompanyOrderColumns
-from backend.db import models
-from backend.db.dao import CompanyDAO
+from backend.custom_types import CompanyOrderColumns, ExportFormat
+from backend.db.dao import CompanyDAO, Principal
+from backend.db.dependencies.include_validation import IncludeValidation
 from backend.db.dependencies.order_validation import OrderValidation
+from backend.db.dependencies.pagination import get_page
+from backend.db.dependencies.statement_timeout import StatementTimeout
 from backend.db.dependencies.user import get_current_superuser
 from backend.db.models.company import Company
 from backend.exceptions import ObjectNotFoundException
+from backend.services.exporter import get_export_response
+from backend.settings import settings
 from backend.web.api.company import schema
 from backend.web.api.company.schema.company import Company as CompanySchema
+from backend.web.responses import ORJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ORJSONRoute)
 
 
-@router.get("/", response_model=list[CompanySchema])
+@router.get(
+    "/",
+    response_model=list[CompanySchema],
+    response_model_exclude_unset=True,
+)
 async def get_multi(
     response: Response,
     queries: schema.CompanyQueries = Depends(),
     sort: list[str] = Depends(OrderValidation(CompanyOrderColumns)),
+    include: Optional[list[str]] = Depends(IncludeValidation(CompanySchema)),
     company_dao: CompanyDAO = Depends(),
 ) -> list[Company]:
     """Get list of companies.
@@ -29,6 +41,7 @@ async def get_multi(
         response (Response): Response.
         queries (CompanyQueries, optional): Query parameters.
         sort (list[str], optional): Order parameters.
+        include (Optional[list[str]]): Relations to include.
         company_dao (CompanyDAO, optional): Company DAO.
 
     Returns:
@@ -36,9 +49,9 @@ async def get_multi(
     """
 
     filters_dict = {
-        "title": ("title__icontains", queries.title),
+        "title": ("title__trigram_icontains", queries.title),
         "created_by_user": (
-            "created_by_user__username__icontains",
+            "created_by_user__username__trigram_icontains",
             queries.created_by_user,
         ),
     }
@@ -47,23 +60,42 @@ async def get_multi(
         filters_dict[key][0]: filters_dict[key][1] for key in filters.keys()
     }
 
-    amount = await company_dao.get_count(expr=filters_list)
-    companies = await company_dao.get_multi(
-        expr=filters_list,
-        offset=queries.skip,
-        limit=queries.limit,
-        sort=sort,
+    return await get_page(
+        response,
+        company_dao,
+        queries,
+        sort,
+        include,
+        filters_list,
     )
 
-    response.headers["X-Total-Count"] = str(amount)
-    return companies
+
+@router.get("/export", response_class=StreamingResponse)
+async def export(
+    file_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    company_dao: CompanyDAO = Depends(),
+) -> StreamingResponse:
+    """Export all companies, streaming them as NDJSON or CSV.
+
+    Args:
+        file_format (ExportFormat, optional): Format of the export.
+        company_dao (CompanyDAO, optional): Company DAO.
+
+    Returns:
+        StreamingResponse: Companies ordered by id.
+    """
+
+    return get_export_response(company_dao, file_format, "companies")
 
 
 @router.get(
     "/foundation-statistics",
     response_model=list[schema.CompanyFoundationStatistics],
+    dependencies=[Depends(StatementTimeout(settings.statistics_statement_timeout))],
 )
-async def get_foundation_statistics(company_dao: CompanyDAO = Depends()) -> list[dict]:
+async def get_foundation_statistics(
+    company_dao: CompanyDAO = Depends(),
+) -> list[dict[str, Any]]:
     """Statistics for companies foundation.
 
     Args:
@@ -76,8 +108,14 @@ async def get_foundation_statistics(company_dao: CompanyDAO = Depends()) -> list
     return await company_dao.get_foundation_statistics()
 
 
-@router.get("/games-statistics", response_model=list[schema.CompanyGamesStatistics])
-async def get_games_statistics(company_dao: CompanyDAO = Depends()) -> list[dict]:
+@router.get(
+    "/games-statistics",
+    response_model=list[schema.CompanyGamesStatistics],
+    dependencies=[Depends(StatementTimeout(settings.statistics_statement_timeout))],
+)
+async def get_games_statistics(
+    company_dao: CompanyDAO = Depends(),
+) -> list[dict[str, Any]]:
     """Statistics for companies' games.
 
     Args:
@@ -90,19 +128,28 @@ async def get_games_statistics(company_dao: CompanyDAO = Depends()) -> list[dict
     return await company_dao.get_games_statistics()
 
 
-@router.get("/{company_id}", response_model=CompanySchema)
-async def get(company_id: UUID, company_dao: CompanyDAO = Depends()) -> Company:
+@router.get(
+    "/{company_id}",
+    response_model=CompanySchema,
+    response_model_exclude_unset=True,
+)
+async def get(
+    company_id: UUID,
+    include: Optional[list[str]] = Depends(IncludeValidation(CompanySchema)),
+    company_dao: CompanyDAO = Depends(),
+) -> Company:
     """Get company by id.
 
     Args:
         company_id (UUID): Company id.
+        include (Optional[list[str]]): Relations to include.
         company_dao (CompanyDAO, optional): Company DAO.
 
     Returns:
         Company: Company.
     """
 
-    company = await company_dao.get(str(company_id))
+    company = await company_dao.get(str(company_id), include)
     if not company:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -115,14 +162,14 @@ async def get(company_id: UUID, company_dao: CompanyDAO = Depends()) -> Company:
 async def create(
     company: schema.CompanyCreate,
     company_dao: CompanyDAO = Depends(),
-    current_superuser: models.User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
 ) -> Company:
     """Create company.
 
     Args:
         company (CompanyCreate): Company data.
         company_dao (CompanyDAO, optional): Company DAO.
-        current_superuser (User, optional): Current superuser.
+        current_superuser (Principal, optional): Current superuser.
 
     Returns:
         Company: Company.
@@ -147,7 +194,7 @@ async def update(
     company_id: UUID,
     company: schema.CompanyUpdate,
     company_dao: CompanyDAO = Depends(),
-    current_superuser: models.User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
 ) -> Company:
     """Update company.
 
@@ -155,7 +202,7 @@ async def update(
         company_id (UUID): Company id.
         company (CompanyUpdate): Company data.
         company_dao (CompanyDAO, optional): Company DAO.
-        current_superuser (User, optional): Current superuser.
+        current_superuser (Principal, optional): Current superuser.
 
     Returns:
         Company: Company.
@@ -184,14 +231,14 @@ async def update(
 async def delete_multi(
     company_ids: list[UUID],
     company_dao: CompanyDAO = Depends(),
-    current_superuser: models.User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
 ) -> None:
     """Delete companies.
 
     Args:
         company_ids (list[UUID]): Company ids.
         company_dao (CompanyDAO, optional): Company DAO.
-        current_superuser (User, optional): Current superuser.
+        current_superuser (Principal, optional): Current superuser.
 
     Returns:
         None: None.
@@ -210,14 +257,14 @@ async def delete_multi(
 async def delete(
     company_id: UUID,
     company_dao: CompanyDAO = Depends(),
-    current_superuser: models.User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
 ) -> None:
     """Delete company.
 
     Args:
         company_id (UUID): Company id.
         company_dao (CompanyDAO, optional): Company DAO.
-        current_superuser (User, optional): Current superuser.
+        current_superuser (Principal, optional): Current superuser.
 
     Returns:
         None: None.
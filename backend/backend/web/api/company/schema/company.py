@@ -2,6 +2,7 @@ from typing import Optional
 
 from pydantic import validator
 
+from backend.custom_types import PrefetchedGetterDict
 from backend.web.api.company.schema import CompanyInDB
 from backend.web.api.game.schema import GameInDB
 from backend.web.api.user.schema import UserInDB
@@ -11,6 +12,9 @@ class Company(CompanyInDB):
     created_by_user: Optional[UserInDB] = None
     games: list[GameInDB] = []
 
+    class Config:
+        getter_dict = PrefetchedGetterDict
+
     @validator("games", pre=True)
     def convert_to_list(cls, v) -> list:
         return list(v)
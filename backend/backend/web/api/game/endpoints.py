@@ -1,34 +1,53 @@
+from typing import Any, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from tortoise.exceptions import IntegrityError
 
-from backend.custom_types import GameOrderColumns
-from backend.db import models
-from backend.db.dao import GameDAO
+from backend.custom_types import (
+    BulkResult,
+    BulkRowError,
+    ExportFormat,
+    GameOrderColumns,
+)
+from backend.db.dao import GameDAO, Principal
+from backend.db.dependencies.bulk_body import BulkBody, get_bulk_result
+from backend.db.dependencies.include_validation import IncludeValidation
 from backend.db.dependencies.order_validation import OrderValidation
+from backend.db.dependencies.pagination import get_json_page, get_page
+from backend.db.dependencies.statement_timeout import StatementTimeout
 from backend.db.dependencies.user import get_current_superuser
 from backend.db.models.game import Game
 from backend.exceptions import ObjectNotFoundException
+from backend.services.exporter import get_export_response
+from backend.settings import settings
 from backend.web.api.game import schema
 from backend.web.api.game.schema.game import Game as GameSchema
+from backend.web.responses import ORJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ORJSONRoute)
 
 
-@router.get("/", response_model=list[GameSchema])
+@router.get(
+    "/",
+    response_model=list[GameSchema],
+    response_model_exclude_unset=True,
+)
 async def get_multi(
     response: Response,
     queries: schema.GameQueries = Depends(),
     sort: list[str] = Depends(OrderValidation(GameOrderColumns)),
+    include: Optional[list[str]] = Depends(IncludeValidation(GameSchema)),
     game_dao: GameDAO = Depends(),
-) -> list[Game]:
+) -> list[Game] | Response:
     """Get list of games.
 
     Args:
         response (Response): Response.
         queries (schema.GameQueries): Query parameters.
         sort (list[str], optional): Order parameters.
+        include (Optional[list[str]]): Relations to include.
         game_dao (GameDAO): Game DAO.
 
     Returns:
@@ -36,15 +55,15 @@ async def get_multi(
     """
 
     filters_dict = {
-        "title": ("title__icontains", queries.title),
+        "title": ("title__trigram_icontains", queries.title),
         "released_start": ("released_at__gte", queries.released_start),
         "released_end": ("released_at__lte", queries.released_end),
         "created_by_user": (
-            "created_by_user__username__icontains",
+            "created_by_user__username__trigram_icontains",
             queries.created_by_user,
         ),
         "created_by_company": (
-            "created_by_company__title__icontains",
+            "created_by_company__title__trigram_icontains",
             queries.created_by_company,
         ),
     }
@@ -53,23 +72,44 @@ async def get_multi(
         filters_dict[key][0]: filters_dict[key][1] for key in filters.keys()
     }
 
-    amount = await game_dao.get_count(expr=filters_list)
-    games = await game_dao.get_multi(
-        expr=filters_list,
-        offset=queries.skip,
-        limit=queries.limit,
-        sort=sort,
-    )
+    if queries.as_json:
+        return await get_json_page(
+            response,
+            game_dao,
+            queries,
+            sort,
+            include,
+            filters_list,
+        )
+    return await get_page(response, game_dao, queries, sort, include, filters_list)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export(
+    file_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    game_dao: GameDAO = Depends(),
+) -> StreamingResponse:
+    """Export all games, streaming them as NDJSON or CSV.
+
+    Args:
+        file_format (ExportFormat, optional): Format of the export.
+        game_dao (GameDAO, optional): Game DAO.
 
-    response.headers["X-Total-Count"] = str(amount)
-    return games
+    Returns:
+        StreamingResponse: Games ordered by id.
+    """
+
+    return get_export_response(game_dao, file_format, "games")
 
 
 @router.get(
     "/popularity-statistics",
     response_model=list[schema.GamePopulationStatistics],
+    dependencies=[Depends(StatementTimeout(settings.statistics_statement_timeout))],
 )
-async def get_popularity_statistics(game_dao: GameDAO = Depends()) -> list[dict]:
+async def get_popularity_statistics(
+    game_dao: GameDAO = Depends(),
+) -> list[dict[str, Any]]:
     """Statistics for game popularity.
 
     Args:
@@ -82,39 +122,56 @@ async def get_popularity_statistics(game_dao: GameDAO = Depends()) -> list[dict]
     return await game_dao.get_popularity_statistics()
 
 
-@router.get("/{game_id}", response_model=GameSchema)
-async def get(game_id: UUID, game_dao: GameDAO = Depends()) -> Game:
+@router.get(
+    "/{game_id}",
+    response_model=GameSchema,
+    response_model_exclude_unset=True,
+)
+async def get(
+    game_id: UUID,
+    include: Optional[list[str]] = Depends(IncludeValidation(GameSchema)),
+    as_json: bool = False,
+    game_dao: GameDAO = Depends(),
+) -> Game | Response:
     """Get game by ID.
 
     Args:
         game_id (UUID): Game ID.
+        include (Optional[list[str]]): Relations to include.
+        as_json (bool): Whether to get game serialized by the database.
         game_dao (GameDAO): Game DAO.
 
     Returns:
         Game: Game.
     """
 
-    game = await game_dao.get(str(game_id))
-    if not game:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Game not found",
-        )
-    return game
+    if as_json:
+        document = await game_dao.get_json(str(game_id), include)
+        if document is not None:
+            return Response(content=document, media_type="application/json")
+    else:
+        game = await game_dao.get(str(game_id), include)
+        if game is not None:
+            return game
+
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Game not found",
+    )
 
 
 @router.post("/", response_model=GameSchema)
 async def create(
     game: schema.GameCreate,
     game_dao: GameDAO = Depends(),
-    current_superuser: models.User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
 ) -> Game:
     """Create game.
 
     Args:
         game (schema.GameCreate): Game data.
         game_dao (GameDAO): Game DAO.
-        current_superuser (models.User): Current superuser.
+        current_superuser (Principal): Current superuser.
 
     Returns:
         Game: Game.
@@ -144,12 +201,51 @@ async def create(
         raise error
 
 
+@router.post("/bulk", response_model=BulkResult)
+async def bulk_create(
+    # Resolved first, so bodies of other users aren't read
+    current_superuser: Principal = Depends(get_current_superuser),
+    games: list[schema.GameCreate | BulkRowError] = Depends(
+        BulkBody(schema.GameCreate),
+    ),
+    game_dao: GameDAO = Depends(),
+) -> BulkResult:
+    """Create games or update existing ones in a single transaction.
+
+    The body is a JSON array or NDJSON of games. Games with existing titles
+    are updated. Invalid rows are reported without aborting the rest.
+
+    Args:
+        current_superuser (Principal): Current superuser.
+        games (list[GameCreate | BulkRowError]): Rows of the body.
+        game_dao (GameDAO): Game DAO.
+
+    Returns:
+        BulkResult: Amounts of created and updated games, ids and errors.
+    """
+
+    valid = [
+        (index, game.dict(exclude_unset=True))
+        for index, game in enumerate(games)
+        if not isinstance(game, BulkRowError)
+    ]
+    try:
+        outcomes = await game_dao.upsert_many(valid, str(current_superuser.id))
+    except IntegrityError as error:
+        # Referenced objects were deleted concurrently
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(error),
+        ) from error
+    return get_bulk_result(games, outcomes)
+
+
 @router.patch("/{game_id}", response_model=GameSchema)
 async def update(
     game_id: UUID,
     game: schema.GameUpdate,
     game_dao: GameDAO = Depends(),
-    current_superuser: models.User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
 ) -> Game:
     """Update game.
 
@@ -157,7 +253,7 @@ async def update(
         game_id (UUID): Game ID.
         game (schema.GameUpdate): Game data.
         game_dao (GameDAO): Game DAO.
-        current_superuser (models.User): Current superuser.
+        current_superuser (Principal): Current superuser.
 
     Returns:
         Game: Game.
@@ -191,14 +287,14 @@ async def update(
 async def delete_multi(
     game_ids: list[UUID],
     game_dao: GameDAO = Depends(),
-    current_superuser: models.User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
 ) -> None:
     """Delete games.
 
     Args:
         game_ids (list[UUID]): Game IDs.
         game_dao (GameDAO): Game DAO.
-        current_superuser (models.User): Current superuser.
+        current_superuser (Principal): Current superuser.
 
     Returns:
         None: None.
@@ -219,14 +315,14 @@ async def delete_multi(
 async def delete(
     game_id: UUID,
     game_dao: GameDAO = Depends(),
-    current_superuser: models.User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
 ) -> None:
     """Delete game.
 
     Args:
         game_id (UUID): Game ID.
         game_dao (GameDAO): Game DAO.
-        current_superuser (models.User): Current superuser.
+        current_superuser (Principal): Current superuser.
 
     Returns:
         None: None.
@@ -2,6 +2,7 @@ from typing import Optional
 
 from pydantic import validator
 
+from backend.custom_types import PrefetchedGetterDict
 from backend.web.api.company.schema import CompanyInDB
 from backend.web.api.game.schema import GameInDB
 from backend.web.api.genre.schema import GenreInDB
@@ -11,12 +12,15 @@ from backend.web.api.user.schema import UserInDB
 
 
 class Game(GameInDB):
-    created_by_company: CompanyInDB
+    created_by_company: Optional[CompanyInDB] = None
     created_by_user: Optional[UserInDB] = None
     genres: list[GenreInDB] = []
     platforms: list[PlatformInDB] = []
     sales: list[Sale] = []
 
+    class Config:
+        getter_dict = PrefetchedGetterDict
+
     @validator("genres", "platforms", "sales", pre=True)
     def convert_to_list(cls, v) -> list:
         return list(v)
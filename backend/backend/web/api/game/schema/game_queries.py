@@ -12,3 +12,4 @@ class GameQueries(CommonQueries):
     released_end: datetime.date = None
     created_by_user: Optional[str] = Query(None, regex=r"^\w+$")
     created_by_company: Optional[str] = None
+    as_json: bool = False
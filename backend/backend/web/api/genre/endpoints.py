@@ -1,26 +1,36 @@
+from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from tortoise.exceptions import IntegrityError
 
-from backend.custom_types import GenreOrderColumns
-from backend.db import models
-from backend.db.dao import GenreDAO
+from backend.custom_types import ExportFormat, GenreOrderColumns
+from backend.db.dao import GenreDAO, Principal
+from backend.db.dependencies.include_validation import IncludeValidation
 from backend.db.dependencies.order_validation import OrderValidation
+from backend.db.dependencies.pagination import get_page
 from backend.db.dependencies.user import get_current_superuser
 from backend.db.models.genre import Genre
 from backend.exceptions import ObjectNotFoundException
+from backend.services.exporter import get_export_response
 from backend.web.api.genre import schema
 from backend.web.api.genre.schema.genre import Genre as GenreSchema
+from backend.web.responses import ORJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ORJSONRoute)
 
 
-@router.get("/", response_model=list[GenreSchema])
+@router.get(
+    "/",
+    response_model=list[GenreSchema],
+    response_model_exclude_unset=True,
+)
 async def get_multi(
     response: Response,
     queries: schema.GenreQueries = Depends(),
     sort: list[str] = Depends(OrderValidation(GenreOrderColumns)),
+    include: Optional[list[str]] = Depends(IncludeValidation(GenreSchema)),
     genre_dao: GenreDAO = Depends(),
 ) -> list[Genre]:
     """Get list of genres.
@@ -29,6 +39,7 @@ async def get_multi(
         response (Response): Response.
         queries (GenreQueries, optional): Query parameters.
         sort (list[str], optional): Order parameters.
+        include (Optional[list[str]]): Relations to include.
         genre_dao (GenreDAO, optional): Genre DAO.
 
     Returns:
@@ -36,9 +47,9 @@ async def get_multi(
     """
 
     filters_dict = {
-        "title": ("title__icontains", queries.title),
+        "title": ("title__trigram_icontains", queries.title),
         "created_by_user": (
-            "created_by_user__username__icontains",
+            "created_by_user__username__trigram_icontains",
             queries.created_by_user,
         ),
     }
@@ -47,31 +58,49 @@ async def get_multi(
         filters_dict[key][0]: filters_dict[key][1] for key in filters.keys()
     }
 
-    amount = await genre_dao.get_count(expr=filters_list)
-    genres = await genre_dao.get_multi(
-        expr=filters_list,
-        offset=queries.skip,
-        limit=queries.limit,
-        sort=sort,
-    )
+    return await get_page(response, genre_dao, queries, sort, include, filters_list)
 
-    response.headers["X-Total-Count"] = str(amount)
-    return genres
+
+@router.get("/export", response_class=StreamingResponse)
+async def export(
+    file_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    genre_dao: GenreDAO = Depends(),
+) -> StreamingResponse:
+    """Export all genres, streaming them as NDJSON or CSV.
+
+    Args:
+        file_format (ExportFormat, optional): Format of the export.
+        genre_dao (GenreDAO, optional): Genre DAO.
+
+    Returns:
+        StreamingResponse: Genres ordered by id.
+    """
+
+    return get_export_response(genre_dao, file_format, "genres")
 
 
-@router.get("/{genre_id}", response_model=GenreSchema)
-async def get(genre_id: UUID, genre_dao: GenreDAO = Depends()) -> Genre:
+@router.get(
+    "/{genre_id}",
+    response_model=GenreSchema,
+    response_model_exclude_unset=True,
+)
+async def get(
+    genre_id: UUID,
+    include: Optional[list[str]] = Depends(IncludeValidation(GenreSchema)),
+    genre_dao: GenreDAO = Depends(),
+) -> Genre:
     """Get genre by id.
 
     Args:
         genre_id (UUID): Genre id.
+        include (Optional[list[str]]): Relations to include.
         genre_dao (GenreDAO, optional): Genre DAO.
 
     Returns:
         Genre: Genre.
     """
 
-    genre = await genre_dao.get(str(genre_id))
+    genre = await genre_dao.get(str(genre_id), include)
     if not genre:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -84,14 +113,14 @@ async def get(genre_id: UUID, genre_dao: GenreDAO = Depends()) -> Genre:
 async def create(
     genre: schema.GenreCreate,
     genre_dao: GenreDAO = Depends(),
-    current_superuser: models.User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
 ) -> Genre:
     """Create genre.
 
     Args:
         genre (GenreCreate): Genre data.
         genre_dao (GenreDAO, optional): Genre DAO.
-        current_superuser (models.User, optional): Current superuser.
+        current_superuser (Principal, optional): Current superuser.
 
     Returns:
         Genre: Genre.
@@ -113,7 +142,7 @@ async def update(
     genre_id: UUID,
     genre: schema.GenreUpdate,
     genre_dao: GenreDAO = Depends(),
-    current_superuser: models.User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
 ) -> Genre:
     """Update genre.
 
@@ -121,7 +150,7 @@ async def update(
         genre_id (UUID): Genre id.
         genre (GenreUpdate): Genre data.
         genre_dao (GenreDAO, optional): Genre DAO.
-        current_superuser (models.User, optional): Current superuser.
+        current_superuser (Principal, optional): Current superuser.
 
     Returns:
         Genre: Genre.
@@ -147,14 +176,14 @@ async def update(
 async def delete_multi(
     genre_ids: list[UUID],
     genre_dao: GenreDAO = Depends(),
-    current_superuser: models.User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
 ) -> None:
     """Delete multiple genres.
 
     Args:
         genre_ids (list[UUID]): Genre ids.
         genre_dao (GenreDAO, optional): Genre DAO.
-        current_superuser (models.User, optional): Current superuser.
+        current_superuser (Principal, optional): Current superuser.
 
     Returns:
         None: None.
@@ -173,14 +202,14 @@ async def delete_multi(
 async def delete(
     genre_id: UUID,
     genre_dao: GenreDAO = Depends(),
-    current_superuser: models.User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
 ) -> None:
     """Delete genre.
 
     Args:
         genre_id (UUID): Genre id.
         genre_dao (GenreDAO, optional): Genre DAO.
-        current_superuser (models.User, optional): Current superuser.
+        current_superuser (Principal, optional): Current superuser.
 
     Returns:
         None: None.
@@ -1,6 +1,9 @@
 from fastapi import APIRouter
 
-router = APIRouter()
+from backend.metrics import get_metrics
+from backend.web.responses import ORJSONRoute
+
+router = APIRouter(route_class=ORJSONRoute)
 
 
 @router.get("/")
@@ -10,3 +13,13 @@ def health_check() -> None:
 
     It returns 200 if the project is healthy.
     """
+
+
+@router.get("/metrics")
+def metrics() -> dict[str, dict[str, float]]:
+    """
+    Returns in-process metrics of the worker serving the request.
+
+    :return: metric names and values.
+    """
+    return get_metrics()
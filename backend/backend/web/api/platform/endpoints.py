@@ -1,26 +1,37 @@
+from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from tortoise.exceptions import IntegrityError
 
-from backend.custom_types import PlatformOrderColumns
-from backend.db import models
+from backend.custom_types import ExportFormat, PlatformOrderColumns
+from backend.db.dao import Principal
 from backend.db.dao.platform import PlatformDAO
+from backend.db.dependencies.include_validation import IncludeValidation
 from backend.db.dependencies.order_validation import OrderValidation
+from backend.db.dependencies.pagination import get_page
 from backend.db.dependencies.user import get_current_superuser
 from backend.db.models.platform import Platform
 from backend.exceptions import ObjectNotFoundException
+from backend.services.exporter import get_export_response
 from backend.web.api.platform import schema
 from backend.web.api.platform.schema.platform import Platform as PlatformSchema
+from backend.web.responses import ORJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ORJSONRoute)
 
 
-@router.get("/", response_model=list[PlatformSchema])
+@router.get(
+    "/",
+    response_model=list[PlatformSchema],
+    response_model_exclude_unset=True,
+)
 async def get_multi(
     response: Response,
     queries: schema.PlatformQueries = Depends(),
     sort: list[str] = Depends(OrderValidation(PlatformOrderColumns)),
+    include: Optional[list[str]] = Depends(IncludeValidation(PlatformSchema)),
     platform_dao: PlatformDAO = Depends(),
 ) -> list[Platform]:
     """Get list of platforms.
@@ -29,6 +40,7 @@ async def get_multi(
         response (Response): Response.
         queries (schema.PlatformQueries): Query parameters.
         sort (list[str], optional): Order parameters.
+        include (Optional[list[str]]): Relations to include.
         platform_dao (PlatformDAO): Platform DAO.
 
     Returns:
@@ -36,9 +48,9 @@ async def get_multi(
     """
 
     filters_dict = {
-        "title": ("title__icontains", queries.title),
+        "title": ("title__trigram_icontains", queries.title),
         "created_by_user": (
-            "created_by_user__username__icontains",
+            "created_by_user__username__trigram_icontains",
             queries.created_by_user,
         ),
     }
@@ -47,31 +59,56 @@ async def get_multi(
         filters_dict[key][0]: filters_dict[key][1] for key in filters.keys()
     }
 
-    amount = await platform_dao.get_count(expr=filters_list)
-    platforms = await platform_dao.get_multi(
-        expr=filters_list,
-        offset=queries.skip,
-        limit=queries.limit,
-        sort=sort,
+    return await get_page(
+        response,
+        platform_dao,
+        queries,
+        sort,
+        include,
+        filters_list,
     )
 
-    response.headers["X-Total-Count"] = str(amount)
-    return platforms
 
+@router.get("/export", response_class=StreamingResponse)
+async def export(
+    file_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    platform_dao: PlatformDAO = Depends(),
+) -> StreamingResponse:
+    """Export all platforms, streaming them as NDJSON or CSV.
+
+    Args:
+        file_format (ExportFormat, optional): Format of the export.
+        platform_dao (PlatformDAO, optional): Platform DAO.
+
+    Returns:
+        StreamingResponse: Platforms ordered by id.
+    """
 
-@router.get("/{platform_id}", response_model=PlatformSchema)
-async def get(platform_id: UUID, platform_dao: PlatformDAO = Depends()) -> Platform:
+    return get_export_response(platform_dao, file_format, "platforms")
+
+
+@router.get(
+    "/{platform_id}",
+    response_model=PlatformSchema,
+    response_model_exclude_unset=True,
+)
+async def get(
+    platform_id: UUID,
+    include: Optional[list[str]] = Depends(IncludeValidation(PlatformSchema)),
+    platform_dao: PlatformDAO = Depends(),
+) -> Platform:
     """Get platform by ID.
 
     Args:
         platform_id (UUID): Platform ID.
+        include (Optional[list[str]]): Relations to include.
         platform_dao (PlatformDAO): Platform DAO.
 
     Returns:
         Platform: Platform.
     """
 
-    platform = await platform_dao.get(str(platform_id))
+    platform = await platform_dao.get(str(platform_id), include)
     if not platform:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -84,14 +121,14 @@ async def get(platform_id: UUID, platform_dao: PlatformDAO = Depends()) -> Platf
 async def create(
     platform: schema.PlatformCreate,
     platform_dao: PlatformDAO = Depends(),
-    current_superuser: models.User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
 ) -> Platform:
     """Create platform.
 
     Args:
         platform (schema.PlatformCreate): Platform data.
         platform_dao (PlatformDAO): Platform DAO.
-        current_superuser (models.User): Current superuser.
+        current_superuser (Principal): Current superuser.
 
     Returns:
         Platform: Platform.
@@ -116,7 +153,7 @@ async def update(
     platform_id: UUID,
     platform: schema.PlatformUpdate,
     platform_dao: PlatformDAO = Depends(),
-    current_superuser: models.User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
 ) -> Platform:
     """Update platform.
 
@@ -124,7 +161,7 @@ async def update(
         platform_id (UUID): Platform id.
         platform (CompanyUpdate): Platform data.
         platform_dao (CompanyDAO, optional): Platform DAO.
-        current_superuser (User, optional): Current superuser.
+        current_superuser (Principal, optional): Current superuser.
 
     Returns:
         Platform: Platform.
@@ -153,14 +190,14 @@ async def update(
 async def delete_multi(
     platform_ids: list[UUID],
     platform_dao: PlatformDAO = Depends(),
-    current_superuser: models.User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
 ) -> None:
     """Delete platforms.
 
     Args:
         platform_ids (list[UUID]): Platform ids.
         platform_dao (CompanyDAO, optional): Platform DAO.
-        current_superuser (User, optional): Current superuser.
+        current_superuser (Principal, optional): Current superuser.
 
     Returns:
         None: None.
@@ -181,14 +218,14 @@ async def delete_multi(
 async def delete(
     platform_id: UUID,
     platform_dao: PlatformDAO = Depends(),
-    current_superuser: models.User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
 ) -> None:
     """Delete platform.
 
     Args:
         platform_id (UUID): Platform id.
         platform_dao (CompanyDAO, optional): Platform DAO.
-        current_superuser (User, optional): Current superuser.
+        current_superuser (Principal, optional): Current superuser.
 
     Returns:
         None: None.
@@ -2,6 +2,7 @@ from typing import Optional
 
 from pydantic import validator
 
+from backend.custom_types import PrefetchedGetterDict
 from backend.web.api.game.schema import GameInDB
 from backend.web.api.platform.schema import PlatformInDB
 from backend.web.api.sale.schema.sale import Sale
@@ -13,6 +14,9 @@ class Platform(PlatformInDB):
     games: list[GameInDB] = []
     sales: list[Sale] = []
 
+    class Config:
+        getter_dict = PrefetchedGetterDict
+
     @validator("games", "sales", pre=True)
     def convert_to_list(cls, v) -> list:
         return list(v)
@@ -8,6 +8,7 @@ from backend.web.api.genre.endpoints import router as genre_router
 from backend.web.api.monitoring.endpoints import router as monitoring_router
 from backend.web.api.platform.endpoints import router as platform_router
 from backend.web.api.sale.endpoints import router as sale_router
+from backend.web.api.search.endpoints import router as search_router
 from backend.web.api.user.endpoints import router as user_router
 
 api_router = APIRouter()
@@ -20,3 +21,4 @@ api_router.include_router(platform_router, prefix="/platforms", tags=["platforms
 api_router.include_router(genre_router, prefix="/genres", tags=["genres"])
 api_router.include_router(game_router, prefix="/games", tags=["games"])
 api_router.include_router(sale_router, prefix="/sales", tags=["sales"])
+api_router.include_router(search_router, prefix="/search", tags=["search"])
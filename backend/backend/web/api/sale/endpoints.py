@@ -1,26 +1,45 @@
+from typing import Any, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from tortoise.exceptions import IntegrityError
 
-from backend.custom_types import SaleOrderColumns
-from backend.db import models
+from backend.custom_types import (
+    BulkResult,
+    BulkRowError,
+    ExportFormat,
+    SaleOrderColumns,
+)
+from backend.db.dao import Principal
 from backend.db.dao.sale import SaleDAO
+from backend.db.dependencies.bulk_body import BulkBody, get_bulk_result
+from backend.db.dependencies.include_validation import IncludeValidation
 from backend.db.dependencies.order_validation import OrderValidation
+from backend.db.dependencies.pagination import get_page
+from backend.db.dependencies.statement_timeout import StatementTimeout
 from backend.db.dependencies.user import get_current_superuser
 from backend.db.models.sale import Sale
 from backend.exceptions import ObjectNotFoundException
+from backend.services.exporter import get_export_response
+from backend.settings import settings
 from backend.web.api.sale import schema
 from backend.web.api.sale.schema.sale import Sale as SaleSchema
+from backend.web.responses import ORJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ORJSONRoute)
 
 
-@router.get("/", response_model=list[SaleSchema])
+@router.get(
+    "/",
+    response_model=list[SaleSchema],
+    response_model_exclude_unset=True,
+)
 async def get_multi(
     response: Response,
     queries: schema.SaleQueries = Depends(),
     sort: list[str] = Depends(OrderValidation(SaleOrderColumns)),
+    include: Optional[list[str]] = Depends(IncludeValidation(SaleSchema)),
     sale_dao: SaleDAO = Depends(),
 ) -> list[Sale]:
     """Get list of sales.
@@ -29,6 +48,7 @@ async def get_multi(
         response (Response): Response.
         queries (SaleQueries, optional): Sale queries.
         sort (list[str], optional): Order parameters.
+        include (Optional[list[str]]): Relations to include.
         sale_dao (SaleDAO, optional): Sale DAO.
 
     Returns:
@@ -36,10 +56,10 @@ async def get_multi(
     """
 
     filters_dict = {
-        "game": ("game__title__icontains", queries.game),
-        "platform": ("platform__title__icontains", queries.platform),
+        "game": ("game__title__trigram_icontains", queries.game),
+        "platform": ("platform__title__trigram_icontains", queries.platform),
         "created_by_user": (
-            "created_by_user__username__icontains",
+            "created_by_user__username__trigram_icontains",
             queries.created_by_user,
         ),
     }
@@ -48,23 +68,35 @@ async def get_multi(
         filters_dict[key][0]: filters_dict[key][1] for key in filters.keys()
     }
 
-    amount = await sale_dao.get_count(expr=filters_list)
-    sales = await sale_dao.get_multi(
-        expr=filters_list,
-        offset=queries.skip,
-        limit=queries.limit,
-        sort=sort,
-    )
+    return await get_page(response, sale_dao, queries, sort, include, filters_list)
 
-    response.headers["X-Total-Count"] = str(amount)
-    return sales
+
+@router.get("/export", response_class=StreamingResponse)
+async def export(
+    file_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    sale_dao: SaleDAO = Depends(),
+) -> StreamingResponse:
+    """Export all sales, streaming them as NDJSON or CSV.
+
+    Args:
+        file_format (ExportFormat, optional): Format of the export.
+        sale_dao (SaleDAO, optional): Sale DAO.
+
+    Returns:
+        StreamingResponse: Sales ordered by id.
+    """
+
+    return get_export_response(sale_dao, file_format, "sales")
 
 
 @router.get(
     "/popularity-statistics",
     response_model=list[schema.SalePopularityStatistics],
+    dependencies=[Depends(StatementTimeout(settings.statistics_statement_timeout))],
 )
-async def get_popularity_statistics(sale_dao: SaleDAO = Depends()) -> list[dict]:
+async def get_popularity_statistics(
+    sale_dao: SaleDAO = Depends(),
+) -> list[dict[str, Any]]:
     """Statistics for game-platform sale popularity.
 
     Args:
@@ -77,19 +109,28 @@ async def get_popularity_statistics(sale_dao: SaleDAO = Depends()) -> list[dict]
     return await sale_dao.get_popularity_statistics()
 
 
-@router.get("/{sale_id}", response_model=SaleSchema)
-async def get(sale_id: UUID, sale_dao: SaleDAO = Depends()) -> Sale:
+@router.get(
+    "/{sale_id}",
+    response_model=SaleSchema,
+    response_model_exclude_unset=True,
+)
+async def get(
+    sale_id: UUID,
+    include: Optional[list[str]] = Depends(IncludeValidation(SaleSchema)),
+    sale_dao: SaleDAO = Depends(),
+) -> Sale:
     """Get sale by id.
 
     Args:
         sale_id (UUID): Sale ID.
+        include (Optional[list[str]]): Relations to include.
         sale_dao (SaleDAO): SaleDAO
 
     Returns:
         Sale: Sale
     """
 
-    sale = await sale_dao.get(str(sale_id))
+    sale = await sale_dao.get(str(sale_id), include)
     if not sale:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -102,14 +143,14 @@ async def get(sale_id: UUID, sale_dao: SaleDAO = Depends()) -> Sale:
 async def create(
     sale: schema.SaleCreate,
     sale_dao: SaleDAO = Depends(),
-    current_superuser: models.User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
 ) -> Sale:
     """Create a new sale
 
     Args:
         sale (SaleCreate): Sale data.
         sale_dao (SaleDAO): Sale DAO.
-        current_superuser (User): Current superuser.
+        current_superuser (Principal): Current superuser.
 
     Returns:
         Sale: A new sale.
@@ -131,12 +172,52 @@ async def create(
         raise error
 
 
+@router.post("/bulk", response_model=BulkResult)
+async def bulk_create(
+    # Resolved first, so bodies of other users aren't read
+    current_superuser: Principal = Depends(get_current_superuser),
+    sales: list[schema.SaleCreate | BulkRowError] = Depends(
+        BulkBody(schema.SaleCreate),
+    ),
+    sale_dao: SaleDAO = Depends(),
+) -> BulkResult:
+    """Create sales or update existing ones in a single transaction.
+
+    The body is a JSON array or NDJSON of sales. Sales of existing pairs of
+    game and platform have their amounts updated. Invalid rows are reported
+    without aborting the rest.
+
+    Args:
+        current_superuser (Principal): Current superuser.
+        sales (list[SaleCreate | BulkRowError]): Rows of the body.
+        sale_dao (SaleDAO): Sale DAO.
+
+    Returns:
+        BulkResult: Amounts of created and updated sales, ids and errors.
+    """
+
+    valid = [
+        (index, sale.dict(exclude_unset=True))
+        for index, sale in enumerate(sales)
+        if not isinstance(sale, BulkRowError)
+    ]
+    try:
+        outcomes = await sale_dao.upsert_many(valid, str(current_superuser.id))
+    except IntegrityError as error:
+        # Referenced objects were deleted concurrently
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(error),
+        ) from error
+    return get_bulk_result(sales, outcomes)
+
+
 @router.patch("/{sale_id}", response_model=SaleSchema)
 async def update(
     sale_id: UUID,
     sale: schema.SaleUpdate,
     sale_dao: SaleDAO = Depends(),
-    current_superuser: models.User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
 ) -> Sale:
     """Update sale.
 
@@ -144,7 +225,7 @@ async def update(
         sale_id (UUID): Sale id.
         sale (SaleUpdate): Sale data.
         sale_dao (SaleDAO, optional): Sale DAO.
-        current_superuser (User, optional): Current superuser.
+        current_superuser (Principal, optional): Current superuser.
 
     Returns:
         Sale: Sale.
@@ -178,14 +259,14 @@ async def update(
 async def delete_multi(
     sale_ids: list[UUID],
     sale_dao: SaleDAO = Depends(),
-    current_superuser: models.User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
 ) -> None:
     """Delete multiple companies.
 
     Args:
         sale_ids (list[UUID]): Sale ids.
         sale_dao (SaleDAO, optional): Sale DAO.
-        current_superuser (User, optional): Current superuser.
+        current_superuser (Principal, optional): Current superuser.
 
     Returns:
         None: None.
@@ -204,14 +285,14 @@ async def delete_multi(
 async def delete(
     sale_id: UUID,
     sale_dao: SaleDAO = Depends(),
-    current_superuser: models.User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
 ) -> None:
     """Delete company.
 
     Args:
         sale_id (UUID): Sale id.
         sale_dao (CompanyDAO, optional): Sale DAO.
-        current_superuser (User, optional): Current superuser.
+        current_superuser (Principal, optional): Current superuser.
 
     Returns:
         None: None.
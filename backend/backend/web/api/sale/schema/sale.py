@@ -1,5 +1,6 @@
 from typing import Optional
 
+from backend.custom_types import PrefetchedGetterDict
 from backend.web.api.game.schema import GameInDB
 from backend.web.api.platform.schema import PlatformInDB
 from backend.web.api.sale.schema import SaleInDB
@@ -7,6 +8,9 @@ from backend.web.api.user.schema import UserInDB
 
 
 class Sale(SaleInDB):
-    game: GameInDB
-    platform: PlatformInDB
+    game: Optional[GameInDB] = None
+    platform: Optional[PlatformInDB] = None
     created_by_user: Optional[UserInDB] = None
+
+    class Config:
+        getter_dict = PrefetchedGetterDict
@@ -0,0 +1,30 @@
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, Query
+
+from backend.custom_types import SearchKind
+from backend.db.dao import SearchDAO
+from backend.web.api.search import schema
+from backend.web.responses import ORJSONRoute
+
+router = APIRouter(route_class=ORJSONRoute)
+
+
+@router.get("/", response_model=list[schema.SearchResult])
+async def search(
+    queries: schema.SearchQueries = Depends(),
+    kind: Optional[list[SearchKind]] = Query(None),
+    search_dao: SearchDAO = Depends(),
+) -> list[dict[str, Any]]:
+    """Search games, companies, genres and platforms by title.
+
+    Args:
+        queries (SearchQueries, optional): Query parameters.
+        kind (Optional[list[SearchKind]]): Kinds to search. All if None.
+        search_dao (SearchDAO, optional): Search DAO.
+
+    Returns:
+        list[dict[str, Any]]: Results ordered by relevance.
+    """
+
+    return await search_dao.search(queries.q, kind, queries.limit)
@@ -0,0 +1,7 @@
+from backend.web.api.search.schema.search_queries import SearchQueries
+from backend.web.api.search.schema.search_result import SearchResult
+
+__all__ = [
+    "SearchQueries",
+    "SearchResult",
+]
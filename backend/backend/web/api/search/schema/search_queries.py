@@ -0,0 +1,7 @@
+from fastapi import Query
+from pydantic import BaseModel
+
+
+class SearchQueries(BaseModel):
+    q: str = Query(..., min_length=1, max_length=512)
+    limit: int = Query(20, ge=1, le=100)
@@ -0,0 +1,12 @@
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from backend.custom_types import SearchKind
+
+
+class SearchResult(BaseModel):
+    kind: SearchKind
+    id: UUID
+    title: str
+    rank: float
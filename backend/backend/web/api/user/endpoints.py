@@ -1,33 +1,47 @@
+from typing import Any, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from tortoise.exceptions import IntegrityError
 
-from backend.custom_types import UserOrderColumns
-from backend.db.dao import UserDAO
+from backend.custom_types import ExportFormat, UserOrderColumns
+from backend.db.dao import Principal, UserDAO
+from backend.db.dependencies.include_validation import IncludeValidation
 from backend.db.dependencies.order_validation import OrderValidation
+from backend.db.dependencies.pagination import get_json_page, get_page
+from backend.db.dependencies.statement_timeout import StatementTimeout
 from backend.db.dependencies.user import get_current_superuser, get_current_user
 from backend.db.models.user import User
 from backend.exceptions import ObjectNotFoundException
+from backend.services.exporter import get_export_response
+from backend.settings import settings
 from backend.web.api.user import schema
 from backend.web.api.user.schema.user import User as UserSchema
+from backend.web.responses import ORJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ORJSONRoute)
 
 
-@router.get("/", response_model=list[UserSchema])
+@router.get(
+    "/",
+    response_model=list[UserSchema],
+    response_model_exclude_unset=True,
+)
 async def get_multi(
     response: Response,
     queries: schema.UserQueries = Depends(),
     sort: list[str] = Depends(OrderValidation(UserOrderColumns)),
+    include: Optional[list[str]] = Depends(IncludeValidation(UserSchema)),
     user_dao: UserDAO = Depends(),
-) -> list[User]:
+) -> list[User] | Response:
     """Get list of users.
 
     Args:
         response (Response): Response.
         queries (UserQueries, optional): User queries.
         sort (list[str], optional): Order parameters.
+        include (Optional[list[str]]): Relations to include.
         user_dao (UserDAO, optional): User DAO.
 
     Returns:
@@ -35,8 +49,8 @@ async def get_multi(
     """
 
     filters_dict = {
-        "username": ("username__icontains", queries.username),
-        "email": ("email__icontains", queries.email),
+        "username": ("username__trigram_icontains", queries.username),
+        "email": ("email__trigram_icontains", queries.email),
         "is_superuser": ("is_superuser", queries.is_superuser),
         "is_primary": ("is_primary", queries.is_primary),
     }
@@ -45,29 +59,51 @@ async def get_multi(
         filters_dict[key][0]: filters_dict[key][1] for key in filters.keys()
     }
 
-    amount = await user_dao.get_count(expr=filters_list)
-    users = await user_dao.get_multi(
-        expr=filters_list,
-        offset=queries.skip,
-        limit=queries.limit,
-        sort=sort,
-    )
+    if queries.as_json:
+        return await get_json_page(
+            response,
+            user_dao,
+            queries,
+            sort,
+            include,
+            filters_list,
+        )
+    return await get_page(response, user_dao, queries, sort, include, filters_list)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export(
+    file_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    user_dao: UserDAO = Depends(),
+) -> StreamingResponse:
+    """Export all users, streaming them as NDJSON or CSV.
+
+    Args:
+        file_format (ExportFormat, optional): Format of the export.
+        user_dao (UserDAO, optional): User DAO.
+
+    Returns:
+        StreamingResponse: Users ordered by id.
+    """
 
-    response.headers["X-Total-Count"] = str(amount)
-    return users
+    return get_export_response(user_dao, file_format, "users")
 
 
-@router.get("/creation-statistics", response_model=list[schema.UserCreationStatistics])
+@router.get(
+    "/creation-statistics",
+    response_model=list[schema.UserCreationStatistics],
+    dependencies=[Depends(StatementTimeout(settings.statistics_statement_timeout))],
+)
 async def get_creation_statistics(
     days: int,
-    current_superuser: User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
     user_dao: UserDAO = Depends(),
-) -> list[dict]:
+) -> list[dict[str, Any]]:
     """Statistics for user creation in last N days.
 
     Args:
         days (int): Amount of days.
-        current_superuser (User, optional): Current superuser.
+        current_superuser (Principal, optional): Current superuser.
         user_dao (UserDAO, optional): User DAO.
 
     Returns:
@@ -77,15 +113,19 @@ async def get_creation_statistics(
     return await user_dao.get_user_creation_statistics(days)
 
 
-@router.get("/role-statistics", response_model=list[schema.UserRoleStatistics])
+@router.get(
+    "/role-statistics",
+    response_model=list[schema.UserRoleStatistics],
+    dependencies=[Depends(StatementTimeout(settings.statistics_statement_timeout))],
+)
 async def get_role_statistics(
-    current_superuser: User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
     user_dao: UserDAO = Depends(),
-) -> list[dict]:
+) -> list[dict[str, Any]]:
     """Statistics for user roles.
 
     Args:
-        current_superuser (User, optional): Current superuser.
+        current_superuser (Principal, optional): Current superuser.
         user_dao (UserDAO, optional): User DAO.
 
     Returns:
@@ -96,38 +136,68 @@ async def get_role_statistics(
 
 
 @router.get("/me", response_model=UserSchema)
-async def get_me(current_user: User = Depends(get_current_user)) -> User:
+async def get_me(
+    current_user: Principal = Depends(get_current_user),
+    user_dao: UserDAO = Depends(),
+) -> User:
     """Get current user.
 
     Args:
-        current_user (User, optional): Current user.
+        current_user (Principal, optional): Current user.
+        user_dao (UserDAO, optional): User DAO.
+
+    Raises:
+        HTTPException: User was deleted after the principal was cached.
 
     Returns:
         User: Current user.
     """
 
-    return current_user
+    db_user = await user_dao.get(str(current_user.id))
+    if db_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
+    return db_user
 
 
-@router.get("/{user_id}", response_model=UserSchema)
-async def get(user_id: UUID, user_dao: UserDAO = Depends()) -> User:
+@router.get(
+    "/{user_id}",
+    response_model=UserSchema,
+    response_model_exclude_unset=True,
+)
+async def get(
+    user_id: UUID,
+    include: Optional[list[str]] = Depends(IncludeValidation(UserSchema)),
+    as_json: bool = False,
+    user_dao: UserDAO = Depends(),
+) -> User | Response:
     """Get user by id.
 
     Args:
         user_id (UUID): User ID.
+        include (Optional[list[str]]): Relations to include.
+        as_json (bool): Whether to get user serialized by the database.
         user_dao (UserDAO, optional): User DAO.
 
     Returns:
         User: User.
     """
 
-    user = await user_dao.get(str(user_id))
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
-    return user
+    if as_json:
+        document = await user_dao.get_json(str(user_id), include)
+        if document is not None:
+            return Response(content=document, media_type="application/json")
+    else:
+        user = await user_dao.get(str(user_id), include)
+        if user is not None:
+            return user
+
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="User not found",
+    )
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=UserSchema)
@@ -161,7 +231,7 @@ async def update(
     user_id: UUID,
     user: schema.UserUpdate,
     user_dao: UserDAO = Depends(),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> User:
     """Update user.
 
@@ -169,7 +239,7 @@ async def update(
         user_id (UUID): User ID.
         user (UserSchemaUpdate): User data.
         user_dao (UserDAO, optional): User DAO.
-        current_user (User, optional): Current user.
+        current_user (Principal, optional): Current user.
 
     Raises:
         HTTPException: You are not allowed to update this user.
@@ -206,14 +276,14 @@ async def update(
 async def delete_multi(
     user_ids: list[UUID],
     user_dao: UserDAO = Depends(),
-    current_user: User = Depends(get_current_superuser),
+    current_user: Principal = Depends(get_current_superuser),
 ) -> None:
     """Delete users.
 
     Args:
         user_ids (list[UUID]): User IDs.
         user_dao (UserDAO, optional): User DAO.
-        current_user (User, optional): Current user.
+        current_user (Principal, optional): Current user.
 
     Raises:
         HTTPException: You are not allowed to delete users.
@@ -229,14 +299,14 @@ async def delete_multi(
 async def delete(
     user_id: UUID,
     user_dao: UserDAO = Depends(),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> None:
     """Delete user.
 
     Args:
         user_id (UUID): User ID.
         user_dao (UserDAO, optional): User DAO.
-        current_user (User, optional): Current user.
+        current_user (Principal, optional): Current user.
 
     Raises:
         HTTPException: You are not allowed to delete this user.
@@ -1,5 +1,6 @@
 from pydantic import validator
 
+from backend.custom_types import PrefetchedGetterDict
 from backend.web.api.backup.schema import BackupInDB
 from backend.web.api.company.schema import CompanyInDB
 from backend.web.api.game.schema import GameInDB
@@ -17,6 +18,9 @@ class User(UserInDB):
     created_sales: list[Sale] = []
     created_backups: list[BackupInDB] = []
 
+    class Config:
+        getter_dict = PrefetchedGetterDict
+
     @validator(
         "created_backups",
         "created_companies",
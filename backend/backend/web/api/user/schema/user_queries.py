@@ -10,3 +10,4 @@ class UserQueries(CommonQueries):
     email: Optional[str] = Query(None, regex=r"^[\w\.\-@]+$")
     is_superuser: Optional[bool] = None
     is_primary: Optional[bool] = None
+    as_json: bool = False
@@ -1,20 +1,53 @@
 from importlib import metadata
 
-from fastapi import FastAPI
+from asyncpg.exceptions import QueryCanceledError
+from fastapi import Depends, FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import UJSONResponse
 from fastapi.routing import APIRoute
 from tortoise.contrib.fastapi import register_tortoise
 
 from backend.db.config import TORTOISE_CONFIG
+from backend.db.dao import CompanyDAO, GameDAO, GenreDAO, PlatformDAO
+from backend.db.loader import use_request_loader
+from backend.exceptions import HashingPoolSaturatedException
 from backend.web.api.router import api_router
 from backend.web.lifetime import shutdown, startup
+from backend.web.middleware import (
+    CompressionMiddleware,
+    PrimaryReadsMiddleware,
+    ResponseCacheMiddleware,
+)
+from backend.web.responses import ORJSONResponse
 
 
 def custom_generate_unique_id(route: APIRoute):
     return f"{route.tags[0]}-{route.name}"
 
 
+async def query_canceled_handler(
+    request: Request,
+    exc: QueryCanceledError,
+) -> ORJSONResponse:
+    """Reports statements cancelled by the statement timeout."""
+
+    return ORJSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Query took too long"},
+    )
+
+
+async def hashing_pool_saturated_handler(
+    request: Request,
+    exc: HashingPoolSaturatedException,
+) -> ORJSONResponse:
+    """Reports passwords which can't be hashed until the pool frees up."""
+
+    return ORJSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": "Too many requests, try again later"},
+    )
+
+
 app = FastAPI(
     title="backend",
     description="Backend API for gamewiki",
@@ -22,24 +55,43 @@ app = FastAPI(
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     openapi_url="/api/openapi.json",
-    default_response_class=UJSONResponse,
+    default_response_class=ORJSONResponse,
     generate_unique_id_function=custom_generate_unique_id,
+    dependencies=[Depends(use_request_loader)],
 )
 
-app.on_event("startup")(startup(app))
 app.on_event("shutdown")(shutdown(app))
+app.add_exception_handler(QueryCanceledError, query_canceled_handler)
+app.add_exception_handler(
+    HashingPoolSaturatedException,
+    hashing_pool_saturated_handler,
+)
 
 app.include_router(router=api_router, prefix="/api")
+app.add_middleware(PrimaryReadsMiddleware)
+app.add_middleware(
+    ResponseCacheMiddleware,
+    daos={
+        "/api/games": GameDAO(),
+        "/api/companies": CompanyDAO(),
+        "/api/genres": GenreDAO(),
+        "/api/platforms": PlatformDAO(),
+    },
+)
+# Added after the response cache, so cached bodies are kept uncompressed
+app.add_middleware(CompressionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://127.0.0.1:3000"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["X-Total-Count"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor", "ETag"],
 )
 register_tortoise(
     app,
     config=TORTOISE_CONFIG,
     add_exception_handlers=True,
 )
+# Runs after tortoise is initialized by the startup handler registered above
+app.on_event("startup")(startup(app))
@@ -1,7 +1,57 @@
-from typing import Awaitable, Callable
+from typing import Any, Awaitable, Callable
 
 from fastapi import FastAPI
 
+from backend.db.dao import CompanyDAO, GameDAO, GenreDAO, PlatformDAO, UserDAO
+from backend.db.dao.backup import BackupDAO
+from backend.db.dao.base import BaseDAO
+from backend.db.dao.sale import SaleDAO
+from backend.db.loader import get_path_tree
+from backend.services.jobs import fail_stale_jobs
+
+
+def check_columns(dao: BaseDAO[Any]) -> None:
+    """
+    Check columns and relations the DAO exports and serializes exist.
+
+    :param dao: DAO to check.
+    :raises ValueError: if some column or relation doesn't exist.
+    """
+    meta = dao.model._meta
+    columns = set(dao.export_columns)
+    relations: set[str] = set()
+    if dao.document is not None:
+        columns.update(dao.document.columns)
+        relations.update(dao.document.relations("obj"))
+
+    missing = columns - set(meta.fields_db_projection.values())
+    missing |= relations - set(meta.fields_map)
+    if missing:
+        raise ValueError(f"{dao.name} has no {', '.join(sorted(missing))}")
+
+
+def check_daos() -> None:
+    """
+    Check relations the DAOs load are handled by the loader.
+
+    Columns the DAOs export and serialize to JSON documents must exist.
+    Models must be initialized, so their reverse relations are known.
+
+    :raises ValueError: if some relation isn't handled.
+    """
+    daos: tuple[BaseDAO[Any], ...] = (
+        UserDAO(),
+        CompanyDAO(),
+        PlatformDAO(),
+        GenreDAO(),
+        GameDAO(),
+        SaleDAO(),
+        BackupDAO(),
+    )
+    for dao in daos:
+        get_path_tree(dao.model, dao.related)
+        check_columns(dao)
+
 
 def startup(app: FastAPI) -> Callable[[], Awaitable[None]]:
     """
@@ -15,7 +65,8 @@ def startup(app: FastAPI) -> Callable[[], Awaitable[None]]:
     """
 
     async def _startup() -> None:  # noqa: WPS430
-        pass  # noqa: WPS420
+        check_daos()
+        await fail_stale_jobs()
 
     return _startup
 
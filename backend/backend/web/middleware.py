@@ -0,0 +1,409 @@
+import gzip
+import hashlib
+from typing import Any, Optional, Sequence
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.cache import CachedResponse, ResponseCache, get_response_cache
+from backend.db.dao.base import BaseDAO
+from backend.db.routing import primary_reads
+from backend.metrics import get_summary
+from backend.settings import settings
+
+try:
+    import brotli  # noqa: WPS433
+except ImportError:
+    brotli = None
+
+# Set for clients which wrote recently, so they read their own writes
+PRIMARY_READS_COOKIE = "primary_reads"
+SAFE_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+# Clients revalidate cached responses with their ETags on every request
+CACHE_CONTROL = "no-cache"
+# Compressed media types besides text ones and +json or +xml suffixes
+COMPRESSIBLE_TYPES = frozenset(
+    (
+        "application/json",
+        "application/x-ndjson",
+        "application/javascript",
+        "application/xml",
+    ),
+)
+
+compression_time = get_summary("response_compression_seconds")
+compression_saved_bytes = get_summary("response_compression_saved_bytes")
+
+
+class PrimaryReadsMiddleware:
+    """Routes reads of writing requests to the primary database.
+
+    After a successful write the client gets a cookie which routes its reads
+    to the primary for ``replica_sticky_seconds``, until the replica catches up.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or settings.db_replica_host is None:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] in SAFE_METHODS:
+            if PRIMARY_READS_COOKIE in Request(scope).cookies:
+                with primary_reads():
+                    await self.app(scope, receive, send)
+            else:
+                await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if (
+                message["type"] == "http.response.start"
+                and message["status"] < 400
+                and settings.replica_sticky_seconds > 0
+            ):
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie",
+                    f"{PRIMARY_READS_COOKIE}=1; "
+                    f"Max-Age={settings.replica_sticky_seconds}; "
+                    "Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        with primary_reads():
+            await self.app(scope, receive, send_with_cookie)
+
+
+class ResponseCacheMiddleware:
+    """Caches JSON responses of GET requests to the given paths.
+
+    Responses get strong ETags, and requests whose ``If-None-Match`` matches
+    a fresh cached response are answered with 304 without reaching the
+    database. Responses are stale once a model they contain is changed, see
+    ``BaseDAO.cache_tags``. Streamed responses, like exports, aren't cached.
+    """
+
+    def __init__(self, app: ASGIApp, daos: dict[str, BaseDAO[Any]]) -> None:
+        self.app = app
+        # Path prefix -> DAO of the objects under it
+        self.daos = daos
+
+    def get_dao(self, scope: Scope) -> Optional[BaseDAO[Any]]:
+        """Get DAO of the objects the request reads, if it may be cached.
+
+        Clients reading their own writes bypass the cache, so their reads reach
+        the primary.
+        """
+
+        if scope["type"] != "http" or scope["method"] != "GET":
+            return None
+        if PRIMARY_READS_COOKIE in Request(scope).cookies:
+            return None
+        for prefix, dao in self.daos.items():
+            if scope["path"] == prefix or scope["path"].startswith(f"{prefix}/"):
+                return dao
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        cache = get_response_cache()
+        dao = self.get_dao(scope)
+        if cache is None or dao is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = scope["path"]
+        if scope["query_string"]:
+            key += f"?{scope['query_string'].decode('latin-1')}"
+        versions = await cache.get_versions(dao.cache_tags)
+        if_none_match = Headers(scope=scope).get("if-none-match")
+
+        cached = await cache.get(key)
+        if cached is not None and cached.versions == versions:
+            await send_cached(send, cached, if_none_match)
+            return
+
+        await self.app(
+            scope,
+            receive,
+            CachingSend(send, cache, key, dao.cache_tags, versions, if_none_match),
+        )
+
+
+class CachingSend:
+    """Sends the response, caching it if it's complete and successful."""
+
+    def __init__(
+        self,
+        send: Send,
+        cache: ResponseCache,
+        key: str,
+        tags: Sequence[str],
+        versions: tuple[int, ...],
+        if_none_match: Optional[str],
+    ) -> None:
+        self.send = send
+        self.cache = cache
+        self.key = key
+        self.tags = tags
+        # Versions of the tags before the response was computed
+        self.versions = versions
+        self.if_none_match = if_none_match
+        self.start: Optional[Message] = None
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+
+        start, self.start = self.start, None
+        if start is None:
+            await self.send(message)
+        elif message.get("more_body", False) or start["status"] != 200:
+            # Streamed or failed response is passed through
+            await self.send(start)
+            await self.send(message)
+        else:
+            await self.send_cached(start, message.get("body", b""))
+
+    async def send_cached(self, start: Message, body: bytes) -> None:
+        """Cache the response with an ETag, and send it."""
+
+        headers = MutableHeaders(scope=start)
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        headers["etag"] = f'"{digest}"'
+        headers["cache-control"] = CACHE_CONTROL
+        response = CachedResponse(
+            headers["etag"],
+            start["headers"],
+            body,
+            self.versions,
+        )
+        # Replica may have lacked a recent change, and the response would stay
+        # cached under the new versions
+        if settings.db_replica_host is None or not (
+            await self.cache.changed_recently(self.tags)
+        ):
+            await self.cache.set(self.key, response)
+        await send_cached(self.send, response, self.if_none_match)
+
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """Check whether the ``If-None-Match`` header matches the ETag."""
+
+    if if_none_match is None:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+async def send_cached(
+    send: Send,
+    response: CachedResponse,
+    if_none_match: Optional[str],
+) -> None:
+    """Send cached response, or 304 if the client has it already."""
+
+    if etag_matches(response.etag, if_none_match):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 304,
+                "headers": [
+                    (b"etag", response.etag.encode("latin-1")),
+                    (b"cache-control", CACHE_CONTROL.encode("latin-1")),
+                ],
+            },
+        )
+        await send({"type": "http.response.body", "body": b""})
+        return
+
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": list(response.headers),
+        },
+    )
+    await send({"type": "http.response.body", "body": response.body})
+
+
+class CompressionMiddleware:
+    """Compresses responses with brotli or gzip, as ``Accept-Encoding`` allows.
+
+    Only complete bodies of textual media types and at least
+    ``compression_minimum_size`` bytes are compressed. Streamed responses, like
+    exports, are passed through, so they still reach the client batch by batch.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = get_encoding(Headers(scope=scope).get("accept-encoding"))
+        await self.app(scope, receive, CompressingSend(send, encoding))
+
+
+class CompressingSend:
+    """Sends the response, compressing its body if it's worth it."""
+
+    def __init__(self, send: Send, encoding: Optional[str]) -> None:
+        self.send = send
+        self.encoding = encoding
+        self.start: Optional[Message] = None
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Headers of cached responses are shared, so they are copied
+            self.start = {**message, "headers": list(message.get("headers", []))}
+            return
+
+        start, self.start = self.start, None
+        if start is None:
+            await self.send(message)
+            return
+
+        headers = MutableHeaders(scope=start)
+        if is_worth_compressing(headers, message):
+            headers.add_vary_header("Accept-Encoding")
+            message = await self.compress_message(headers, message)
+        await self.send(start)
+        await self.send(message)
+
+    async def compress_message(
+        self,
+        headers: MutableHeaders,
+        message: Message,
+    ) -> Message:
+        """Compress body of the message, if it gets smaller."""
+
+        body = message.get("body", b"")
+        if self.encoding is None:
+            return message
+        compressed = await compress_body(body, self.encoding)
+        if len(compressed) >= len(body):
+            return message
+
+        compression_saved_bytes.observe(len(body) - len(compressed))
+        set_encoding_headers(headers, self.encoding, len(compressed))
+        return {**message, "body": compressed}
+
+
+def is_worth_compressing(headers: MutableHeaders, message: Message) -> bool:
+    """Check whether the body is complete, textual and large enough."""
+
+    return (
+        not message.get("more_body", False)
+        and "content-encoding" not in headers
+        and is_compressible(headers.get("content-type", ""))
+        and len(message.get("body", b"")) >= settings.compression_minimum_size
+    )
+
+
+def set_encoding_headers(headers: MutableHeaders, encoding: str, length: int) -> None:
+    """Describe the compressed body in the response headers."""
+
+    headers["content-encoding"] = encoding
+    headers["content-length"] = str(length)
+    etag = headers.get("etag")
+    if etag is not None and not etag.startswith("W/"):
+        # Strong ETags are of the uncompressed body
+        headers["etag"] = f"W/{etag}"
+
+
+def get_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Choose the most preferred encoding the client accepts.
+
+    Brotli is offered only if the brotli package is installed, and wins ties
+    with gzip.
+
+    Args:
+        accept_encoding (Optional[str]): ``Accept-Encoding`` header.
+
+    Returns:
+        Optional[str]: Encoding, None if the body is sent as is.
+    """
+
+    if not accept_encoding:
+        return None
+
+    qualities: dict[str, float] = {}
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        params = params.strip()
+        try:
+            quality = float(params[2:]) if params.startswith("q=") else 1.0
+        except ValueError:
+            quality = 0.0
+        qualities[name.strip().lower()] = quality
+
+    supported = ("gzip",) if brotli is None else ("br", "gzip")
+    encoding = max(
+        supported,
+        key=lambda name: qualities.get(name, qualities.get("*", 0.0)),
+    )
+    if qualities.get(encoding, qualities.get("*", 0.0)) <= 0:
+        return None
+    return encoding
+
+
+def is_compressible(content_type: str) -> bool:
+    """Check whether bodies of the content type are worth compressing."""
+
+    media_type = content_type.partition(";")[0].strip().lower()
+    return (
+        media_type.startswith("text/")
+        or media_type in COMPRESSIBLE_TYPES
+        or media_type.endswith(("+json", "+xml"))
+    )
+
+
+async def compress_body(body: bytes, encoding: str) -> bytes:
+    """Compress body, in a thread if it's large.
+
+    Bodies of at least ``compression_thread_size`` bytes are compressed in
+    the threadpool, so they don't block other requests.
+
+    Args:
+        body (bytes): Body.
+        encoding (str): ``br`` or ``gzip``.
+
+    Returns:
+        bytes: Compressed body.
+    """
+
+    if len(body) >= settings.compression_thread_size:
+        return await run_in_threadpool(compress, body, encoding)
+    return compress(body, encoding)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress body with the encoding, observing the time spent.
+
+    Args:
+        body (bytes): Body.
+        encoding (str): ``br`` or ``gzip``.
+
+    Returns:
+        bytes: Compressed body.
+    """
+
+    with compression_time.time():
+        if encoding == "br":
+            return brotli.compress(body, quality=settings.compression_brotli_quality)
+        return gzip.compress(
+            body,
+            compresslevel=settings.compression_gzip_level,
+            mtime=0,
+        )
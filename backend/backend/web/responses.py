@@ -0,0 +1,226 @@
+"""JSON responses serialized by orjson."""
+import asyncio
+import functools
+from copy import copy
+from typing import Any, Callable, Coroutine
+
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import UJSONResponse
+from fastapi.routing import (
+    APIRoute,
+    _prepare_response_content,  # noqa: WPS450
+    get_request_handler,
+)
+from pydantic import BaseModel, ValidationError
+from pydantic.error_wrappers import ErrorWrapper
+from pydantic.fields import SHAPE_LIST, SHAPE_SINGLETON, ModelField
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+
+from backend.metrics import get_summary
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+serialization_time = get_summary("response_serialization_seconds")
+
+
+class SerializedJSON(str):
+    """JSON text already serialized by ``ORJSONRoute``, sent as is."""
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content with orjson.
+
+    Types orjson doesn't know, like models nested in dicts or decimals, are
+    converted by ``jsonable_encoder``.
+
+    Args:
+        content (Any): Content.
+
+    Returns:
+        bytes: JSON.
+    """
+
+    return orjson.dumps(
+        content,
+        default=jsonable_encoder,
+        option=orjson.OPT_NON_STR_KEYS,
+    )
+
+
+def dump_models(content: Any, **options: Any) -> Any:
+    """Convert models to dicts, leaving values orjson serializes natively.
+
+    Args:
+        content (Any): Model, list of models or any other value.
+        options (Any): Keyword arguments of ``BaseModel.dict``.
+
+    Returns:
+        Any: Content with dicts instead of models.
+    """
+
+    if isinstance(content, BaseModel):
+        return content.dict(**options)
+    if isinstance(content, list):
+        return [dump_models(item, **options) for item in content]
+    return content
+
+
+class ORJSONResponse(UJSONResponse):
+    """Response serialized by orjson, or by ujson if orjson isn't installed."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, SerializedJSON):
+            return content.encode()
+        if orjson is None:
+            return super().render(content)
+        return dumps(content)
+
+
+class ORJSONRoute(APIRoute):
+    """Route serializing its responses with orjson.
+
+    FastAPI validates the returned value against ``response_model``, then
+    walks the result with ``jsonable_encoder`` to turn UUIDs, dates and enums
+    into strings, and only then serializes it. orjson serializes these types
+    natively, so here models are just converted to dicts. Values which already
+    are instances of the response model aren't validated again.
+
+    Responses are serialized by the endpoint itself, so FastAPI still sets the
+    status code, headers and background tasks of the response.
+    """
+
+    def get_route_handler(
+        self,
+    ) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        response_class: Any = self.response_class
+        if isinstance(response_class, DefaultPlaceholder):
+            response_class = response_class.value
+        endpoint = self.dependant.call
+        if (
+            orjson is None
+            or endpoint is None
+            or not issubclass(response_class, ORJSONResponse)
+        ):
+            return super().get_route_handler()
+
+        dependant = copy(self.dependant)
+        dependant.call = self.serialize_endpoint(endpoint)
+        return get_request_handler(
+            dependant=dependant,
+            body_field=self.body_field,
+            status_code=self.status_code,
+            response_class=self.response_class,
+            response_field=None,
+            dependency_overrides_provider=self.dependency_overrides_provider,
+        )
+
+    def serialize_endpoint(self, endpoint: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap endpoint to serialize what it returns.
+
+        Args:
+            endpoint (Callable[..., Any]): Endpoint.
+
+        Returns:
+            Callable[..., Any]: Coroutine function returning serialized JSON or
+                the response returned by the endpoint.
+        """
+
+        is_coroutine = asyncio.iscoroutinefunction(endpoint)
+
+        @functools.wraps(endpoint)
+        async def serialized_endpoint(**values: Any) -> Any:
+            if is_coroutine:
+                content = await endpoint(**values)
+            else:
+                content = await run_in_threadpool(endpoint, **values)
+            if isinstance(content, Response):
+                return content
+            return self.serialize(content)
+
+        return serialized_endpoint
+
+    def serialize(self, content: Any) -> SerializedJSON:
+        """Validate content against the response model and serialize it.
+
+        Args:
+            content (Any): Content returned by the endpoint.
+
+        Returns:
+            SerializedJSON: JSON.
+
+        Raises:
+            ValidationError: Content doesn't match the response model.
+        """
+
+        with serialization_time.time():
+            field = self.secure_cloned_response_field
+            if self.response_field is None or field is None:
+                return SerializedJSON(dumps(content).decode())
+
+            if not self.is_validated(content, self.response_field):
+                content = self.validate(content, field)
+            content = dump_models(
+                content,
+                include=self.response_model_include,
+                exclude=self.response_model_exclude,
+                by_alias=self.response_model_by_alias,
+                exclude_unset=self.response_model_exclude_unset,
+                exclude_defaults=self.response_model_exclude_defaults,
+                exclude_none=self.response_model_exclude_none,
+            )
+            return SerializedJSON(dumps(content).decode())
+
+    def is_validated(self, content: Any, field: ModelField) -> bool:
+        """Check whether content consists of instances of the response model.
+
+        Subclasses may have fields the response model hides, so only instances
+        of the model itself count.
+
+        Args:
+            content (Any): Content returned by the endpoint.
+            field (ModelField): Response field.
+
+        Returns:
+            bool: True if content doesn't need validation.
+        """
+
+        model = field.type_
+        if field.shape == SHAPE_SINGLETON:
+            return type(content) is model
+        if field.shape == SHAPE_LIST and isinstance(content, list):
+            return all(type(item) is model for item in content)
+        return False
+
+    def validate(self, content: Any, field: ModelField) -> Any:
+        """Validate content like FastAPI does, e.g. reading ORM objects.
+
+        Args:
+            content (Any): Content returned by the endpoint.
+            field (ModelField): Response field cloned by FastAPI, hiding fields
+                of subclasses of the response model.
+
+        Returns:
+            Any: Instances of the response model.
+
+        Raises:
+            ValidationError: Content doesn't match the response model.
+        """
+
+        content = _prepare_response_content(
+            content,
+            exclude_unset=self.response_model_exclude_unset,
+            exclude_defaults=self.response_model_exclude_defaults,
+            exclude_none=self.response_model_exclude_none,
+        )
+        value, errors = field.validate(content, {}, loc=("response",))
+        if isinstance(errors, ErrorWrapper):
+            errors = [errors]
+        if errors:
+            raise ValidationError(errors, field.type_)
+        return value
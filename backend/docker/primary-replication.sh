@@ -0,0 +1,3 @@
+#!/bin/sh
+# Lets the replica stream WAL from the primary, run on the first start only
+echo "host replication all all md5" >> "$PGDATA/pg_hba.conf"